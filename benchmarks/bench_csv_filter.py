@@ -0,0 +1,61 @@
+"""
+/filter-csv: whole-file pandas read vs the chunked, projected stream.
+
+    python benchmarks/bench_csv_filter.py [--rows 2000000]
+"""
+
+import argparse
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+from common import DATA_DIR, timer
+from tasks.business.csv_filter import iter_filtered, parse_predicate
+
+
+def make_csv(rows: int):
+    path = DATA_DIR / "bench-filter.csv"
+    rng = np.random.default_rng(0)
+    pd.DataFrame({
+        "id": np.arange(rows),
+        "city": rng.choice(["Paris", "Berlin", "Madrid", "Rome"], rows),
+        "price": rng.integers(1, 1000, rows),
+        "note": rng.choice(["short", "a somewhat longer free text note", "x" * 60], rows)
+    }).to_csv(path, index=False)
+    return path
+
+
+def measured(label, func):
+    tracemalloc.start()
+    with timer(label):
+        count = func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print(f"  rows={count} peak={peak / 2**20:.0f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    args = parser.parse_args()
+    path = make_csv(args.rows)
+    predicates = [parse_predicate("city==Paris"), parse_predicate("price>=500")]
+
+    def whole_file():
+        frame = pd.read_csv(path)
+        return len(frame[(frame["city"] == "Paris") & (frame["price"] >= 500)][["id", "price"]])
+
+    def streamed():
+        return sum(len(f) for f in iter_filtered(path, predicates, columns=["id", "price"]))
+
+    def first_page():
+        return sum(len(f) for f in iter_filtered(path, predicates, columns=["id", "price"], limit=100))
+
+    measured("whole-file read", whole_file)
+    measured("chunked + projected", streamed)
+    measured("first page (limit=100)", first_page)
+
+
+if __name__ == "__main__":
+    main()
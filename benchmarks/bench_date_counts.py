@@ -0,0 +1,63 @@
+"""
+A3 weekday counts: a strptime loop vs the vectorized histogram and its cache.
+
+    python benchmarks/bench_date_counts.py [--rows 2000000] [--loop-rows 200000]
+"""
+
+import argparse
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from common import DATA_DIR, timer
+from tasks.operations.date_counts import DATE_FORMATS, HistogramCache
+
+
+def make_dates(rows: int):
+    path = DATA_DIR / "bench-dates.txt"
+    rng = np.random.default_rng(0)
+    start = datetime(2000, 1, 1)
+    days = rng.integers(0, 365 * 25, rows)
+    formats = rng.integers(0, len(DATE_FORMATS), rows)
+    with open(path, "w") as f:
+        for day, fmt in zip(days.tolist(), formats.tolist()):
+            f.write((start + timedelta(days=day)).strftime(DATE_FORMATS[fmt]) + "\n")
+    return path
+
+
+def strptime_loop(path, rows):
+    """The old approach, extended to try every format: strptime once per line"""
+    counts = [0] * 7
+    with open(path) as f:
+        for _, line in zip(range(rows), f):
+            line = line.strip()
+            for fmt in DATE_FORMATS:
+                try:
+                    counts[datetime.strptime(line, fmt).weekday()] += 1
+                    break
+                except ValueError:
+                    continue
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=2_000_000)
+    parser.add_argument("--loop-rows", type=int, default=200_000,
+                        help="Lines timed with the strptime loop, which is far slower")
+    args = parser.parse_args()
+    path = make_dates(args.rows)
+
+    with timer(f"strptime loop ({args.loop_rows} rows)"):
+        strptime_loop(path, args.loop_rows)
+    cache = HistogramCache()
+    with timer(f"histogram cold ({args.rows} rows)"):
+        histogram = cache.get(path)
+    assert histogram.sum() == args.rows
+    with timer("histogram cached x1000"):
+        for _ in range(1000):
+            cache.get(path)
+
+
+if __name__ == "__main__":
+    main()
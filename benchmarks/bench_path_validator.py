@@ -0,0 +1,55 @@
+"""
+validate_path: resolving every call vs the memoized PathValidator.
+
+    python benchmarks/bench_path_validator.py [--calls 20000]
+"""
+
+import argparse
+from pathlib import Path
+
+from common import DATA_DIR, timer
+from config import settings
+from utils.security import PathValidator
+
+
+def uncached(path: Path) -> bool:
+    """validate_path before memoization: resolve the path and the root on every call"""
+    try:
+        resolved_path = path.resolve()
+        data_dir = Path(settings.data_dir).resolve()
+        if not str(resolved_path).startswith(str(data_dir)):
+            return False
+        return path.suffix in settings.security.allowed_extensions
+    except Exception:
+        return False
+
+
+def timed(label, check, paths, calls):
+    with timer(label):
+        for i in range(calls):
+            check(paths[i % len(paths)])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--calls", type=int, default=20_000)
+    args = parser.parse_args()
+
+    nested = DATA_DIR / "a" / "b" / "c"
+    nested.mkdir(parents=True, exist_ok=True)
+    existing = [nested / f"file-{i}.txt" for i in range(100)]
+    for path in existing:
+        path.write_text("x")
+    missing = [nested / "d" / "e" / f"new-{i}.txt" for i in range(100)]
+    # More distinct paths than the cache holds, so every call misses
+    churn = [nested / f"churn-{i}.txt" for i in range(2_000)]
+
+    for name, paths in (("existing", existing), ("missing", missing), ("churn", churn)):
+        validator = PathValidator([settings.data_dir], max_entries=1_000)
+        assert all(validator(path) == uncached(path) for path in paths)
+        timed(f"{name} uncached", uncached, paths, args.calls)
+        timed(f"{name} PathValidator", validator, paths, args.calls)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""
+A9 most-similar-pair search: full cosine matrix vs blocked scan vs LSH.
+
+    python benchmarks/bench_similarity.py [--rows 12000] [--dim 384]
+"""
+
+import argparse
+
+import numpy as np
+
+from common import timer
+from tasks.operations.similarity import approximate_most_similar_pair, most_similar_pair
+
+
+def full_matrix(embeddings):
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    similarities = cosine_similarity(embeddings)
+    np.fill_diagonal(similarities, -1)
+    i, j = np.unravel_index(similarities.argmax(), similarities.shape)
+    return int(i), int(j)
+
+
+def timed(label, func, *args):
+    with timer(label):
+        pair = func(*args)
+    print(f"  pair={pair[-2:]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, default=12_000)
+    parser.add_argument("--dim", type=int, default=384)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((args.rows, args.dim)).astype(np.float32)
+    embeddings[args.rows // 3] = embeddings[2 * args.rows // 3] + 0.01 * rng.standard_normal(args.dim)
+
+    timed("full matrix", full_matrix, embeddings)
+    timed("blocked", most_similar_pair, embeddings)
+    timed("lsh", approximate_most_similar_pair, embeddings)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,23 @@
+"""
+Shared setup for the benchmark scripts: import from src/ with a scratch data dir.
+"""
+
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
+os.environ.setdefault("AIPROXY_TOKEN", "benchmark")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="dataworks-bench-"))
+
+DATA_DIR = Path(os.environ["DATA_DIR"])
+
+
+@contextmanager
+def timer(label: str):
+    start = time.perf_counter()
+    yield
+    print(f"{label:<28} {time.perf_counter() - start:8.3f}s")
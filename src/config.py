@@ -1,23 +1,170 @@
 from pydantic_settings import BaseSettings
 from pathlib import Path
-from typing import Set
+from typing import Dict, Literal, Optional, Set
 
 class SecuritySettings(BaseSettings):
     allowed_paths: Set[str] = {"/data"}
     restricted_operations: Set[str] = {"delete", "remove", "rm", "rmdir", "unlink"}
     max_file_size: int = 100 * 1024 * 1024  # 100MB
     allowed_extensions: Set[str] = {".txt", ".md", ".json", ".csv", ".db", ".mp3", ".png", ".jpg"}
+    path_cache_size: int = 4096  # Validated paths remembered by utils.security
+
+class EmbeddingSettings(BaseSettings):
+    model_name: str = "all-MiniLM-L6-v2"
+    batch_size: int = 64
+    cache_size: int = 100_000  # Max cached embeddings kept on disk
+    preload: bool = False  # Load the model at startup instead of first use
+
+    class Config:
+        env_prefix = "EMBEDDING_"
+
+class SimilaritySettings(BaseSettings):
+    block_size: int = 1024  # Rows per tile in the exact pair search
+    approximate_threshold: int = 0  # Switch A9 to LSH at this many comments; 0 disables
+    lsh_bits: int = 16
+    lsh_tables: int = 8
+
+    class Config:
+        env_prefix = "SIMILARITY_"
+
+class TranscriptionSettings(BaseSettings):
+    model_size: str = "base"
+    allowed_models: Set[str] = {"tiny", "base", "small"}  # Sizes a task may ask for
+    workers: int = 1
+    segment_seconds: int = 300  # Audio is transcribed and written in segments of this length
+    max_jobs: int = 100  # Finished jobs kept for progress polling
+    max_pending: int = 4  # Queued or running jobs before new ones get 429
+
+    class Config:
+        env_prefix = "TRANSCRIPTION_"
+
+class ParseCacheSettings(BaseSettings):
+    enabled: bool = True
+    rules_enabled: bool = True  # Match canonical phrasings before calling the LLM
+    ttl_seconds: int = 24 * 60 * 60
+    max_entries: int = 10_000
+
+    class Config:
+        env_prefix = "PARSE_CACHE_"
+
+class LLMSettings(BaseSettings):
+    base_url: Optional[str] = None  # OpenAI-compatible endpoint; defaults to api.openai.com
+    max_connections: int = 20
+    timeout: float = 30.0  # Seconds per call
+    max_retries: int = 3
+    retry_backoff: float = 0.5  # Seconds before the first retry, doubled each attempt
+
+    class Config:
+        env_prefix = "LLM_"
+
+class DispatchSettings(BaseSettings):
+    thread_workers: int = 8  # I/O-bound handlers
+    process_workers: int = 2  # CPU-bound handlers
+    cpu_bound_operations: Optional[Set[str]] = None  # Process pool; None uses the registry's CPU class
+    max_pending: int = 32  # Tasks queued or running before new ones get 503
+    operation_limits: Dict[str, int] = {"A9": 2, "B4": 1, "B7": 2, "B8": 2}  # Concurrent runs before 429
+    retry_after: int = 5  # Seconds, sent as Retry-After when saturated
+    preload_operations: Set[str] = set()  # Imported at startup instead of on first dispatch
+
+    class Config:
+        env_prefix = "DISPATCH_"
+
+class HttpSettings(BaseSettings):
+    pool_hosts: int = 10  # Hosts whose connections are kept alive
+    per_host: int = 4  # Concurrent connections per host; further requests wait
+    timeout: float = 30.0  # Seconds to connect and between received bytes
+    chunk_size: int = 64 * 1024  # Bytes streamed to disk at a time
+    cache_enabled: bool = True  # Revalidate downloads with ETag/Last-Modified
+
+    class Config:
+        env_prefix = "HTTP_"
+
+class GitSettings(BaseSettings):
+    depth: int = 1  # Commits of history cloned; 0 for all
+    blob_filter: str = "blob:none"  # Partial clone filter; empty to fetch every blob up front
+    fetch_interval: float = 60.0  # Seconds before a cached clone is fetched again
+
+    class Config:
+        env_prefix = "GIT_"
+
+class BatchSettings(BaseSettings):
+    max_tasks: int = 50  # Tasks accepted by one /run/batch request
+    max_parallel: int = 4  # Independent tasks of a batch dispatched at once
+    max_rejections: int = 3  # Times a task is retried after the dispatcher turns it away
+
+    class Config:
+        env_prefix = "BATCH_"
+
+class JobSettings(BaseSettings):
+    workers: int = 2  # Background consumers of /run?async=true jobs
+    max_depth: int = 100  # Queued jobs before new ones get 503
+
+    class Config:
+        env_prefix = "JOBS_"
+
+class CsvFilterSettings(BaseSettings):
+    chunk_rows: int = 100_000  # Rows parsed per chunk when streaming /filter-csv
+    cache_enabled: bool = True  # Answer repeated filters from a Parquet copy
+    cache_max_bytes: int = 1024 * 1024 * 1024  # 1GB of Parquet sidecars
+
+    class Config:
+        env_prefix = "CSV_FILTER_"
+
+class QuerySettings(BaseSettings):
+    pool_size: int = 4  # Idle read-only connections kept per SQLite database
+    max_rows: int = 1_000_000  # Rows a B5 export may return
+    timeout: float = 30.0  # Seconds before a query is interrupted
+    batch_rows: int = 10_000  # Rows fetched and written per batch
+
+    class Config:
+        env_prefix = "QUERY_"
+
+class ImageSettings(BaseSettings):
+    workers: int = 2  # Processes resizing/compressing B7 images
+    max_batch: int = 1000  # Images one B7 task may touch
+
+    class Config:
+        env_prefix = "IMAGE_"
+
+class ProfileSettings(BaseSettings):
+    sample_every: int = 0  # Profile one in N /run requests; 0 disables sampling
+    mode: Literal["sampling", "cprofile"] = "sampling"  # Sampling has the lower overhead
+    interval: float = 0.005  # Seconds between stack samples
+    max_profiles: int = 100  # Newest profiles kept on disk
+
+    class Config:
+        env_prefix = "PROFILE_"
 
 class Settings(BaseSettings):
     data_dir: str = "/data"
+    cache_dirname: str = ".cache"  # Created inside data_dir
     aiproxy_token: str
     model_name: str = "gpt-4-mini"
     max_tokens: int = 150
     temperature: float = 0
     debug: bool = False
     security: SecuritySettings = SecuritySettings()
+    embedding: EmbeddingSettings = EmbeddingSettings()
+    similarity: SimilaritySettings = SimilaritySettings()
+    transcription: TranscriptionSettings = TranscriptionSettings()
+    parse_cache: ParseCacheSettings = ParseCacheSettings()
+    llm: LLMSettings = LLMSettings()
+    dispatch: DispatchSettings = DispatchSettings()
+    http: HttpSettings = HttpSettings()
+    git: GitSettings = GitSettings()
+    batch: BatchSettings = BatchSettings()
+    jobs: JobSettings = JobSettings()
+    csv_filter: CsvFilterSettings = CsvFilterSettings()
+    query: QuerySettings = QuerySettings()
+    image: ImageSettings = ImageSettings()
+    profile: ProfileSettings = ProfileSettings()
 
     class Config:
         env_file = ".env"
 
-settings = Settings()
\ No newline at end of file
+    @property
+    def cache_dir(self) -> Path:
+        """Directory for persistent caches kept alongside the data"""
+        return Path(self.data_dir) / self.cache_dirname
+
+settings = Settings()
@@ -0,0 +1,112 @@
+"""
+Persistent cache of parsed task descriptions, keyed by normalized task text.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from config import settings
+from utils.metrics import REGISTRY
+
+
+def normalize_task(task_description: str) -> str:
+    """Collapse whitespace; case is kept because paths are case-sensitive"""
+    return " ".join(task_description.split())
+
+
+class ParseCache:
+    """SQLite-backed parse results with a TTL and LRU eviction"""
+
+    def __init__(self, db_path: Path, ttl_seconds: int, max_entries: int):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS parse_cache (
+                key TEXT PRIMARY KEY,
+                task TEXT NOT NULL,
+                result TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS parse_cache_last_used ON parse_cache(last_used)"
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def _key(task_description: str) -> str:
+        return hashlib.sha256(normalize_task(task_description).encode()).hexdigest()
+
+    def get(self, task_description: str) -> Optional[Dict[str, Any]]:
+        key = self._key(task_description)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT result, created_at FROM parse_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                if row is not None:
+                    self._conn.execute("DELETE FROM parse_cache WHERE key = ?", (key,))
+                    self._conn.commit()
+                self.misses += 1
+                return None
+
+            self._conn.execute("UPDATE parse_cache SET last_used = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, task_description: str, result: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO parse_cache VALUES (?, ?, ?, ?, ?)",
+                (self._key(task_description), normalize_task(task_description),
+                 json.dumps(result), now, now)
+            )
+            self._conn.execute(
+                "DELETE FROM parse_cache WHERE created_at < ?", (now - self.ttl_seconds,)
+            )
+            excess = self._conn.execute("SELECT COUNT(*) FROM parse_cache").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute("""
+                    DELETE FROM parse_cache WHERE key IN (
+                        SELECT key FROM parse_cache ORDER BY last_used LIMIT ?
+                    )
+                """, (excess,))
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters since process start"""
+        return {"hits": self.hits, "misses": self.misses}
+
+
+_cache: Optional[ParseCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_parse_cache() -> ParseCache:
+    """Return the process-wide parse cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ParseCache(
+                    settings.cache_dir / "parse-cache.sqlite",
+                    settings.parse_cache.ttl_seconds,
+                    settings.parse_cache.max_entries
+                )
+                REGISTRY.register_cache("parse", _cache.stats)
+    return _cache
@@ -0,0 +1,106 @@
+"""
+Shared asynchronous gateway to the OpenAI-compatible LLM API.
+"""
+
+import asyncio
+import hashlib
+import json
+import random
+import threading
+from concurrent.futures import Future
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from utils.metrics import LLM_TOKENS
+
+
+class LLMGateway:
+    """Pooled AsyncOpenAI client with retries and coalescing of identical in-flight prompts.
+
+    The client lives on a private event loop thread so it can be shared by the
+    FastAPI loop and by synchronous handlers running in worker threads.
+    """
+
+    def __init__(self, api_key: str, base_url: Optional[str] = None, max_connections: int = 20,
+                 timeout: float = 30.0, max_retries: int = 3, retry_backoff: float = 0.5):
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+        # Imported here so processes that never call the LLM don't load the SDK
+        import httpx
+        from openai import APIConnectionError, AsyncOpenAI, InternalServerError, RateLimitError
+        self._retryable = (APIConnectionError, RateLimitError, InternalServerError)
+        self._client = AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,  # Retries are handled here so coalesced callers share them
+            http_client=httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_connections
+                ),
+                timeout=timeout
+            )
+        )
+        self._inflight: Dict[str, "asyncio.Task[str]"] = {}
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="llm-gateway", daemon=True)
+        self._thread.start()
+
+    async def _create(self, request: Dict[str, Any]) -> str:
+        for attempt in range(self.max_retries + 1):
+            try:
+                response = await self._client.chat.completions.create(**request)
+                if response.usage is not None:
+                    model = request.get("model", "")
+                    LLM_TOKENS.inc(model, "prompt", amount=response.usage.prompt_tokens)
+                    LLM_TOKENS.inc(model, "completion", amount=response.usage.completion_tokens)
+                return response.choices[0].message.content
+            except self._retryable:
+                if attempt == self.max_retries:
+                    raise
+                # Exponential backoff with jitter
+                await asyncio.sleep(self.retry_backoff * 2 ** attempt * (1 + random.random()))
+
+    async def _coalesced(self, request: Dict[str, Any]) -> str:
+        key = hashlib.sha256(json.dumps(request, sort_keys=True).encode()).hexdigest()
+        task = self._inflight.get(key)
+        if task is None:
+            task = self._loop.create_task(self._create(request))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # A cancelled caller must not cancel the request other callers are waiting on
+        return await asyncio.shield(task)
+
+    def _submit(self, messages: List[Dict[str, str]], options: Dict[str, Any]) -> Future:
+        request = {"messages": messages, "timeout": self.timeout, **options}
+        return asyncio.run_coroutine_threadsafe(self._coalesced(request), self._loop)
+
+    async def complete(self, messages: List[Dict[str, str]], **options: Any) -> str:
+        """Return the completion text; awaitable from any event loop"""
+        return await asyncio.wrap_future(self._submit(messages, options))
+
+    def complete_blocking(self, messages: List[Dict[str, str]], **options: Any) -> str:
+        """Return the completion text from synchronous code"""
+        return self._submit(messages, options).result()
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """Return the process-wide LLM gateway"""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    settings.aiproxy_token,
+                    base_url=settings.llm.base_url,
+                    max_connections=settings.llm.max_connections,
+                    timeout=settings.llm.timeout,
+                    max_retries=settings.llm.max_retries,
+                    retry_backoff=settings.llm.retry_backoff
+                )
+    return _gateway
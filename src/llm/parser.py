@@ -1,15 +1,15 @@
 import os
 import json
-from typing import Dict, Any
-from openai import OpenAI
+import asyncio
+from typing import Dict, Any, List, Optional
 from config import settings
+from tasks.exceptions import TaskParsingError
+from tasks.registry import OPERATIONS
+from .cache import get_parse_cache
+from .gateway import get_llm_gateway
+from .rules import parse_canonical_task
 
-client = OpenAI(api_key=settings.aiproxy_token)
-
-def parse_task(task_description: str) -> Dict[str, Any]:
-    """Parse natural language task description into structured format"""
-    
-    system_prompt = """
+SYSTEM_PROMPT = """
     Parse the given task into a structured format. Return JSON with:
     {
         "operation": "A1-A10",
@@ -19,20 +19,107 @@ def parse_task(task_description: str) -> Dict[str, Any]:
     }
     Keep responses concise and focused on task parsing only.
     """
-    
+
+BATCH_SYSTEM_PROMPT = """
+    Parse each of the numbered tasks into a structured format. Return JSON with
+    {"tasks": [...]}, one object per task in the order given, each with:
+    {
+        "operation": "A1-A10",
+        "input_path": "source file path",
+        "output_path": "destination file path",
+        "parameters": {}
+    }
+    Keep responses concise and focused on task parsing only.
+    """
+
+def _lookup(task_description: str, cache) -> Optional[Dict[str, Any]]:
+    """Task details from the canonical rules or the parse cache, without calling the LLM"""
+    # Canonical phrasings never need the LLM
+    if settings.parse_cache.rules_enabled:
+        task_details = parse_canonical_task(task_description)
+        if task_details is not None:
+            return task_details
+    if cache is not None:
+        return cache.get(task_description)
+    return None
+
+def is_valid_task(task_details: Dict[str, Any]) -> bool:
+    """True if parsed details name a known operation with well-formed fields"""
+    operation = task_details.get('operation')
+    return (
+        operation in OPERATIONS
+        and task_details.get('phase') == operation[0]
+        and all(isinstance(task_details.get(field), (str, type(None))) for field in ('input_path', 'output_path'))
+        and isinstance(task_details.get('parameters', {}), dict)
+    )
+
+def _finish(task_details: Dict[str, Any], task_description: str, cache) -> Dict[str, Any]:
+    # The prompt only asks for the operation; its letter is the phase
+    task_details.setdefault('phase', str(task_details.get('operation', ''))[:1])
+    # A bad parse would otherwise be replayed from the cache until it expired
+    if cache is not None and is_valid_task(task_details):
+        cache.put(task_description, task_details)
+    return task_details
+
+async def parse_task(task_description: str, use_cache: bool = True) -> Dict[str, Any]:
+    """Parse natural language task description into structured format"""
+    cache = get_parse_cache() if use_cache and settings.parse_cache.enabled else None
+    task_details = _lookup(task_description, cache)
+    if task_details is not None:
+        return task_details
+
     try:
-        response = client.chat.completions.create(
-            model="gpt-4-mini",  # Changed model
-            messages=[
-                {"role": "system", "content": system_prompt},
+        content = await get_llm_gateway().complete(
+            [
+                {"role": "system", "content": SYSTEM_PROMPT},
                 {"role": "user", "content": task_description}
             ],
-            temperature=0,
-            max_tokens=150,  # Added token limit for efficiency
+            model=settings.model_name,
+            temperature=settings.temperature,
+            max_tokens=settings.max_tokens,  # Added token limit for efficiency
             response_format={ "type": "json_object" }
         )
-        
-        return json.loads(response.choices[0].message.content)  # Add json.loads()
-        
+
+        task_details = json.loads(content)
+
     except Exception as e:
         raise TaskParsingError(f"Failed to parse task: {str(e)}")
+
+    return _finish(task_details, task_description, cache)
+
+async def parse_tasks(task_descriptions: List[str], use_cache: bool = True) -> List[Dict[str, Any]]:
+    """Parse several task descriptions, sending all cache misses to the LLM in one call"""
+    cache = get_parse_cache() if use_cache and settings.parse_cache.enabled else None
+    parsed: List[Optional[Dict[str, Any]]] = [_lookup(task, cache) for task in task_descriptions]
+    missing = [i for i, task_details in enumerate(parsed) if task_details is None]
+    if len(missing) == 1:
+        parsed[missing[0]] = await parse_task(task_descriptions[missing[0]], use_cache)
+    elif missing:
+        numbered = "\n".join(f"{n}. {task_descriptions[i]}" for n, i in enumerate(missing, 1))
+        try:
+            content = await get_llm_gateway().complete(
+                [
+                    {"role": "system", "content": BATCH_SYSTEM_PROMPT},
+                    {"role": "user", "content": numbered}
+                ],
+                model=settings.model_name,
+                temperature=settings.temperature,
+                max_tokens=settings.max_tokens * len(missing),
+                response_format={ "type": "json_object" }
+            )
+        except Exception as e:
+            raise TaskParsingError(f"Failed to parse tasks: {str(e)}")
+        try:
+            results = json.loads(content).get("tasks")
+        except (ValueError, AttributeError):
+            results = None  # Not a JSON object; handled like a miscounted reply
+
+        if isinstance(results, list) and len(results) == len(missing) and all(isinstance(r, dict) for r in results):
+            for i, task_details in zip(missing, results):
+                parsed[i] = _finish(task_details, task_descriptions[i], cache)
+        else:
+            # The model lost track of the numbering or the format; fall back to one call per task
+            results = await asyncio.gather(*(parse_task(task_descriptions[i], use_cache) for i in missing))
+            for i, task_details in zip(missing, results):
+                parsed[i] = task_details
+    return parsed
@@ -0,0 +1,87 @@
+"""
+Deterministic parser for the canonical task phrasings, tried before the LLM.
+"""
+
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+PATH = r"(/data/[\w./-]*[\w/])"
+URL = r"(https?://[^\s'\"`<>]*[^\s'\"`<>.,;])"
+KEY_SEPARATOR = r",?\s+then\s+(?:by\s+)?"
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+
+def _relative(path: Optional[str]) -> Optional[str]:
+    """Task handlers resolve paths against the data dir themselves"""
+    if path is None:
+        return None
+    return path[len("/data"):].lstrip('/') or '.'
+
+
+def _task(operation: str, input_path: Optional[str] = None, output_path: Optional[str] = None,
+          **parameters: Any) -> Dict[str, Any]:
+    return {
+        "phase": operation[0],
+        "operation": operation,
+        "input_path": _relative(input_path),
+        "output_path": _relative(output_path),
+        "parameters": parameters
+    }
+
+
+def _rule(pattern: str) -> "re.Pattern[str]":
+    return re.compile(pattern, re.IGNORECASE | re.DOTALL)
+
+
+RULES: List[Tuple["re.Pattern[str]", Callable[["re.Match[str]"], Dict[str, Any]]]] = [
+    (_rule(r"install\b.*\buv\b.*datagen\.py.*?([\w.+-]+@[\w-]+(?:\.[\w-]+)+)"),
+     lambda m: _task("A1", user_email=m[1])),
+    (_rule(r"format\b.*?" + PATH + r".*\bprettier\b"),
+     lambda m: _task("A2", m[1], m[1])),
+    (_rule(PATH + r"\s+contains a list of dates.*?\b(" + "|".join(WEEKDAYS) + r")s?\b.*?" + PATH),
+     lambda m: _task("A3", m[1], m[3], weekday=WEEKDAYS.index(m[2].lower()))),
+    # Anchored: a sort direction or any other qualifier is left to the LLM
+    (_rule(r"^\s*sort the array of contacts in " + PATH + r" by (\w+(?:" + KEY_SEPARATOR + r"\w+)*),?"
+           r"\s+and write the result to " + PATH + r"\.?\s*$"),
+     lambda m: _task("A4", m[1], m[3], keys=re.split(KEY_SEPARATOR, m[2]))),
+    (_rule(r"first line of the (\d+) most recent \.log files?.*?" + PATH + r".*?" + PATH),
+     lambda m: _task("A5", m[2], m[3], count=int(m[1]))),
+    (_rule(r"markdown.*?" + PATH + r".*?\bindex\b.*?" + PATH),
+     lambda m: _task("A6", m[1], m[2])),
+    (_rule(PATH + r"\s+contains an email message.*?\bsender'?s? email address.*?" + PATH),
+     lambda m: _task("A7", m[1], m[2])),
+    (_rule(PATH + r"\s+contains a credit card.*?" + PATH),
+     lambda m: _task("A8", m[1], m[2])),
+    (_rule(PATH + r"\s+contains a list of comments.*?\bmost similar\b.*?" + PATH),
+     lambda m: _task("A9", m[1], m[2])),
+    (_rule(r"SQLite database file\s+" + PATH + r".*?\"?\bGold\b\"?.*?" + PATH),
+     lambda m: _task("A10", m[1], m[2])),
+    (_rule(r"\bfetch\b.*?\bAPI\b.*?" + URL + r".*?" + PATH),
+     lambda m: _task("B3", output_path=m[2], api_url=m[1])),
+    (_rule(r"run (?:the )?(?:SQL )?query\s+[\"'`](.+?)[\"'`]\s+on\s+" + PATH + r".*?" + PATH),
+     lambda m: _task("B5", output_path=m[3], db_path=_relative(m[2]), query=m[1])),
+    (_rule(r"\bscrape\b.*?" + URL + r".*?" + PATH),
+     lambda m: _task("B6", output_path=m[2], url=m[1])),
+    (_rule(r"\bresize\b.*?" + PATH + r"\s+to\s+(\d+)\s*x\s*(\d+).*?" + PATH),
+     lambda m: _task("B7", m[1], m[4], resize=[int(m[2]), int(m[3])])),
+    (_rule(r"\bcompress\b.*?" + PATH + r".*?\bquality\s+(?:of\s+)?(\d+).*?" + PATH),
+     lambda m: _task("B7", m[1], m[3], compress=int(m[2]))),
+    # Anchored: a requested model size is left to the LLM
+    (_rule(r"^\s*transcribe (?:the )?(?:audio (?:file )?)?(?:from |in |at )?" + PATH + r",?\s+"
+           r"(?:and )?(?:write|save) (?:it|the (?:transcript(?:ion)?|text)) to " + PATH + r"\.?\s*$"),
+     lambda m: _task("B8", m[1], m[2])),
+    (_rule(r"\bconvert\b.*?" + PATH + r"\s+to\s+HTML.*?" + PATH),
+     lambda m: _task("B9", m[1], m[2])),
+    (_rule(r"\bfilter\b.*?(/data/[\w./-]*\.csv).*?\bwhere\s+[\"'`]?(\w+)[\"'`]?\s*(?:==?|is|equals)\s*"
+           r"(?:[\"'`]([^\"'`]*)[\"'`]|([^\s,;]+))"),
+     lambda m: _task("B10", m[1], column=m[2], value=m[3] if m[3] is not None else m[4])),
+]
+
+
+def parse_canonical_task(task_description: str) -> Optional[Dict[str, Any]]:
+    """Return task details for a recognised phrasing, or None to defer to the LLM"""
+    for pattern, build in RULES:
+        match = pattern.search(task_description)
+        if match:
+            return build(match)
+    return None
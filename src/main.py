@@ -1,17 +1,29 @@
-from fastapi import FastAPI, HTTPException, Response, Query
-from fastapi.responses import StreamingResponse
+from fastapi import FastAPI, Header, HTTPException, Request, Response, Query
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 from typing import Optional
-from llm.parser import parse_task
-from utils.security import secure_operation, validate_path
-from tasks.operations.core_tasks import handle_phase_a
-from tasks.business.business_tasks import handle_phase_b, router as business_router
-from models import TaskRequest, TaskResponse
+from llm.parser import parse_task, parse_tasks
+from utils.security import check_restricted, secure_operation, validate_path
+from utils.file_ops import archive_members, check_archive_source
+from utils.file_response import file_response
+from utils.metrics import REGISTRY, TASK_PHASE_SECONDS
+from utils.profiling import get_profile_store
+from tasks.business.business_tasks import router as business_router
+from tasks.batch import run_batch
+from tasks.dispatch import get_dispatcher
+from tasks.registry import preload_operations
+from tasks.business.image_batch import get_image_processor
+from tasks.jobs import get_job_queue
+from models import BatchRequest, TaskRequest, TaskResponse
+from config import settings
 import mimetypes
-from tasks.exceptions import TaskExecutionError, TaskParsingError
+from tasks.exceptions import TaskExecutionError, TaskParsingError, TaskRejectedError
 import logging
 import sys
 import os
+import time
+from urllib.parse import quote
 
 # Configure logging
 logging.basicConfig(
@@ -33,54 +45,179 @@ async def startup_event():
     logger.info("Python path: %s", sys.path)
     logger.info("Current working directory: %s", os.getcwd())
     logger.info("API endpoints initialized")
-Write-Host "🔍 Debugging server connection..."
-
-# Stop any existing containers
-Write-Host "1. Cleaning up existing containers..."
-podman stop dataworks-agent 2>$null
-podman rm dataworks-agent 2>$null
-
-# Start container in interactive mode
-Write-Host "2. Starting container with verbose logging..."
-podman run `
-    --name dataworks-agent `
-    -p 8000:8000 `
-    -e AIPROXY_TOKEN="$env:AIPROXY_TOKEN" `
-    -e PYTHONUNBUFFERED=1 `
-    -e LOG_LEVEL=DEBUG `
-    -v "${PWD}/test-data:/data" `
-    localhost/dataworks-agent
+    dispatcher = get_dispatcher()
+    if settings.dispatch.preload_operations:
+        preload_operations(settings.dispatch.preload_operations)
+        logger.info("Preloaded operations: %s", ", ".join(sorted(settings.dispatch.preload_operations)))
+    if settings.embedding.preload and "A9" not in dispatcher.cpu_bound_operations:
+        from tasks.operations.embeddings import get_embedding_engine
+        get_embedding_engine().warm()
+        logger.info("Embedding model %s loaded", settings.embedding.model_name)
+    if dispatcher.worker_preload or dispatcher.warm_embeddings:
+        # The worker initializer does the same preloading in each process
+        dispatcher.start_workers()
+        logger.info("Started %d warm worker processes", dispatcher.process_workers)
+    get_job_queue().start(dispatcher, settings.jobs.workers)
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await get_job_queue().stop()
+    get_dispatcher().shutdown()
+    get_image_processor().shutdown()
+
+async def dispatch_profiled(task_details: dict, mode: str, response: Response) -> dict:
+    """Dispatch with the handler profiled; the profile ID is returned in X-Profile-Id"""
+    store = get_profile_store()
+    profile_id, path = store.new_profile(mode)
+    started = time.perf_counter()
+    error = None
+    try:
+        return await get_dispatcher().dispatch(task_details, profile=(mode, path, store.interval))
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        # No profile is written when the task is rejected or answered from the run ledger
+        if path.exists():
+            store.save_metadata(profile_id, mode, task_details, time.perf_counter() - started, error)
+            response.headers["X-Profile-Id"] = profile_id
+
+def profile_headers(response: Response) -> Optional[dict]:
+    """Carry X-Profile-Id over to an error response, which doesn't use response's headers"""
+    profile_id = response.headers.get("X-Profile-Id")
+    return {"X-Profile-Id": profile_id} if profile_id else None
+
 @app.post("/run", response_model=TaskResponse)  # Add response model
 @secure_operation
-async def run_task(task: str = Query(..., description="Task description to execute")):
+async def run_task(
+    response: Response,
+    task: str = Query(..., description="Task description to execute"),
+    no_cache: bool = Query(False, description="Bypass the parse cache"),
+    run_async: bool = Query(False, alias="async", description="Queue the task and return a job ID"),
+    x_profile: Optional[str] = Header(None, description="Profile this run (debug only): sampling or cprofile")
+):
     try:
         # Parse natural language task
-        task_details = parse_task(task)
+        started = time.perf_counter()
+        try:
+            task_details = await parse_task(task, use_cache=not no_cache)
+        except Exception:
+            TASK_PHASE_SECONDS.observe(time.perf_counter() - started, "unknown", "parse")
+            raise
+        TASK_PHASE_SECONDS.observe(time.perf_counter() - started, task_details.get('operation', 'unknown'), "parse")
+        
+        if run_async:
+            job_id, created = get_job_queue().enqueue(task_details, task)
+            response.status_code = 202
+            return {"status": "queued", "result": {"job_id": job_id, "deduplicated": not created}}
         
-        # Execute task
-        if task_details['phase'] == 'A':
-            result = handle_phase_a(task_details)
-        elif task_details['phase'] == 'B':
-            result = handle_phase_b(task_details)
+        # Execute task off the event loop, under a profiler if requested or sampled
+        profile_mode = get_profile_store().choose(x_profile)
+        if profile_mode is None:
+            result = await get_dispatcher().dispatch(task_details)
         else:
-            raise ValueError(f"Unknown phase: {task_details['phase']}")
+            result = await dispatch_profiled(task_details, profile_mode, response)
             
         return result
     except TaskParsingError as e:
         raise HTTPException(status_code=400, detail=str(e))
+    except TaskRejectedError as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=str(e),
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except TaskExecutionError as e:
-        raise HTTPException(status_code=500, detail=str(e))
+        raise HTTPException(status_code=500, detail=str(e), headers=profile_headers(response))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Unexpected error: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Unexpected error: {str(e)}",
+            headers=profile_headers(response)
+        )
+
+@app.post("/run/batch", response_model=TaskResponse)
+async def run_batch_tasks(
+    batch: BatchRequest,
+    no_cache: bool = Query(False, description="Bypass the parse cache")
+):
+    """Parse tasks in one LLM call and run them, in parallel where their files don't overlap"""
+    if not batch.tasks:
+        raise HTTPException(status_code=400, detail="No tasks given")
+    if len(batch.tasks) > settings.batch.max_tasks:
+        raise HTTPException(status_code=413, detail=f"At most {settings.batch.max_tasks} tasks per batch")
+    for task in batch.tasks:
+        check_restricted(task)
+
+    started = time.perf_counter()
+    try:
+        tasks = await parse_tasks(batch.tasks, use_cache=not no_cache)
+    except TaskParsingError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    parse_seconds = time.perf_counter() - started
+
+    reports = await run_batch(get_dispatcher(), tasks, settings.batch.max_parallel,
+                              settings.batch.max_rejections)
+    for task, report in zip(batch.tasks, reports):
+        report["task"] = task
+    return {
+        "status": "success" if all(r["status"] == "success" for r in reports) else "partial",
+        "result": {
+            "tasks": reports,
+            "parse_seconds": round(parse_seconds, 4),
+            "seconds": round(time.perf_counter() - started, 4)
+        }
+    }
+
+@app.get("/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Status, result and timings of a job queued with /run?async=true"""
+    job = get_job_queue().get(job_id)
+    if job is None:
+        raise HTTPException(404, detail="Job not found")
+    return job
 
 @app.get("/read")
-async def read_file(path: str = Query(..., description="Path to file")):
+async def read_file(request: Request, path: str = Query(..., description="Path to file")):
     file_path = DATA_DIR / path.lstrip('/')
     if not validate_path(file_path):
         raise HTTPException(403, "Access denied")
-    if not file_path.exists():
+    if not file_path.is_file():
         raise HTTPException(404, detail="File not found")
-    return file_path.read_text()
+    return file_response(request, file_path, settings.security.max_file_size)
+
+@app.get("/archive")
+async def archive_directory(path: str = Query(..., description="Directory to archive")):
+    """Stream a directory as a ZIP, compressed while it is sent"""
+    dir_path = DATA_DIR / path.lstrip('/')
+    check_archive_source(dir_path)
+    from utils.archive import ParallelZipBuilder
+    members = await run_in_threadpool(archive_members, dir_path)
+    filename = quote(f"{dir_path.name or 'data'}.zip")
+    return StreamingResponse(
+        ParallelZipBuilder().iter_archive(dir_path, members),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename*=UTF-8''{filename}"}
+    )
+
+@app.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("text", description="text, pstats or collapsed stacks")
+):
+    """A stored /run profile (debug only); collapsed stacks feed flamegraph.pl or speedscope"""
+    if not settings.debug:
+        raise HTTPException(404, detail="Profiles are only served in debug mode")
+    rendered = get_profile_store().render(profile_id, format)
+    if rendered is None:
+        raise HTTPException(404, detail="Profile not found in that format")
+    body, media_type = rendered
+    return Response(body, media_type=media_type)
+
+@app.get("/metrics")
+async def metrics():
+    """Metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
 
 @app.get("/health")
 async def health_check():
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict
+from typing import Optional, Dict, List
 
 class TaskRequest(BaseModel):
     task: str
@@ -8,4 +8,6 @@ class TaskRequest(BaseModel):
 class TaskResponse(BaseModel):
     status: str
     result: Optional[Dict] = None
-    
\ No newline at end of file
+
+class BatchRequest(BaseModel):
+    tasks: List[str]
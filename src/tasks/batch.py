@@ -0,0 +1,104 @@
+"""
+Runs a batch of parsed tasks as a DAG inferred from the files they read and write.
+"""
+
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+from .dispatch import TaskDispatcher
+from .exceptions import TaskRejectedError
+from .paths import data_path
+from .registry import OPERATIONS, resolve_paths
+
+
+def task_files(task_details: Dict[str, Any]) -> Tuple[Set[Path], Set[Path]]:
+    """(reads, writes) of a task: its declared paths plus its input_path/output_path"""
+    reads: Set[Path] = set()
+    writes: Set[Path] = set()
+    if task_details.get('operation') in OPERATIONS:
+        inputs, outputs = resolve_paths(task_details['operation'], task_details)
+        reads.update(inputs)
+        writes.update(outputs)
+    for field, paths in (('input_path', reads), ('output_path', writes)):
+        value = task_details.get(field)
+        path = data_path(value) if isinstance(value, str) else None
+        if path is not None:
+            paths.add(path)
+    # Normalise "a/./b" and "a/../b" so different spellings of a file match
+    return {Path(os.path.normpath(p)) for p in reads}, {Path(os.path.normpath(p)) for p in writes}
+
+
+def _overlaps(a: Set[Path], b: Set[Path]) -> bool:
+    """True if a path in a is, contains or is inside a path in b (e.g. docs/ and docs/x.md)"""
+    return any(x == y or x in y.parents or y in x.parents for x in a for y in b)
+
+
+def plan(tasks: List[Dict[str, Any]]) -> List[List[int]]:
+    """Indices each task must wait for.
+
+    A task depends on every earlier task that writes a file it reads or
+    writes, or that reads a file it writes, so submission order is kept
+    wherever two tasks touch the same data.
+    """
+    files = [task_files(task_details) for task_details in tasks]
+    dependencies = []
+    for j, (reads_j, writes_j) in enumerate(files):
+        dependencies.append([
+            i for i, (reads_i, writes_i) in enumerate(files[:j])
+            if _overlaps(writes_i, reads_j | writes_j) or _overlaps(reads_i, writes_j)
+        ])
+    return dependencies
+
+
+async def run_batch(dispatcher: TaskDispatcher, tasks: List[Dict[str, Any]],
+                    max_parallel: int, max_rejections: int) -> List[Dict[str, Any]]:
+    """Dispatch tasks as their dependencies finish; one report per task, in order.
+
+    Tasks whose dependencies failed are not run. A task rejected by a
+    saturated dispatcher waits Retry-After and tries again up to
+    max_rejections times.
+    """
+    dependencies = plan(tasks)
+    done = [asyncio.Event() for _ in tasks]
+    reports: List[Dict[str, Any]] = [
+        {"index": i, "operation": task_details.get('operation'), "depends_on": dependencies[i]}
+        for i, task_details in enumerate(tasks)
+    ]
+    slots = asyncio.Semaphore(max_parallel)
+    batch_started = time.perf_counter()
+
+    async def run(i: int) -> None:
+        report = reports[i]
+        try:
+            for dependency in dependencies[i]:
+                await done[dependency].wait()
+            failed = [d for d in dependencies[i] if reports[d]["status"] != "success"]
+            if failed:
+                report.update(status="cancelled", error=f"Dependencies failed: {failed}")
+                return
+
+            async with slots:
+                report["started_seconds"] = round(time.perf_counter() - batch_started, 4)
+                started = time.perf_counter()
+                rejections = 0
+                while True:
+                    try:
+                        result = await dispatcher.dispatch(tasks[i])
+                        break
+                    except TaskRejectedError as e:
+                        rejections += 1
+                        if rejections > max_rejections:
+                            raise
+                        await asyncio.sleep(e.retry_after)
+                report["seconds"] = round(time.perf_counter() - started, 4)
+            report.update(status="success", result=result)
+        except Exception as e:
+            report.update(status="failed", error=str(e))
+        finally:
+            done[i].set()
+
+    await asyncio.gather(*(run(i) for i in range(len(tasks))))
+    return reports
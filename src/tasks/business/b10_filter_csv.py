@@ -0,0 +1,108 @@
+"""
+B10: filter a CSV and stream matching rows (served by /api/v1/filter-csv).
+"""
+
+import itertools
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from fastapi import HTTPException
+import pandas as pd
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+from config import settings
+from tasks.paths import data_path
+from utils.security import validate_path
+from .columnar_cache import get_columnar_cache, iter_filtered_parquet
+from .csv_filter import Predicate, csv_columns, iter_filtered, parse_predicate, stream_json
+
+logger = logging.getLogger(__name__)
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    return {"status": "success", "message": "Use /api/v1/filter-csv endpoint"}
+
+
+async def _started(frames: Iterator[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """Run the query up to its first frame, so its errors surface before the status is sent"""
+    first = await run_in_threadpool(next, frames, None)
+    return frames if first is None else itertools.chain([first], frames)
+
+
+async def filter_csv_response(
+    file_path: str,
+    column: Optional[str],
+    value: Optional[str],
+    where: List[str],
+    columns: Optional[str],
+    limit: Optional[int],
+    offset: int,
+    cursor: Optional[int],
+    row_numbers: bool,
+    format: str
+) -> StreamingResponse:
+    """Validate a /filter-csv request and stream the matching rows"""
+    try:
+        path = data_path(file_path)
+        if not validate_path(path):
+            raise HTTPException(status_code=403, detail="Access denied")
+        if not path.exists():
+            raise HTTPException(status_code=404, detail="File not found")
+
+        predicates = [parse_predicate(expression) for expression in where]
+        if column is not None:
+            predicates.append(Predicate(column, "==", value or ""))
+        projection = [name.strip() for name in columns.split(",")] if columns else None
+
+        # Validate up front; errors can't change the status once streaming starts
+        header = set(csv_columns(path))
+        unknown = {p.column for p in predicates} | set(projection or [])
+        unknown -= header
+        if unknown:
+            raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}")
+
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+    frames = None
+    # Row numbers only exist in the CSV itself, so cursors always read it directly
+    if settings.csv_filter.cache_enabled and cursor is None and not row_numbers:
+        try:
+            parquet_path = await run_in_threadpool(get_columnar_cache().get, path)
+            frames = await _started(iter_filtered_parquet(
+                parquet_path,
+                predicates,
+                columns=projection,
+                limit=limit,
+                offset=offset,
+                chunk_rows=settings.csv_filter.chunk_rows
+            ))
+        except Exception:
+            logger.exception("Parquet cache unavailable for %s, reading CSV", path)
+
+    if frames is None:
+        try:
+            frames = await _started(iter_filtered(
+                path,
+                predicates,
+                columns=projection,
+                limit=limit,
+                offset=offset,
+                after_row=cursor,
+                row_numbers=row_numbers,
+                chunk_rows=settings.csv_filter.chunk_rows
+            ))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+    ndjson = format == "ndjson"
+    return StreamingResponse(
+        stream_json(frames, ndjson=ndjson),
+        media_type="application/x-ndjson" if ndjson else "application/json"
+    )
@@ -0,0 +1,20 @@
+"""
+B3: fetch data from an API and save it.
+"""
+
+from typing import Any, Dict
+
+from tasks.paths import data_path
+from utils.http_client import get_http_client
+from utils.security import validate_path
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    output_path = data_path(task_details['output_path'])
+    if not validate_path(output_path):
+        raise ValueError("Invalid output path")
+
+    download = get_http_client().download(task_details['parameters']['api_url'], output_path)
+    if download["not_modified"]:
+        return {"status": "success", "message": "Unchanged since last fetch", "result": download}
+    return {"status": "success", "message": "API data saved successfully", "result": download}
@@ -0,0 +1,47 @@
+"""
+B4: write files into a cached clone of a git repo and commit them together.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from utils.security import validate_path
+from .git_workspace import get_git_workspaces
+
+
+def _files(parameters: Dict[str, Any]) -> List[Tuple[str, str]]:
+    """(relative path, content) pairs from "files" and/or the single file_path/content"""
+    files = [(f['path'], f['content']) for f in parameters.get('files') or []]
+    if parameters.get('file_path'):
+        files.append((parameters['file_path'], parameters['content']))
+    return files
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = task_details['parameters']
+    if not parameters.get('repo_url'):
+        return {"status": "success", "message": "Git operations completed"}
+
+    files = _files(parameters)
+    if not files:
+        raise ValueError("No files to commit")
+
+    with get_git_workspaces().workspace(parameters['repo_url']) as repo:
+        repo_path = Path(repo.working_tree_dir)
+        targets = []
+        for relative, content in files:
+            file_path = repo_path / relative
+            if not validate_path(file_path) or not file_path.resolve().is_relative_to(repo_path.resolve()):
+                raise ValueError("Invalid file path for git operations")
+            targets.append((file_path, content))
+        commit = get_git_workspaces().commit_files(repo, targets, parameters['commit_message'])
+        refresh_error = get_git_workspaces().refresh_error(parameters['repo_url'])
+
+    result = {"repo_path": str(repo_path), "commit": commit, "files": len(targets)}
+    if refresh_error:
+        result["refresh_error"] = refresh_error
+    return {
+        "status": "success",
+        "message": "Git operations completed" if commit else "No changes to commit",
+        "result": result
+    }
@@ -0,0 +1,33 @@
+"""
+B5: run a read-only SQL query and export the result as CSV.
+"""
+
+from typing import Any, Dict
+
+from config import settings
+from tasks.paths import data_path
+from utils.security import validate_path
+from .query_engine import get_query_engine
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    db_path = data_path(task_details['parameters']['db_path'])
+    if not validate_path(db_path):
+        raise ValueError("Invalid database path")
+
+    query = task_details['parameters']['query']
+    if any(op.lower() in query.lower()
+           for op in settings.security.restricted_operations):
+        raise ValueError("Query contains restricted operations")
+
+    output_path = data_path(task_details['output_path'])
+    if not validate_path(output_path):
+        raise ValueError("Invalid output path")
+
+    # Read-only pooled connection, streamed straight to the CSV
+    rows = get_query_engine().export_csv(db_path, query, output_path)
+    return {
+        "status": "success",
+        "message": "Query executed successfully",
+        "result": {"rows": rows}
+    }
@@ -0,0 +1,20 @@
+"""
+B6: scrape a web page and save it.
+"""
+
+from typing import Any, Dict
+
+from tasks.paths import data_path
+from utils.http_client import get_http_client
+from utils.security import validate_path
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    output_path = data_path(task_details['output_path'])
+    if not validate_path(output_path):
+        raise ValueError("Invalid output path")
+
+    download = get_http_client().download(task_details['parameters']['url'], output_path)
+    if download["not_modified"]:
+        return {"status": "success", "message": "Unchanged since last fetch", "result": download}
+    return {"status": "success", "message": "Website data scraped successfully", "result": download}
@@ -0,0 +1,66 @@
+"""
+B7: resize or compress one image or a batch on the image worker pool.
+"""
+
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+from config import settings
+from tasks.paths import DATA_DIR, data_path
+from utils.security import validate_path
+from .image_batch import get_image_processor
+
+
+def image_jobs(task_details: Dict[str, Any]) -> List[Tuple[Path, Path]]:
+    """(input, output) pairs from a single path, a glob or parameters.inputs"""
+    input_path = task_details.get('input_path') or ''
+    inputs = task_details.get('parameters', {}).get('inputs')
+    batch = bool(inputs) or any(char in input_path for char in '*?[')
+    if inputs:
+        input_paths = [data_path(path) for path in inputs]
+    elif batch:
+        input_paths = sorted(DATA_DIR.glob(input_path.lstrip('/')))
+    else:
+        input_paths = [data_path(input_path)]
+
+    if len(input_paths) > settings.image.max_batch:
+        raise ValueError(f"Too many images ({len(input_paths)}), limit is {settings.image.max_batch}")
+
+    output_path = data_path(task_details['output_path'])
+    if batch:
+        # Several inputs: output_path is a directory, and each image keeps its
+        # path below the inputs' common directory so equal names don't collide
+        sources = [Path(os.path.normpath(path)) for path in input_paths]
+        base = Path(os.path.commonpath([path.parent for path in sources])) if sources else None
+        jobs = [(path, output_path / source.relative_to(base)) for path, source in zip(input_paths, sources)]
+    else:
+        jobs = [(input_paths[0], output_path)]
+
+    for source, target in jobs:
+        if not validate_path(source) or not validate_path(target):
+            raise ValueError("Invalid input or output path")
+    if batch:
+        targets = [os.path.normpath(target) for _, target in jobs]
+        if len(set(targets)) < len(targets):
+            raise ValueError("Several inputs would be written to the same output")
+        output_path.mkdir(parents=True, exist_ok=True)
+        for _, target in jobs:
+            target.parent.mkdir(parents=True, exist_ok=True)
+    return jobs
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = task_details.get('parameters', {})
+    results = get_image_processor().run(
+        image_jobs(task_details),
+        resize=parameters.get('resize'),
+        quality=parameters.get('compress'),
+        force=parameters.get('force', False)
+    )
+    processed = sum(not image['skipped'] for image in results)
+    return {
+        "status": "success",
+        "message": f"Processed {processed} of {len(results)} images",
+        "result": {"images": results}
+    }
@@ -0,0 +1,31 @@
+"""
+B8: transcribe audio with a resident Whisper model.
+"""
+
+from typing import Any, Dict
+
+from config import settings
+from tasks.paths import data_path
+from utils.security import validate_path
+from .transcription import get_transcription_service
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    input_path = data_path(task_details['input_path'])
+    output_path = data_path(task_details['output_path'])
+
+    if not validate_path(input_path) or not validate_path(output_path):
+        raise ValueError("Invalid input or output path")
+
+    # The model size comes from the parsed task, so only configured sizes may load
+    model_size = (task_details.get('parameters') or {}).get('model') or settings.transcription.model_size
+    if model_size not in settings.transcription.allowed_models:
+        raise ValueError(f"Whisper model {model_size!r} is not allowed")
+
+    # Runs on the transcription pool with a resident model; the client polls for progress
+    job = get_transcription_service().submit(input_path, output_path, model_size)
+    return {
+        "status": "success",
+        "message": "Transcription started",
+        "result": {"job_id": job.id, "status_url": f"/api/v1/transcriptions/{job.id}"}
+    }
@@ -0,0 +1,26 @@
+"""
+B9: convert Markdown to HTML.
+"""
+
+from typing import Any, Dict
+
+import markdown
+
+from tasks.paths import data_path
+from utils.file_ops import atomic_write
+from utils.security import validate_path
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    input_path = data_path(task_details['input_path'])
+    output_path = data_path(task_details['output_path'])
+
+    if not validate_path(input_path) or not validate_path(output_path):
+        raise ValueError("Invalid input or output path")
+
+    md_content = input_path.read_text()
+    html_content = markdown.markdown(md_content)
+    with atomic_write(output_path) as f:
+        f.write(html_content)
+
+    return {"status": "success", "message": "Markdown converted successfully"}
@@ -0,0 +1,241 @@
+"""
+Parquet sidecar cache answering repeated /filter-csv queries from a columnar copy.
+"""
+
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import duckdb
+import pandas as pd
+
+from config import settings
+from utils.metrics import REGISTRY
+from .csv_filter import Predicate, parse_number
+
+# pandas' default NA markers, so both paths see the same missing values
+NULL_STRINGS = [
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND", "1.#QNAN",
+    "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null"
+]
+# Spellings pandas' CSV parser reads as booleans, integers and floats
+TRUE_STRINGS = ["True", "TRUE", "true"]
+FALSE_STRINGS = ["False", "FALSE", "false"]
+INT_PATTERN = r"[+-]?[0-9]+"
+FLOAT_PATTERN = r"[+-]?([0-9]+(\.[0-9]*)?|\.[0-9]+)([eE][+-]?[0-9]+)?|[+-]?(?i:inf|infinity)"
+# Bumped when the conversion changes, so older sidecars are rebuilt
+FORMAT_VERSION = 2
+SQL_OPERATORS = {"==": "=", "=": "=", "!=": "<>", ">=": ">=", "<=": "<=", ">": ">", "<": "<"}
+
+
+def _quote_identifier(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _quote_literal(value: str) -> str:
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _literal_list(values: List[str]) -> str:
+    return ", ".join(_quote_literal(value) for value in values)
+
+
+def _as_number(column: str) -> str:
+    """Text cell as DOUBLE the way pd.to_numeric(errors="coerce") reads it"""
+    return (f"CASE WHEN regexp_full_match(trim({column}), {_quote_literal(FLOAT_PATTERN)}) "
+            f"THEN CAST(trim({column}) AS DOUBLE) END")
+
+
+def _typed_columns(conn: Any, source: str) -> List[str]:
+    """SELECT list giving each all-VARCHAR column the type pd.read_csv would infer.
+
+    Columns of only boolean spellings become BOOLEAN, integers without gaps
+    BIGINT, numbers (or nothing at all) DOUBLE, anything else stays VARCHAR.
+    """
+    names = [row[0] for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()]
+    if not names:
+        return []
+    checks = []
+    for name in names:
+        column = _quote_identifier(name)
+        checks += [
+            f"count({column})",
+            f"count(*) - count({column})",
+            f"bool_and({column} IN ({_literal_list(TRUE_STRINGS + FALSE_STRINGS)}))",
+            f"bool_and(regexp_full_match(trim({column}), {_quote_literal(INT_PATTERN)}))",
+            f"bool_and(regexp_full_match(trim({column}), {_quote_literal(FLOAT_PATTERN)}))"
+        ]
+    row = conn.execute(f"SELECT {', '.join(checks)} FROM {source}").fetchone()
+
+    selects = []
+    for i, name in enumerate(names):
+        values, nulls, booleans, integers, floats = row[5 * i:5 * i + 5]
+        column = _quote_identifier(name)
+        if not values:
+            typed = "CAST(NULL AS DOUBLE)"
+        elif booleans:
+            typed = (f"CASE WHEN {column} IN ({_literal_list(TRUE_STRINGS)}) THEN true "
+                     f"WHEN {column} IS NOT NULL THEN false END")
+        elif integers and not nulls:
+            typed = f"CAST(trim({column}) AS BIGINT)"
+        elif floats:
+            typed = f"CAST(trim({column}) AS DOUBLE)"
+        else:
+            typed = column
+        selects.append(f"{typed} AS {column}")
+    return selects
+
+
+class ColumnarCache:
+    """Converts CSVs to Parquet on first query, keyed by path + mtime + size.
+
+    Cells are read as text and typed with pandas' inference rules, so the
+    copy holds the same values the CSV path parses. A changed CSV gets a new
+    key and its stale sidecar is removed. The cache directory is kept under
+    max_bytes by evicting the least recently used files.
+    """
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._locks: Dict[str, threading.Lock] = {}
+        self._lock = threading.Lock()
+
+    def _path_key(self, csv_path: Path) -> str:
+        return hashlib.sha256(str(csv_path.resolve()).encode()).hexdigest()[:16]
+
+    def get(self, csv_path: Path) -> Path:
+        """Return an up-to-date Parquet copy of csv_path, converting if needed"""
+        stat = csv_path.stat()
+        path_key = self._path_key(csv_path)
+        entry = self.cache_dir / f"{path_key}-{stat.st_mtime_ns}-{stat.st_size}-v{FORMAT_VERSION}.parquet"
+
+        with self._lock:
+            lock = self._locks.setdefault(path_key, threading.Lock())
+        with lock:
+            if entry.exists():
+                os.utime(entry)  # Mark as recently used
+                self.hits += 1
+                return entry
+
+            self.misses += 1
+            for stale in self.cache_dir.glob(f"{path_key}-*.parquet"):
+                stale.unlink(missing_ok=True)
+
+            tmp_path = entry.with_suffix(".tmp")
+            source = (
+                f"read_csv({_quote_literal(str(csv_path))}, all_varchar = true, header = true, "
+                f"delim = ',', quote = '\"', escape = '\"', nullstr = [{_literal_list(NULL_STRINGS)}])"
+            )
+            with duckdb.connect() as conn:
+                selects = _typed_columns(conn, source)
+                conn.execute(
+                    f"COPY (SELECT {', '.join(selects) or '*'} FROM {source}) "
+                    f"TO {_quote_literal(str(tmp_path))} (FORMAT PARQUET)"
+                )
+            os.replace(tmp_path, entry)
+
+        self._evict(keep=entry)
+        return entry
+
+    def _evict(self, keep: Path) -> None:
+        entries = []
+        for path in self.cache_dir.glob("*.parquet"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if path != keep:
+                path.unlink(missing_ok=True)
+                total -= size
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses}
+
+
+def _where_clause(predicates: List[Predicate], types: Dict[str, str]) -> Tuple[str, list]:
+    """Translate predicates to SQL matching csv_filter.predicate_mask on the typed columns"""
+    conditions, params = [], []
+    for predicate in predicates:
+        column = _quote_identifier(predicate.column)
+        column_type = types[predicate.column]
+        op = SQL_OPERATORS[predicate.op]
+        number = parse_number(predicate.value)
+        if number is not None:
+            if column_type == "VARCHAR":
+                column = _as_number(column)
+            elif column_type == "BOOLEAN":
+                column = f"CAST({column} AS DOUBLE)"
+            if op == "<>":
+                # NaN != x holds in pandas, so missing cells match
+                conditions.append(f"({column} <> ? OR {column} IS NULL)")
+            else:
+                conditions.append(f"{column} {op} ?")
+            params.append(number)
+        else:
+            # Compare with the text str() gives for the parsed value, e.g. 'True' or '3.0'
+            if column_type == "BOOLEAN":
+                column = f"CASE WHEN {column} THEN 'True' WHEN NOT {column} THEN 'False' END"
+            elif column_type != "VARCHAR":
+                column = f"CAST({column} AS VARCHAR)"
+            conditions.append(f"{column} {op} ?")
+            params.append(predicate.value)
+    return (" WHERE " + " AND ".join(conditions)) if conditions else "", params
+
+
+def iter_filtered_parquet(
+    parquet_path: Path,
+    predicates: List[Predicate],
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    chunk_rows: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """Yield matching rows from the Parquet copy with filters pushed down to the scan"""
+    source = f"read_parquet({_quote_literal(str(parquet_path))})"
+    with duckdb.connect() as conn:
+        types = {row[0]: row[1] for row in conn.execute(f"DESCRIBE SELECT * FROM {source}").fetchall()}
+        where, params = _where_clause(predicates, types)
+        projection = ", ".join(_quote_identifier(c) for c in columns) if columns else "*"
+
+        query = f"SELECT {projection} FROM {source}{where}"
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        if offset:
+            query += f" OFFSET {int(offset)}"
+
+        result = conn.execute(query, params)
+        while True:
+            rows = result.fetchmany(chunk_rows)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=[d[0] for d in result.description])
+
+
+_cache: Optional[ColumnarCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_columnar_cache() -> ColumnarCache:
+    """Return the process-wide Parquet sidecar cache"""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = ColumnarCache(
+                    settings.cache_dir / "parquet",
+                    settings.csv_filter.cache_max_bytes
+                )
+                REGISTRY.register_cache("parquet", _cache.stats)
+    return _cache
@@ -0,0 +1,130 @@
+"""
+Streaming CSV filtering for the B10 /filter-csv endpoint.
+"""
+
+import operator
+import re
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional
+
+import pandas as pd
+
+OPERATORS: Dict[str, Callable] = {
+    "==": operator.eq,
+    "=": operator.eq,
+    "!=": operator.ne,
+    ">=": operator.ge,
+    "<=": operator.le,
+    ">": operator.gt,
+    "<": operator.lt
+}
+PREDICATE_PATTERN = re.compile(r"^\s*(?P<column>.+?)\s*(?P<op>==|!=|>=|<=|=|>|<)\s*(?P<value>.*?)\s*$")
+
+
+class Predicate(NamedTuple):
+    column: str
+    op: str
+    value: str
+
+
+def parse_predicate(expression: str) -> Predicate:
+    """Parse 'column<op>value', e.g. 'price>=10' or 'city==Paris'"""
+    match = PREDICATE_PATTERN.match(expression)
+    if not match:
+        raise ValueError(f"Invalid filter expression: {expression}")
+    return Predicate(match["column"], match["op"], match["value"])
+
+
+def parse_number(value: str) -> Optional[float]:
+    try:
+        return float(value)
+    except ValueError:
+        return None
+
+
+def predicate_mask(frame: pd.DataFrame, predicate: Predicate) -> pd.Series:
+    """Compare numerically when the value is a number, otherwise as text"""
+    compare = OPERATORS[predicate.op]
+    series = frame[predicate.column]
+    number = parse_number(predicate.value)
+    if number is not None:
+        # Non-numeric cells become NaN and never match
+        return compare(pd.to_numeric(series, errors="coerce"), number)
+    return compare(series.astype(str), predicate.value) & series.notna()
+
+
+def csv_columns(path: Path) -> List[str]:
+    """Header of a CSV file without reading its rows"""
+    return list(pd.read_csv(path, nrows=0).columns)
+
+
+def iter_filtered(
+    path: Path,
+    predicates: List[Predicate],
+    columns: Optional[List[str]] = None,
+    limit: Optional[int] = None,
+    offset: int = 0,
+    after_row: Optional[int] = None,
+    row_numbers: bool = False,
+    chunk_rows: int = 100_000
+) -> Iterator[pd.DataFrame]:
+    """Yield matching rows chunk by chunk; rows are numbered from 0 in file order"""
+    usecols = None
+    if columns:
+        usecols = list(dict.fromkeys(columns + [p.column for p in predicates]))
+
+    # Rows before a cursor are parsed and dropped rather than skipped as lines,
+    # since quoted fields can span several lines
+    first_row = 0 if after_row is None else after_row + 1
+    reader = pd.read_csv(path, usecols=usecols, chunksize=chunk_rows)
+
+    to_skip = offset
+    remaining = limit
+    with reader:
+        for chunk in reader:
+            if remaining is not None and remaining <= 0:
+                break
+            # Chunk indexes continue across chunks, so they are record numbers
+            if first_row:
+                if chunk.index[-1] < first_row:
+                    continue
+                chunk = chunk[chunk.index >= first_row]
+
+            mask = pd.Series(True, index=chunk.index)
+            for predicate in predicates:
+                mask &= predicate_mask(chunk, predicate)
+            matched = chunk[mask]
+
+            if to_skip:
+                skipped = min(to_skip, len(matched))
+                matched = matched.iloc[skipped:]
+                to_skip -= skipped
+            if remaining is not None:
+                matched = matched.iloc[:remaining]
+                remaining -= len(matched)
+            if matched.empty:
+                continue
+
+            if columns:
+                matched = matched[columns]
+            if row_numbers:
+                matched = matched.copy()
+                matched.insert(0, "_row", matched.index)
+            yield matched
+
+
+def stream_json(frames: Iterator[pd.DataFrame], ndjson: bool = False) -> Iterator[bytes]:
+    """Encode frames as NDJSON lines or as a single JSON array, one chunk at a time"""
+    if not ndjson:
+        yield b"["
+    first = True
+    for frame in frames:
+        lines = frame.to_json(orient="records", lines=True).rstrip("\n")
+        if ndjson:
+            yield (lines + "\n").encode()
+        else:
+            # JSON escapes newlines inside strings, so each line is one record
+            yield (("" if first else ",") + lines.replace("\n", ",")).encode()
+        first = False
+    if not ndjson:
+        yield b"]"
@@ -0,0 +1,141 @@
+"""
+Cached shallow clones for B4, one working tree per remote URL.
+"""
+
+import fcntl
+import hashlib
+import logging
+import re
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Sequence, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def workspace_name(url: str) -> str:
+    """Readable, collision-free directory name for a remote URL"""
+    stem = re.sub(r"\.git$", "", url.rstrip("/").rsplit("/", 1)[-1].rsplit(":", 1)[-1])
+    stem = re.sub(r"[^\w.-]", "_", stem) or "repo"
+    return f"{stem}-{hashlib.sha256(url.encode()).hexdigest()[:12]}"
+
+
+class GitWorkspaceManager:
+    """Keeps a shallow, blobless clone per URL and serialises access to each.
+
+    A thread lock orders requests within this process and an flock on a
+    sibling .lock file orders them across worker processes. An existing
+    clone is brought up to date with an incremental fetch, at most once every
+    fetch_interval seconds, instead of being cloned again. If the fetched
+    branch can't be fast-forwarded onto, the clone is used as it is and
+    refresh_error() says why.
+    """
+
+    def __init__(self, root: Path, depth: int, blob_filter: Optional[str], fetch_interval: float):
+        self.root = root
+        self.depth = depth
+        self.blob_filter = blob_filter
+        self.fetch_interval = fetch_interval
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_lock = threading.Lock()
+        self._fetched: Dict[str, float] = {}
+        self._refresh_errors: Dict[str, str] = {}
+
+    def _lock_for(self, name: str) -> threading.Lock:
+        with self._locks_lock:
+            return self._locks.setdefault(name, threading.Lock())
+
+    @contextmanager
+    def workspace(self, url: str) -> Iterator[Any]:
+        """Exclusive use of an up-to-date git.Repo for url"""
+        import git
+
+        name = workspace_name(url)
+        path = self.root / name
+        self.root.mkdir(parents=True, exist_ok=True)
+        with self._lock_for(name), open(self.root / f"{name}.lock", "w") as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                if (path / ".git").is_dir():
+                    repo = git.Repo(path)
+                    self._refresh(repo, name)
+                else:
+                    repo = self._clone(git, url, path)
+                    self._fetched[name] = time.monotonic()
+                yield repo
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def refresh_error(self, url: str) -> Optional[str]:
+        """Why url's clone is behind its remote, or None; call inside workspace()"""
+        return self._refresh_errors.get(workspace_name(url))
+
+    def _clone(self, git: Any, url: str, path: Path) -> Any:
+        options: Dict[str, Any] = {"single_branch": True}
+        if self.depth > 0:
+            options["depth"] = self.depth
+        if self.blob_filter:
+            options["filter"] = self.blob_filter
+        partial = path.with_name(f".{path.name}.partial")
+        if partial.exists():
+            shutil.rmtree(partial)  # Left behind by an interrupted clone
+        git.Repo.clone_from(url, partial, **options)
+        partial.rename(path)
+        return git.Repo(path)
+
+    def _refresh(self, repo: Any, name: str) -> None:
+        last = self._fetched.get(name)
+        if last is not None and time.monotonic() - last < self.fetch_interval:
+            return
+        if not repo.remotes or repo.head.is_detached:
+            return
+        from git import GitCommandError
+
+        # No depth here: a depth-limited fetch cuts new commits off from the clone's
+        # history, so they can't be fast-forwarded onto. Without one, a shallow
+        # clone fetches just the commits since the ones it already has.
+        repo.remotes.origin.fetch(repo.active_branch.name)
+        try:
+            # Only moves forward; local commits that aren't upstream are kept
+            repo.git.merge("--ff-only", "FETCH_HEAD")
+            self._refresh_errors.pop(name, None)
+        except GitCommandError as e:
+            error = (e.stderr or str(e)).strip()
+            logger.warning("Could not fast-forward %s to its remote: %s", name, error)
+            self._refresh_errors[name] = f"Could not fast-forward to the remote: {error}"
+        self._fetched[name] = time.monotonic()
+
+    @staticmethod
+    def commit_files(repo: Any, files: Sequence[Tuple[Path, str]], message: str) -> Optional[str]:
+        """Write files and commit them together; returns the commit SHA, or None if nothing changed"""
+        for path, content in files:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(content)
+        repo.index.add([str(path) for path, _ in files])
+        if repo.head.is_valid() and not repo.index.diff("HEAD"):
+            return None
+        return repo.index.commit(message).hexsha
+
+
+_manager: Optional[GitWorkspaceManager] = None
+_manager_lock = threading.Lock()
+
+
+def get_git_workspaces() -> GitWorkspaceManager:
+    """Return the process-wide git workspace manager"""
+    global _manager
+    if _manager is None:
+        with _manager_lock:
+            if _manager is None:
+                _manager = GitWorkspaceManager(
+                    settings.cache_dir / "git",
+                    depth=settings.git.depth,
+                    blob_filter=settings.git.blob_filter or None,
+                    fetch_interval=settings.git.fetch_interval
+                )
+    return _manager
@@ -0,0 +1,137 @@
+"""
+Batched image resize/compress (B7) on a process pool.
+"""
+
+import multiprocessing
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from config import settings
+from tasks.freshness import get_run_ledger
+from utils.file_ops import atomic_write
+
+REDUCING_GAP = 3.0  # Let resize() use reduce() first when shrinking by 3x or more
+JPEG_MODES = {"1", "L", "RGB", "CMYK"}
+
+
+def image_details(input_path: Path, resize: Optional[Tuple[int, int]],
+                  quality: Optional[int]) -> Dict[str, Any]:
+    """What one output depends on besides the input's contents, for the run ledger"""
+    return {
+        "operation": "B7",
+        "input_path": str(input_path),
+        "resize": list(resize) if resize else None,
+        "quality": quality
+    }
+
+
+def process_image(input_path: Path, output_path: Path, resize: Optional[Tuple[int, int]] = None,
+                  quality: Optional[int] = None) -> Dict[str, Any]:
+    """Runs in a worker process: resize and/or recompress one image; returns timings"""
+    from PIL import Image  # Only needed in the worker processes
+
+    started = time.perf_counter()
+    # The temp file's .tmp suffix hides the format, so take it from the real name
+    output_format = Image.registered_extensions().get(output_path.suffix.lower())
+    with Image.open(input_path) as img:
+        output_format = output_format or img.format
+        if resize:
+            # JPEG decodes at 1/2, 1/4 or 1/8 scale when that still covers the target size
+            img.draft(img.mode, tuple(resize))
+        img.load()
+        decoded = time.perf_counter()
+
+        if resize:
+            img = img.resize(tuple(resize), Image.Resampling.LANCZOS, reducing_gap=REDUCING_GAP)
+        if output_format == "JPEG" and img.mode not in JPEG_MODES:
+            img = img.convert("RGB")
+
+        options = {"quality": quality, "optimize": True} if quality else {}
+        with atomic_write(output_path, 'wb') as f:
+            img.save(f, format=output_format, **options)
+        size = img.size
+
+    finished = time.perf_counter()
+    return {
+        "input": str(input_path),
+        "output": str(output_path),
+        "size": list(size),
+        "decode_seconds": round(decoded - started, 4),
+        "seconds": round(finished - started, 4),
+        "skipped": False
+    }
+
+
+class ImageBatchProcessor:
+    """Fans image jobs out to a lazily started pool of spawned worker processes"""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(
+                    self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def run(self, jobs: Sequence[Tuple[Path, Path]], resize: Optional[Tuple[int, int]] = None,
+            quality: Optional[int] = None, force: bool = False) -> List[Dict[str, Any]]:
+        """Process (input, output) pairs, skipping up-to-date outputs unless force.
+
+        An output is up to date when the run ledger holds it for the same
+        input, resize and quality, and neither file has changed since.
+        """
+        pool = self._get_pool()
+        ledger = get_run_ledger()
+        results: List[Optional[Dict[str, Any]]] = [None] * len(jobs)
+        futures = {}
+        for index, (input_path, output_path) in enumerate(jobs):
+            details = image_details(input_path, resize, quality)
+            if not force and ledger.fresh_result(details, [input_path], [output_path]) is not None:
+                results[index] = {
+                    "input": str(input_path), "output": str(output_path),
+                    "seconds": 0.0, "skipped": True
+                }
+            else:
+                futures[index] = pool.submit(process_image, input_path, output_path, resize, quality)
+
+        try:
+            for index, future in futures.items():
+                results[index] = future.result()
+                input_path, output_path = jobs[index]
+                ledger.record(image_details(input_path, resize, quality), [output_path], results[index])
+        except BrokenProcessPool:
+            # A worker died (e.g. on a decompression bomb); start fresh next time
+            with self._lock:
+                self._pool = None
+            raise
+        return results
+
+    def shutdown(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.shutdown(wait=False, cancel_futures=True)
+                self._pool = None
+
+
+_processor: Optional[ImageBatchProcessor] = None
+_processor_lock = threading.Lock()
+
+
+def get_image_processor() -> ImageBatchProcessor:
+    """Return the process-wide image batch processor"""
+    global _processor
+    if _processor is None:
+        with _processor_lock:
+            if _processor is None:
+                _processor = ImageBatchProcessor(settings.image.workers)
+    return _processor
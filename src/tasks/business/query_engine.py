@@ -0,0 +1,246 @@
+"""
+Pooled, read-only query engine for SQLite and DuckDB files (B5, A10).
+"""
+
+import csv
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence
+from urllib.parse import quote
+
+from config import settings
+from utils.file_ops import atomic_write
+
+SQLITE_PROGRESS_STEPS = 10_000  # VM instructions between timeout checks
+DUCKDB_ALIAS = "source"
+
+
+def is_sqlite(db_path: Path) -> bool:
+    """.db files are SQLite; anything else is opened with DuckDB"""
+    return db_path.suffix == '.db'
+
+
+def _open_duckdb(db_path: str) -> Any:
+    """Read-only connection to db_path in an instance of its own.
+
+    duckdb.connect(path) hands out one cached instance per path, so reopening
+    a changed file while an older connection is in use would return the old
+    version; attaching it to a fresh in-memory instance does not.
+    """
+    # Imported here so SQLite-only queries (A10, most of B5) don't load duckdb
+    import duckdb
+
+    conn = duckdb.connect(":memory:")
+    quoted = "'" + db_path.replace("'", "''") + "'"
+    conn.execute(f"ATTACH {quoted} AS {DUCKDB_ALIAS} (READ_ONLY)")
+    return conn
+
+
+class _QueryClock:
+    """Time a query spends executing and fetching, not counting what the caller does with the rows"""
+
+    def __init__(self, timeout: float, interrupt: Optional[Callable[[], None]] = None):
+        self.timeout = timeout
+        self.interrupt = interrupt
+        self.spent = 0.0
+        self._started: Optional[float] = None
+
+    @contextmanager
+    def running(self) -> Iterator[None]:
+        timer = None
+        if self.interrupt is not None:
+            timer = threading.Timer(max(self.timeout - self.spent, 0.0), self.interrupt)
+            timer.start()
+        self._started = time.monotonic()
+        try:
+            yield
+        finally:
+            if timer is not None:
+                timer.cancel()
+            self.spent += time.monotonic() - self._started
+            self._started = None
+
+    def expired(self) -> bool:
+        started = self._started
+        running = time.monotonic() - started if started is not None else 0.0
+        return self.spent + running > self.timeout
+
+
+class _TimedCursor:
+    """DB-API cursor whose execute and fetch calls count against a _QueryClock"""
+
+    def __init__(self, cursor: Any, clock: _QueryClock):
+        self._cursor = cursor
+        self.clock = clock
+
+    @property
+    def description(self) -> Any:
+        return self._cursor.description
+
+    def execute(self, query: str, params: Sequence[Any] = ()) -> "_TimedCursor":
+        with self.clock.running():
+            self._cursor.execute(query, params)
+        return self
+
+    def fetchone(self) -> Any:
+        with self.clock.running():
+            return self._cursor.fetchone()
+
+    def fetchmany(self, size: int) -> List[Any]:
+        with self.clock.running():
+            return self._cursor.fetchmany(size)
+
+
+class _DuckDBInstance:
+    """A read-only DuckDB connection for one version of a file, closed after its last cursor"""
+
+    def __init__(self, mtime_ns: int, conn: Any):
+        self.mtime_ns = mtime_ns
+        self.conn = conn
+        self.users = 0
+        self.retired = False
+
+
+class QueryEngine:
+    """Keeps per-database read-only connections and streams results in batches.
+
+    SQLite connections are opened in URI read-only mode and pooled; their
+    statement cache makes repeated queries skip recompilation. DuckDB files
+    share one read-only instance per file version, with a cursor per query;
+    an instance replaced by a newer version is closed once its last cursor
+    is released. The time limit covers executing and fetching only.
+    """
+
+    def __init__(self, pool_size: int, max_rows: int, timeout: float, batch_rows: int):
+        self.pool_size = pool_size
+        self.max_rows = max_rows
+        self.timeout = timeout
+        self.batch_rows = batch_rows
+        self._sqlite_pools: Dict[str, "queue.Queue[sqlite3.Connection]"] = {}
+        self._duckdb: Dict[str, _DuckDBInstance] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _sqlite_cursor(self, db_path: str) -> Iterator[_TimedCursor]:
+        with self._lock:
+            pool = self._sqlite_pools.setdefault(db_path, queue.Queue(self.pool_size))
+        try:
+            conn = pool.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(
+                f"file:{quote(db_path)}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=256
+            )
+
+        clock = _QueryClock(self.timeout)
+        conn.set_progress_handler(clock.expired, SQLITE_PROGRESS_STEPS)
+        try:
+            yield _TimedCursor(conn.cursor(), clock)
+        except sqlite3.OperationalError as e:
+            if clock.expired():
+                raise TimeoutError(f"Query exceeded {self.timeout}s") from e
+            raise
+        finally:
+            conn.set_progress_handler(None, 0)
+            try:
+                pool.put_nowait(conn)
+            except queue.Full:
+                conn.close()
+
+    def _acquire_duckdb(self, db_path: str) -> _DuckDBInstance:
+        mtime = Path(db_path).stat().st_mtime_ns
+        with self._lock:
+            instance = self._duckdb.get(db_path)
+            if instance is None or instance.mtime_ns != mtime:
+                # A read-only instance does not see later writes; reopen on change
+                if instance is not None:
+                    instance.retired = True
+                    if not instance.users:
+                        instance.conn.close()
+                instance = _DuckDBInstance(mtime, _open_duckdb(db_path))
+                self._duckdb[db_path] = instance
+            instance.users += 1
+            return instance
+
+    def _release_duckdb(self, instance: _DuckDBInstance) -> None:
+        with self._lock:
+            instance.users -= 1
+            if instance.retired and not instance.users:
+                instance.conn.close()
+
+    @contextmanager
+    def _duckdb_cursor(self, db_path: str) -> Iterator[_TimedCursor]:
+        import duckdb
+
+        instance = self._acquire_duckdb(db_path)
+        try:
+            with self._lock:
+                cursor = instance.conn.cursor()
+            try:
+                cursor.execute(f"USE {DUCKDB_ALIAS}")
+                yield _TimedCursor(cursor, _QueryClock(self.timeout, cursor.interrupt))
+            except duckdb.InterruptException as e:
+                raise TimeoutError(f"Query exceeded {self.timeout}s") from e
+            finally:
+                cursor.close()
+        finally:
+            self._release_duckdb(instance)
+
+    def cursor(self, db_path: Path):
+        """Context manager yielding a cursor with the time limit armed"""
+        resolved = str(db_path.resolve())
+        if is_sqlite(db_path):
+            return self._sqlite_cursor(resolved)
+        return self._duckdb_cursor(resolved)
+
+    def scalar(self, db_path: Path, query: str, params: Sequence[Any] = ()) -> Any:
+        """First column of the first row"""
+        with self.cursor(db_path) as cursor:
+            cursor.execute(query, params)
+            row = cursor.fetchone()
+        return row[0] if row else None
+
+    def export_csv(self, db_path: Path, query: str, output_path: Path,
+                   max_rows: Optional[int] = None) -> int:
+        """Stream query results to a CSV in batches; returns the row count"""
+        max_rows = max_rows or self.max_rows
+        rows = 0
+        with self.cursor(db_path) as cursor:
+            cursor.execute(query)
+            with atomic_write(output_path, 'w', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow([column[0] for column in cursor.description])
+                while True:
+                    batch = cursor.fetchmany(self.batch_rows)
+                    if not batch:
+                        break
+                    rows += len(batch)
+                    if rows > max_rows:
+                        raise ValueError(f"Query returned more than {max_rows} rows")
+                    writer.writerows(batch)
+        return rows
+
+
+_engine: Optional[QueryEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_query_engine() -> QueryEngine:
+    """Return the process-wide query engine"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = QueryEngine(
+                    pool_size=settings.query.pool_size,
+                    max_rows=settings.query.max_rows,
+                    timeout=settings.query.timeout,
+                    batch_rows=settings.query.batch_rows
+                )
+    return _engine
@@ -0,0 +1,168 @@
+"""
+Resident Whisper models and background transcription jobs for B8.
+"""
+
+import subprocess
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from config import settings
+from utils.metrics import MODEL_LOAD_SECONDS
+from ..exceptions import TaskRejectedError
+
+
+class WhisperModelRegistry:
+    """Loads each Whisper model size once and keeps it resident"""
+
+    def __init__(self):
+        self._models: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def get(self, size: str):
+        with self._lock:
+            if size not in self._models:
+                import whisper
+                with MODEL_LOAD_SECONDS.time(f"whisper-{size}"):
+                    self._models[size] = whisper.load_model(size)
+            return self._models[size]
+
+    def loaded(self) -> List[str]:
+        return list(self._models)
+
+
+class TranscriptionJob:
+    """Progress and partial output of a single transcription"""
+
+    def __init__(self, input_path: Path, output_path: Path, model_size: str):
+        self.id = uuid.uuid4().hex
+        self.input_path = input_path
+        self.output_path = output_path
+        self.model_size = model_size
+        self.status = "queued"
+        self.segments_total = 0
+        self.segments_done = 0
+        self.texts: List[str] = []
+        self.error: Optional[str] = None
+        self.created_at = time.time()
+        self.finished_at: Optional[float] = None
+        self.future: Optional[Future] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "model": self.model_size,
+            "segments_total": self.segments_total,
+            "segments_done": self.segments_done,
+            "partial_text": " ".join(self.texts),
+            "error": self.error,
+            "created_at": self.created_at,
+            "finished_at": self.finished_at
+        }
+
+
+def split_audio(input_path: Path, workdir: Path, segment_seconds: int) -> List[Path]:
+    """Cut audio into fixed-length 16kHz mono segments with ffmpeg"""
+    subprocess.run([
+        "ffmpeg", "-nostdin", "-loglevel", "error", "-i", str(input_path),
+        "-ac", "1", "-ar", "16000",
+        "-f", "segment", "-segment_time", str(segment_seconds),
+        str(workdir / "segment_%05d.wav")
+    ], check=True)
+    return sorted(workdir.glob("segment_*.wav"))
+
+
+class TranscriptionService:
+    """Runs transcriptions on a dedicated worker pool and tracks their progress.
+
+    B8 returns once a job is submitted, so the dispatcher's concurrency limits
+    don't apply; submit() rejects new jobs while max_pending are queued or
+    running instead. Jobs are tracked in memory only: after a restart their
+    IDs are unknown and unfinished ones must be submitted again.
+    """
+
+    def __init__(self, registry: WhisperModelRegistry, max_workers: int,
+                 segment_seconds: int, max_jobs: int, max_pending: int, retry_after: int):
+        self.registry = registry
+        self.segment_seconds = segment_seconds
+        self.max_jobs = max_jobs
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers, thread_name_prefix="whisper")
+        self._jobs: "OrderedDict[str, TranscriptionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, input_path: Path, output_path: Path, model_size: str) -> TranscriptionJob:
+        job = TranscriptionJob(input_path, output_path, model_size)
+        with self._lock:
+            pending = sum(1 for queued in self._jobs.values() if queued.finished_at is None)
+            if pending >= self.max_pending:
+                raise TaskRejectedError("Too many transcriptions in progress",
+                                        status_code=429, retry_after=self.retry_after)
+            self._jobs[job.id] = job
+            # Forget the oldest finished jobs once over the limit
+            for old_id in list(self._jobs):
+                if len(self._jobs) <= self.max_jobs:
+                    break
+                if self._jobs[old_id].finished_at is not None:
+                    del self._jobs[old_id]
+        job.future = self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[TranscriptionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _run(self, job: TranscriptionJob) -> str:
+        job.status = "running"
+        try:
+            model = self.registry.get(job.model_size)
+            with tempfile.TemporaryDirectory(prefix="transcribe-") as workdir:
+                segments = split_audio(job.input_path, Path(workdir), self.segment_seconds)
+                job.segments_total = len(segments)
+
+                # Append each segment as soon as it is transcribed
+                with open(job.output_path, 'w') as out:
+                    for segment in segments:
+                        text = model.transcribe(str(segment))["text"].strip()
+                        if text:
+                            out.write(f" {text}" if job.texts else text)
+                            out.flush()
+                            job.texts.append(text)
+                        job.segments_done += 1
+
+            job.status = "completed"
+            return " ".join(job.texts)
+        except Exception as e:
+            job.status = "failed"
+            job.error = str(e)
+            raise
+        finally:
+            job.finished_at = time.time()
+
+
+_service: Optional[TranscriptionService] = None
+_service_lock = threading.Lock()
+
+
+def get_transcription_service() -> TranscriptionService:
+    """Return the process-wide transcription service"""
+    global _service
+    if _service is None:
+        with _service_lock:
+            if _service is None:
+                _service = TranscriptionService(
+                    WhisperModelRegistry(),
+                    max_workers=settings.transcription.workers,
+                    segment_seconds=settings.transcription.segment_seconds,
+                    max_jobs=settings.transcription.max_jobs,
+                    max_pending=settings.transcription.max_pending,
+                    retry_after=settings.dispatch.retry_after
+                )
+    return _service
@@ -0,0 +1,215 @@
+"""
+Runs task handlers off the event loop on thread and process pools.
+"""
+
+import asyncio
+import functools
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from config import settings
+from utils.metrics import REGISTRY, TASKS, TASK_PHASE_SECONDS, measured_call
+from utils.profiling import profiled_call
+from utils.security import get_path_validator, validate_path
+from .exceptions import TaskExecutionError, TaskRejectedError
+from .freshness import get_run_ledger
+from .operations import handle_phase_a
+from .business import handle_phase_b
+from .registry import (
+    CPU, directory_inputs, get_operation_spec, operations_with, preload_operations, resolve_paths
+)
+
+
+def get_handler(task_details: Dict[str, Any]) -> Callable[[Dict[str, Any]], Dict[str, Any]]:
+    """Pick the phase handler for parsed task details"""
+    operation = task_details.get('operation')
+    try:
+        get_operation_spec(operation)
+    except ValueError:
+        raise ValueError(f"Unknown operation: {operation}") from None
+    return handle_phase_a if operation.startswith('A') else handle_phase_b
+
+
+def checked_paths(task_details: Dict[str, Any]) -> Tuple[List[Path], List[Path]]:
+    """The (inputs, outputs) an operation declares, each validated against the data dir"""
+    inputs, outputs = resolve_paths(task_details['operation'], task_details)
+    directories = directory_inputs(task_details['operation'])
+    for path in inputs + outputs:
+        # Directories have no extension to check, and may not exist yet (A5 reports no logs)
+        if path is None or not (get_path_validator().contains(path) if path in directories
+                                else validate_path(path)):
+            raise TaskExecutionError(f"Invalid path for {task_details['operation']}: {path}")
+    return inputs, outputs
+
+
+def init_worker(operations: Set[str], warm_embeddings: bool) -> None:
+    """Runs once in each spawned worker so its first task doesn't pay for imports and model loads"""
+    preload_operations(operations)
+    if warm_embeddings:
+        from .operations.embeddings import get_embedding_engine
+        get_embedding_engine().warm()
+
+
+class TaskDispatcher:
+    """Runs I/O-bound operations on a thread pool and CPU-bound ones on a process pool.
+
+    Admission is checked on the event loop: a full queue is rejected with 503
+    and an operation over its concurrency limit with 429. Cacheable operations
+    whose outputs are up to date return their recorded result without running.
+    """
+
+    def __init__(self, thread_workers: int, process_workers: int, max_pending: int,
+                 operation_limits: Dict[str, int], cpu_bound_operations: Set[str],
+                 retry_after: int, preload: Set[str] = frozenset(), warm_embeddings: bool = False):
+        self.process_workers = process_workers
+        self.max_pending = max_pending
+        self.operation_limits = operation_limits
+        self.cpu_bound_operations = cpu_bound_operations
+        self.retry_after = retry_after
+        # Workers only ever run CPU-class operations, so only those are worth preloading
+        self.worker_preload = set(preload) & set(cpu_bound_operations)
+        self.warm_embeddings = warm_embeddings and "A9" in cpu_bound_operations
+        self.pending = 0
+        self.running: Dict[str, int] = {}
+        self._threads = ThreadPoolExecutor(thread_workers, thread_name_prefix="task")
+        self._processes: Optional[ProcessPoolExecutor] = None
+
+    def _executor_for(self, operation: str) -> Executor:
+        if operation not in self.cpu_bound_operations:
+            return self._threads
+        return self._process_pool()
+
+    def _process_pool(self) -> ProcessPoolExecutor:
+        if self._processes is None:
+            # Spawned workers do not inherit the parent's threads and open handles
+            self._processes = ProcessPoolExecutor(
+                self.process_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=init_worker,
+                initargs=(self.worker_preload, self.warm_embeddings)
+            )
+        return self._processes
+
+    def start_workers(self) -> None:
+        """Spawn the worker processes now so their preloading happens at startup"""
+        pool = self._process_pool()
+        for _ in range(self.process_workers):
+            pool.submit(os.getpid)
+
+    def _discard_processes(self) -> None:
+        if self._processes is not None:
+            self._processes.shutdown(wait=False, cancel_futures=True)
+            self._processes = None
+
+    def _admit(self, operation: str) -> None:
+        if self.pending >= self.max_pending:
+            raise TaskRejectedError("Server is busy, try again later",
+                                    status_code=503, retry_after=self.retry_after)
+        limit = self.operation_limits.get(operation)
+        if limit is not None and self.running.get(operation, 0) >= limit:
+            raise TaskRejectedError(f"Too many concurrent {operation} tasks",
+                                    status_code=429, retry_after=self.retry_after)
+
+    async def dispatch(self, task_details: Dict[str, Any],
+                       profile: Optional[Tuple[str, Path, float]] = None) -> Dict[str, Any]:
+        """Execute a parsed task without blocking the event loop.
+
+        profile is (mode, output path, sampling interval) to run the handler
+        under a profiler.
+        """
+        handler = get_handler(task_details)
+        if profile is not None:
+            handler = functools.partial(profiled_call, handler, *profile)
+        operation = task_details['operation']
+        spec = get_operation_spec(operation)
+        inputs, outputs = checked_paths(task_details)
+
+        loop = asyncio.get_running_loop()
+        use_ledger = spec.cacheable and bool(outputs)
+        if use_ledger and not (task_details.get('parameters') or {}).get('force'):
+            recorded = await loop.run_in_executor(
+                None, get_run_ledger().fresh_result, task_details, inputs, outputs
+            )
+            if recorded is not None:
+                TASKS.inc(operation, "skipped")
+                return {
+                    "status": "success",
+                    "message": "Outputs are up to date; skipped",
+                    "result": recorded
+                }
+
+        try:
+            self._admit(operation)
+        except TaskRejectedError:
+            TASKS.inc(operation, "rejected")
+            raise
+
+        self.pending += 1
+        self.running[operation] = self.running.get(operation, 0) + 1
+        try:
+            executor = self._executor_for(operation)
+            result, seconds, write_seconds, worker_metrics = await loop.run_in_executor(
+                executor, measured_call, handler, task_details, executor is not self._threads
+            )
+            if worker_metrics is not None:
+                REGISTRY.merge(worker_metrics)  # Cache and model-load counts from the worker
+            TASKS.inc(operation, "success")
+            TASK_PHASE_SECONDS.observe(seconds - write_seconds, operation, "execute")
+            TASK_PHASE_SECONDS.observe(write_seconds, operation, "write")
+            if use_ledger and result.get("status") == "success":
+                await loop.run_in_executor(None, get_run_ledger().record, task_details, outputs, result)
+            return result
+        except BrokenProcessPool:
+            TASKS.inc(operation, "error")
+            # A worker died (e.g. OOM); start a fresh pool for the next task
+            self._discard_processes()
+            raise TaskExecutionError(f"Worker process for {operation} crashed")
+        except Exception:
+            TASKS.inc(operation, "error")
+            raise
+        finally:
+            self.pending -= 1
+            self.running[operation] -= 1
+
+    def shutdown(self) -> None:
+        self._threads.shutdown(wait=False, cancel_futures=True)
+        self._discard_processes()
+
+
+_dispatcher: Optional[TaskDispatcher] = None
+_dispatcher_lock = threading.Lock()
+
+
+def get_dispatcher() -> TaskDispatcher:
+    """Return the process-wide task dispatcher"""
+    global _dispatcher
+    if _dispatcher is None:
+        with _dispatcher_lock:
+            if _dispatcher is None:
+                _dispatcher = TaskDispatcher(
+                    thread_workers=settings.dispatch.thread_workers,
+                    process_workers=settings.dispatch.process_workers,
+                    max_pending=settings.dispatch.max_pending,
+                    operation_limits=settings.dispatch.operation_limits,
+                    cpu_bound_operations=(settings.dispatch.cpu_bound_operations
+                                          if settings.dispatch.cpu_bound_operations is not None
+                                          else operations_with(CPU)),
+                    retry_after=settings.dispatch.retry_after,
+                    preload=settings.dispatch.preload_operations,
+                    warm_embeddings=settings.embedding.preload
+                )
+                REGISTRY.gauge(
+                    "dataworks_dispatcher_pending", "Tasks queued or running in the dispatcher",
+                    lambda: [((), _dispatcher.pending)]
+                )
+                REGISTRY.gauge(
+                    "dataworks_dispatcher_running", "Tasks running, by operation",
+                    lambda: [((operation,), count) for operation, count in sorted(_dispatcher.running.items())],
+                    ("operation",)
+                )
+    return _dispatcher
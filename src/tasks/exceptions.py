@@ -4,4 +4,11 @@ class TaskExecutionError(Exception):
 
 class TaskParsingError(Exception):
     """Raised when task parsing fails"""
-    pass
\ No newline at end of file
+    pass
+
+class TaskRejectedError(Exception):
+    """Raised when the dispatcher is saturated and cannot accept a task"""
+    def __init__(self, message: str, status_code: int = 429, retry_after: int = 5):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
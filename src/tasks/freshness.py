@@ -0,0 +1,130 @@
+"""
+Ledger of completed runs, used to skip cacheable operations whose outputs are fresh.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+
+Stamp = Tuple[int, int]  # (mtime_ns, size)
+
+
+def _stamp(path: Path) -> Optional[Stamp]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _input_stamps(inputs: List[Path]) -> List[Optional[Stamp]]:
+    """Stamps of the inputs, plus the write-ahead log of any SQLite database among them.
+
+    Commits to a database in WAL mode go to the -wal file and leave the
+    database's own mtime alone until a checkpoint.
+    """
+    stamps = []
+    for path in inputs:
+        stamps.append(_stamp(path))
+        wal_stamp = _stamp(path.with_name(path.name + "-wal"))
+        if wal_stamp is not None:
+            stamps.append(wal_stamp)
+    return stamps
+
+
+class RunLedger:
+    """Remembers the parameters and output stamps of each cacheable run.
+
+    A run is fresh when every declared output exists, is strictly newer than
+    every input, is unchanged since the recorded run, and the task details hash
+    (operation, paths and parameters other than force) matches. Both calls
+    stat files and query SQLite, so they belong off the event loop.
+    """
+
+    def __init__(self, db_path: Path):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS runs (
+                key TEXT PRIMARY KEY,
+                details_hash TEXT NOT NULL,
+                outputs TEXT NOT NULL,
+                result TEXT NOT NULL,
+                finished_at REAL NOT NULL
+            )
+        """)
+        self._conn.commit()
+
+    @staticmethod
+    def _keys(task_details: Dict[str, Any], outputs: List[Path]) -> Tuple[str, str]:
+        # Keyed by what is written, so a different task writing the same files replaces the entry
+        key = hashlib.sha256(
+            json.dumps([task_details.get('operation'), sorted(map(str, outputs))]).encode()
+        ).hexdigest()
+        details = {k: v for k, v in task_details.items() if k != 'phase'}
+        if isinstance(details.get('parameters'), dict):
+            # force only decides whether to consult the ledger, not what the run produces
+            details['parameters'] = {k: v for k, v in details['parameters'].items() if k != 'force'}
+        details_hash = hashlib.sha256(json.dumps(details, sort_keys=True).encode()).hexdigest()
+        return key, details_hash
+
+    def fresh_result(self, task_details: Dict[str, Any], inputs: List[Path],
+                     outputs: List[Path]) -> Optional[Dict[str, Any]]:
+        """The recorded result if the outputs are up to date, else None"""
+        if not outputs:
+            return None
+        output_stamps = [_stamp(path) for path in outputs]
+        input_stamps = _input_stamps(inputs)
+        if None in output_stamps or None in input_stamps:
+            return None
+        # Ties count as stale: mtimes come from a coarse clock, so an input
+        # rewritten just after the run can carry the same timestamp
+        if input_stamps and min(s[0] for s in output_stamps) <= max(s[0] for s in input_stamps):
+            return None
+
+        key, details_hash = self._keys(task_details, outputs)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT details_hash, outputs, result FROM runs WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] != details_hash:
+            return None
+        if [list(stamp) for stamp in output_stamps] != json.loads(row[1]):
+            return None  # Outputs were changed by something else
+        return json.loads(row[2])
+
+    def record(self, task_details: Dict[str, Any], outputs: List[Path],
+               result: Dict[str, Any]) -> None:
+        output_stamps = [_stamp(path) for path in outputs]
+        if not outputs or None in output_stamps:
+            return
+        key, details_hash = self._keys(task_details, outputs)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs VALUES (?, ?, ?, ?, ?)",
+                (key, details_hash, json.dumps(output_stamps), json.dumps(result, default=str),
+                 time.time())
+            )
+            self._conn.commit()
+
+
+_ledger: Optional[RunLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_run_ledger() -> RunLedger:
+    """Return the process-wide run ledger"""
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = RunLedger(settings.cache_dir / "runs.sqlite")
+    return _ledger
@@ -0,0 +1,261 @@
+"""
+Persistent background job queue for asynchronous /run requests.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from config import settings
+from utils.metrics import REGISTRY
+from .dispatch import TaskDispatcher
+from .exceptions import TaskRejectedError
+from .registry import OPERATIONS
+
+logger = logging.getLogger(__name__)
+
+HOSTNAME = socket.gethostname()
+
+
+class JobQueue:
+    """SQLite-backed FIFO of parsed tasks consumed by asyncio workers.
+
+    Identical tasks that are already queued or running are deduplicated.
+    Several processes may share the database: a job is claimed by a single
+    UPDATE, and each running job records its owner (host and PID). On
+    startup, only jobs whose owner process on this host has died are
+    recovered, requeued if their operation is idempotent or failed as
+    interrupted if it is not.
+    """
+
+    def __init__(self, db_path: Path, max_depth: int, retry_after: int):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_depth = max_depth
+        self.retry_after = retry_after
+        self.owner = f"{HOSTNAME}:{os.getpid()}"
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                task TEXT,
+                task_details TEXT NOT NULL,
+                status TEXT NOT NULL,
+                result TEXT,
+                error TEXT,
+                created_at REAL NOT NULL,
+                started_at REAL,
+                finished_at REAL,
+                owner TEXT
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_status ON jobs(status, created_at)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs(key, status)")
+        self._recover_interrupted()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._workers: List[asyncio.Task] = []
+
+    @staticmethod
+    def _is_idempotent(task_details: Dict[str, Any]) -> bool:
+        spec = OPERATIONS.get(task_details.get('operation'))
+        return spec is None or spec.idempotent
+
+    @staticmethod
+    def _owner_alive(owner: Optional[str]) -> bool:
+        """False if owner is a process on this host that no longer exists"""
+        host, _, pid = (owner or "").rpartition(":")
+        if host != HOSTNAME or not pid.isdigit():
+            return bool(owner)  # Another host's worker, which it recovers itself
+        if int(pid) == os.getpid():
+            return False  # A previous process that had our PID
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def _recover_interrupted(self) -> None:
+        rows = self._conn.execute(
+            "SELECT id, task_details, owner FROM jobs WHERE status = 'running'"
+        ).fetchall()
+        for job_id, task_details, owner in rows:
+            if self._owner_alive(owner):
+                continue
+            # Guard on the owner so a job another process just recovered is left alone
+            if self._is_idempotent(json.loads(task_details)):
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL "
+                    "WHERE id = ? AND status = 'running' AND owner IS ?", (job_id, owner)
+                )
+            else:
+                # It may have partly taken effect (e.g. a git commit), so don't run it again
+                self._conn.execute(
+                    "UPDATE jobs SET status = 'failed', error = ?, finished_at = ? "
+                    "WHERE id = ? AND status = 'running' AND owner IS ?",
+                    ("Interrupted by a restart; not retried", time.time(), job_id, owner)
+                )
+        self._conn.commit()
+
+    def enqueue(self, task_details: Dict[str, Any], task: Optional[str] = None) -> Tuple[str, bool]:
+        """Queue a task; returns (job_id, created) where created is False for a duplicate"""
+        key = hashlib.sha256(json.dumps(task_details, sort_keys=True).encode()).hexdigest()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id FROM jobs WHERE key = ? AND status IN ('queued', 'running')", (key,)
+            ).fetchone()
+            if row is not None:
+                return row[0], False
+
+            if self._depth() >= self.max_depth:
+                raise TaskRejectedError("Job queue is full", status_code=503,
+                                        retry_after=self.retry_after)
+
+            job_id = uuid.uuid4().hex
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, task, task_details, status, created_at) "
+                "VALUES (?, ?, ?, ?, 'queued', ?)",
+                (job_id, key, task, json.dumps(task_details), time.time())
+            )
+            self._conn.commit()
+
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return job_id, True
+
+    def _depth(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM jobs WHERE status = 'queued'").fetchone()[0]
+
+    def depth(self) -> int:
+        """Number of jobs waiting for a worker"""
+        with self._lock:
+            return self._depth()
+
+    def _claim(self) -> Optional[Tuple[str, Dict[str, Any]]]:
+        # One statement, so two processes can never claim the same job
+        with self._lock:
+            row = self._conn.execute("""
+                UPDATE jobs SET status = 'running', started_at = ?, owner = ?
+                WHERE id = (SELECT id FROM jobs WHERE status = 'queued' ORDER BY created_at LIMIT 1)
+                  AND status = 'queued'
+                RETURNING id, task_details
+            """, (time.time(), self.owner)).fetchone()
+            self._conn.commit()
+        if row is None:
+            return None
+        return row[0], json.loads(row[1])
+
+    def _finish(self, job_id: str, status: str, result: Optional[Dict[str, Any]] = None,
+                error: Optional[str] = None) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ? WHERE id = ?",
+                (status, json.dumps(result) if result is not None else None, error, time.time(), job_id)
+            )
+            self._conn.commit()
+
+    def _requeue(self, job_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "UPDATE jobs SET status = 'queued', started_at = NULL, owner = NULL WHERE id = ?", (job_id,)
+            )
+            self._conn.commit()
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Status, result and timings of a job"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT id, task, task_details, status, result, error, created_at, started_at, finished_at "
+                "FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        created_at, started_at, finished_at = row[6], row[7], row[8]
+        return {
+            "job_id": row[0],
+            "task": row[1],
+            "task_details": json.loads(row[2]),
+            "status": row[3],
+            "result": json.loads(row[4]) if row[4] else None,
+            "error": row[5],
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "queue_seconds": started_at - created_at if started_at else None,
+            "run_seconds": finished_at - started_at if finished_at and started_at else None
+        }
+
+    async def _worker(self, dispatcher: TaskDispatcher) -> None:
+        while True:
+            job = self._claim()
+            if job is None:
+                self._wakeup.clear()
+                # Re-check after clearing so an enqueue in between is not missed
+                job = self._claim()
+                if job is None:
+                    await self._wakeup.wait()
+                    continue
+
+            job_id, task_details = job
+            try:
+                result = await dispatcher.dispatch(task_details)
+                self._finish(job_id, "completed", result=result)
+            except TaskRejectedError as e:
+                # Dispatcher is saturated; put the job back and back off
+                self._requeue(job_id)
+                await asyncio.sleep(e.retry_after)
+            except asyncio.CancelledError:
+                if self._is_idempotent(task_details):
+                    self._requeue(job_id)
+                else:
+                    self._finish(job_id, "failed", error="Interrupted by shutdown; not retried")
+                raise
+            except Exception as e:
+                logger.exception("Job %s failed", job_id)
+                self._finish(job_id, "failed", error=str(e))
+
+    def start(self, dispatcher: TaskDispatcher, workers: int) -> None:
+        """Start consuming the queue on the running event loop"""
+        self._wakeup = asyncio.Event()
+        self._workers = [asyncio.create_task(self._worker(dispatcher)) for _ in range(workers)]
+
+    async def stop(self) -> None:
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+
+
+_queue: Optional[JobQueue] = None
+_queue_lock = threading.Lock()
+
+
+def get_job_queue() -> JobQueue:
+    """Return the process-wide job queue"""
+    global _queue
+    if _queue is None:
+        with _queue_lock:
+            if _queue is None:
+                _queue = JobQueue(
+                    settings.cache_dir / "jobs.sqlite",
+                    max_depth=settings.jobs.max_depth,
+                    retry_after=settings.dispatch.retry_after
+                )
+                REGISTRY.gauge(
+                    "dataworks_job_queue_depth", "Async jobs waiting for a worker",
+                    lambda: [((), _queue.depth())]
+                )
+    return _queue
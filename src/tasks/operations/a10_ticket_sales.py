@@ -0,0 +1,21 @@
+"""
+A10: total sales of Gold tickets.
+"""
+
+from typing import Any, Dict
+
+from tasks.business.query_engine import get_query_engine
+from tasks.paths import DATA_DIR
+from utils.file_ops import atomic_write
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    total_sales = get_query_engine().scalar(DATA_DIR / "ticket-sales.db", """
+        SELECT SUM(units * price)
+        FROM tickets
+        WHERE type = 'Gold'
+    """)
+
+    with atomic_write(DATA_DIR / "ticket-sales-gold.txt") as f:
+        f.write(str(total_sales))
+    return {"status": "success"}
@@ -0,0 +1,16 @@
+"""
+A1: install uv and run datagen.py for a user email.
+"""
+
+import subprocess
+from typing import Any, Dict
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    subprocess.run(["uv", "pip", "install", "-r", "requirements.txt"])
+    subprocess.run([
+        "python",
+        "https://raw.githubusercontent.com/sanand0/tools-in-data-science-public/tds-2025-01/project-1/datagen.py",
+        task_details['parameters']['user_email']
+    ])
+    return {"status": "success"}
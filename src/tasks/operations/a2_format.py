@@ -0,0 +1,17 @@
+"""
+A2: format format.md with prettier.
+"""
+
+import subprocess
+from typing import Any, Dict
+
+from tasks.paths import DATA_DIR
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    subprocess.run([
+        "npx", "prettier@3.4.2",
+        "--write", str(DATA_DIR / "format.md"),
+        "--parser", "markdown"
+    ])
+    return {"status": "success"}
@@ -0,0 +1,24 @@
+"""
+A3: count the dates in a file that fall on a given weekday.
+"""
+
+from typing import Any, Dict
+
+from tasks.paths import data_path
+from utils.file_ops import atomic_write
+from .date_counts import count_weekday
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    input_path = data_path(task_details.get('input_path'))
+    output_path = data_path(task_details.get('output_path'))
+    if not input_path or not output_path:
+        raise ValueError("Missing input or output path")
+
+    count = count_weekday(
+        input_path,
+        task_details.get('parameters', {}).get('weekday', 2)  # Default to Wednesday
+    )
+    with atomic_write(output_path) as f:
+        f.write(str(count))
+    return {"status": "success"}
@@ -0,0 +1,46 @@
+"""
+A4: sort contacts with an external merge sort.
+"""
+
+from typing import Any, Dict, List
+
+from config import settings
+from tasks.exceptions import TaskExecutionError
+from tasks.paths import DATA_DIR, data_path
+from .external_sort import RUN_SIZE, sort_json_records
+
+
+def _keys_parameter(parameters: Dict[str, Any]) -> List[str]:
+    """Sort keys; a bare string would otherwise be sorted on its characters"""
+    keys = parameters.get('keys', ['last_name', 'first_name'])
+    if not isinstance(keys, list) or not keys or not all(isinstance(key, str) and key for key in keys):
+        raise TaskExecutionError(f"Parameter 'keys' must be a non-empty list of field names, got {keys!r}")
+    return keys
+
+
+def _bool_parameter(parameters: Dict[str, Any], name: str) -> bool:
+    """A boolean parameter, accepting "true"/"false" since LLM parses often quote them"""
+    value = parameters.get(name, False)
+    if isinstance(value, str) and value.lower() in ("true", "false"):
+        return value.lower() == "true"
+    if not isinstance(value, bool):
+        raise TaskExecutionError(f"Parameter {name!r} must be true or false, got {value!r}")
+    return value
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = task_details.get('parameters', {})
+    run_size = parameters.get('run_size', RUN_SIZE)
+    if isinstance(run_size, bool) or not isinstance(run_size, int) or run_size < 1:
+        raise TaskExecutionError(f"Parameter 'run_size' must be a positive integer, got {run_size!r}")
+
+    sort_json_records(
+        data_path(task_details.get('input_path')) or DATA_DIR / "contacts.json",
+        data_path(task_details.get('output_path')) or DATA_DIR / "contacts-sorted.json",
+        keys=_keys_parameter(parameters),
+        reverse=_bool_parameter(parameters, 'reverse'),
+        compact=_bool_parameter(parameters, 'compact'),
+        run_size=run_size,
+        spill_dir=settings.cache_dir / "sort"
+    )
+    return {"status": "success"}
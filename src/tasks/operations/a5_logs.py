@@ -0,0 +1,32 @@
+"""
+A5: first lines of the most recent log files.
+"""
+
+from typing import Any, Dict
+
+from tasks.paths import DATA_DIR
+from .recent_logs import HEAD_MAX_BYTES, write_recent_logs
+
+
+def _int_parameter(parameters: Dict[str, Any], name: str, default: int, minimum: int) -> int:
+    """An integer parameter, accepting numeric strings since LLM parses often quote numbers"""
+    value = parameters.get(name, default)
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Parameter {name!r} must be an integer, got {value!r}") from None
+    if number < minimum:
+        raise ValueError(f"Parameter {name!r} must be at least {minimum}, got {number}")
+    return number
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    parameters = task_details.get('parameters', {})
+    write_recent_logs(
+        DATA_DIR / "logs",
+        DATA_DIR / "logs-recent.txt",
+        count=_int_parameter(parameters, 'count', 10, minimum=0),
+        lines=_int_parameter(parameters, 'lines', 1, minimum=1),
+        max_bytes=_int_parameter(parameters, 'max_bytes', HEAD_MAX_BYTES, minimum=1)
+    )
+    return {"status": "success"}
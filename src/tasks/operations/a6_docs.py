@@ -0,0 +1,19 @@
+"""
+A6: index Markdown titles under docs/.
+"""
+
+from typing import Any, Dict
+
+from tasks.paths import DATA_DIR
+from .docs_index import get_docs_indexer
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    # Only new or modified files are re-read; see docs_index.py
+    indexer = get_docs_indexer(DATA_DIR / "docs")
+    indexer.build()
+
+    parameters = task_details.get('parameters', {})
+    if parameters.get('watch'):
+        indexer.start_watch(parameters.get('watch_interval', 5))
+    return {"status": "success"}
@@ -0,0 +1,25 @@
+"""
+A7: extract the sender's address from email.txt with the LLM.
+"""
+
+from typing import Any, Dict
+
+from llm.gateway import get_llm_gateway
+from tasks.paths import DATA_DIR
+from utils.file_ops import atomic_write
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    with open(DATA_DIR / "email.txt") as f:
+        email_content = f.read()
+
+    sender_email = get_llm_gateway().complete_blocking(
+        [
+            {"role": "system", "content": "Extract the sender's email address from the email content."},
+            {"role": "user", "content": email_content}
+        ],
+        model="gpt-3.5-turbo"
+    ).strip()
+    with atomic_write(DATA_DIR / "email-sender.txt") as f:
+        f.write(sender_email)
+    return {"status": "success"}
@@ -0,0 +1,14 @@
+"""
+A8: credit card number extraction (unsupported).
+"""
+
+from typing import Any, Dict
+
+from ..exceptions import TaskExecutionError
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    # GPT-4-Mini doesn't support vision tasks
+    raise TaskExecutionError(
+        "Credit card number extraction from images not supported with current model"
+    )
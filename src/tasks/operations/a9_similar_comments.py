@@ -0,0 +1,39 @@
+"""
+A9: the most similar pair of comments by embedding similarity.
+"""
+
+from typing import Any, Dict
+
+from config import settings
+from tasks.paths import DATA_DIR
+from utils.file_ops import atomic_write
+from .embeddings import get_embedding_engine
+from .similarity import approximate_most_similar_pair, most_similar_pair
+
+
+def handle(task_details: Dict[str, Any]) -> Dict[str, Any]:
+    with open(DATA_DIR / "comments.txt") as f:
+        comments = [line.strip() for line in f]
+
+    embeddings = get_embedding_engine().encode(comments)
+
+    # Find most similar pair without building the full similarity matrix
+    similarity = settings.similarity
+    threshold = similarity.approximate_threshold
+    approximate = task_details.get('parameters', {}).get(
+        'approximate', 0 < threshold <= len(comments)
+    )
+    if approximate:
+        _, i, j = approximate_most_similar_pair(
+            embeddings,
+            n_bits=similarity.lsh_bits,
+            n_tables=similarity.lsh_tables,
+            block_size=similarity.block_size
+        )
+    else:
+        _, i, j = most_similar_pair(embeddings, block_size=similarity.block_size)
+    similar_pair = [comments[i], comments[j]]
+
+    with atomic_write(DATA_DIR / "comments-similar.txt") as f:
+        f.write('\n'.join(similar_pair))
+    return {"status": "success"}
@@ -0,0 +1,156 @@
+"""
+Vectorized weekday histogram for date files (A3), cached per file version.
+"""
+
+import csv
+import json
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+
+# Formats seen in generated date files, tried in order on the still-unparsed rows
+DATE_FORMATS = ["%Y-%m-%d", "%d-%b-%Y", "%b %d, %Y", "%Y/%m/%d %H:%M:%S"]
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+CHUNK_ROWS = 1_000_000
+HISTOGRAM_CACHE_SIZE = 64
+
+
+def parse_weekday(weekday: Union[int, str]) -> int:
+    """Weekday as 0 (Monday) to 6, from an int or a (possibly plural) day name"""
+    if isinstance(weekday, str) and not weekday.strip().isdigit():
+        name = weekday.strip().lower().rstrip("s")
+        for index, day in enumerate(WEEKDAYS):
+            if day.startswith(name) and len(name) >= 3:
+                return index
+        raise ValueError(f"Unknown weekday: {weekday}")
+    index = int(weekday)
+    if not 0 <= index <= 6:
+        raise ValueError(f"Weekday must be between 0 and 6, got {index}")
+    return index
+
+
+def _weekday_counts(lines: pd.Series, formats: List[str]) -> np.ndarray:
+    # Date files repeat values heavily, so parse each distinct string once
+    codes, uniques = pd.factorize(lines)
+    weekdays = np.full(len(uniques), -1, dtype=np.int64)
+    remaining = pd.Series(uniques).str.strip()
+    for fmt in formats:
+        if remaining.empty:
+            break
+        parsed = pd.to_datetime(remaining, format=fmt, errors="coerce")
+        matched = parsed.notna()
+        weekdays[remaining.index[matched]] = parsed[matched].dt.dayofweek.to_numpy()
+        remaining = remaining[~matched]
+
+    line_weekdays = weekdays[codes]
+    # Lines no format accepts (-1) are skipped
+    return np.bincount(line_weekdays[line_weekdays >= 0], minlength=7)
+
+
+def weekday_histogram(file_path: Path, formats: List[str] = DATE_FORMATS,
+                      chunk_rows: int = CHUNK_ROWS) -> np.ndarray:
+    """Count dates per weekday (index 0 = Monday) in one chunked pass"""
+    counts = np.zeros(7, dtype=np.int64)
+    reader = pd.read_csv(
+        file_path,
+        sep="\x1f",  # Never present, so each line is a single field
+        header=None,
+        names=["date"],
+        dtype=str,
+        quoting=csv.QUOTE_NONE,
+        na_filter=False,
+        skip_blank_lines=True,
+        chunksize=chunk_rows,
+        encoding_errors="replace"
+    )
+    with reader:
+        for chunk in reader:
+            counts += _weekday_counts(chunk["date"], formats)
+    return counts
+
+
+class HistogramCache:
+    """LRU of weekday histograms keyed by (path, mtime_ns, size).
+
+    With a db_path, histograms are also kept in SQLite so every dispatcher
+    worker process shares them instead of each computing its own.
+    """
+
+    def __init__(self, max_entries: int = HISTOGRAM_CACHE_SIZE, db_path: Optional[Path] = None):
+        self.max_entries = max_entries
+        self.db_path = db_path
+        self._entries: "OrderedDict[Tuple[str, int, int], np.ndarray]" = OrderedDict()
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _db(self) -> Optional[sqlite3.Connection]:
+        # Opened on first use, in the process that uses it
+        if self._conn is None and self.db_path is not None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS histograms (
+                    path TEXT PRIMARY KEY,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    counts TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    def get(self, file_path: Path) -> np.ndarray:
+        stat = file_path.stat()
+        key = (str(file_path.resolve()), stat.st_mtime_ns, stat.st_size)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+            db = self._db()
+            row = db.execute(
+                "SELECT counts FROM histograms WHERE path = ? AND mtime_ns = ? AND size = ?", key
+            ).fetchone() if db is not None else None
+
+        if row is not None:
+            histogram = np.array(json.loads(row[0]), dtype=np.int64)
+        else:
+            histogram = weekday_histogram(file_path)
+        with self._lock:
+            self._entries[key] = histogram
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            if row is None and self._conn is not None:
+                # One row per file; a new version replaces the old one
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO histograms VALUES (?, ?, ?, ?)",
+                    (*key, json.dumps(histogram.tolist()))
+                )
+                self._conn.commit()
+        return histogram
+
+
+_histograms: Optional[HistogramCache] = None
+_histograms_lock = threading.Lock()
+
+
+def get_histogram_cache() -> HistogramCache:
+    """Return the process-wide weekday histogram cache"""
+    global _histograms
+    if _histograms is None:
+        with _histograms_lock:
+            if _histograms is None:
+                _histograms = HistogramCache(db_path=settings.cache_dir / "weekday-histograms.sqlite")
+    return _histograms
+
+
+def count_weekday(file_path: Path, weekday: Union[int, str]) -> int:
+    """Number of dates in file_path falling on weekday"""
+    return int(get_histogram_cache().get(file_path)[parse_weekday(weekday)])
@@ -0,0 +1,147 @@
+"""
+Incremental Markdown title index for A6, backed by a persistent manifest.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import settings
+from utils.file_ops import atomic_write
+
+logger = logging.getLogger(__name__)
+
+FileStamp = Tuple[str, int, int]  # (relative path, mtime_ns, size)
+
+
+def _scan(directory: str, root: str) -> List[FileStamp]:
+    """Walk a directory with scandir, reusing the stat data it returns"""
+    found = []
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.name.endswith(".md") and entry.is_file():
+                    stat = entry.stat()
+                    found.append((os.path.relpath(entry.path, root), stat.st_mtime_ns, stat.st_size))
+    return found
+
+
+def read_title(path: Path) -> Optional[str]:
+    """Text of the first H1 heading, if any"""
+    with open(path, encoding="utf-8", errors="replace") as f:
+        for line in f:
+            if line.startswith('# '):
+                return line[2:].strip()
+    return None
+
+
+class DocsIndexer:
+    """Maintains {relative path: first H1} for *.md files, re-reading only changed files"""
+
+    def __init__(self, docs_dir: Path, index_path: Path, manifest_path: Path, workers: int = 8):
+        self.docs_dir = docs_dir
+        self.index_path = index_path
+        self.manifest_path = manifest_path
+        self.workers = workers
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    def _load_manifest(self) -> Dict[str, list]:
+        try:
+            with open(self.manifest_path) as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _scan_tree(self, pool: ThreadPoolExecutor) -> List[FileStamp]:
+        root = str(self.docs_dir)
+        found, subdirs = [], []
+        with os.scandir(root) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    subdirs.append(entry.path)
+                elif entry.name.endswith(".md") and entry.is_file():
+                    stat = entry.stat()
+                    found.append((entry.name, stat.st_mtime_ns, stat.st_size))
+        # Top-level directories are walked in parallel
+        for result in pool.map(lambda directory: _scan(directory, root), subdirs):
+            found.extend(result)
+        return found
+
+    def build(self) -> Dict[str, int]:
+        """Bring the index up to date; returns counts of indexed, re-read and removed files"""
+        with self._lock, ThreadPoolExecutor(self.workers, thread_name_prefix="docs-index") as pool:
+            manifest = self._load_manifest()
+            files = self._scan_tree(pool)
+
+            changed = [
+                (relative, mtime, size) for relative, mtime, size in files
+                if manifest.get(relative, [None, None])[:2] != [mtime, size]
+            ]
+            titles = pool.map(lambda stamp: read_title(self.docs_dir / stamp[0]), changed)
+
+            current = {relative for relative, _, _ in files}
+            removed = len(set(manifest) - current)
+            new_manifest = {relative: manifest[relative] for relative in current if relative in manifest}
+            for (relative, mtime, size), title in zip(changed, titles):
+                new_manifest[relative] = [mtime, size, title]
+
+            index = {
+                relative: entry[2] for relative, entry in sorted(new_manifest.items())
+                if entry[2] is not None
+            }
+            with atomic_write(self.index_path) as f:
+                json.dump(index, f, indent=2)
+            self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+            with atomic_write(self.manifest_path) as f:
+                json.dump(new_manifest, f)
+
+        return {"files": len(files), "read": len(changed), "removed": removed}
+
+    def start_watch(self, interval: float) -> bool:
+        """Rebuild every interval seconds in a background thread; False if already watching"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return False
+        self._stop.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="docs-index-watch", daemon=True
+        )
+        self._watcher.start()
+        return True
+
+    def stop_watch(self) -> None:
+        self._stop.set()
+
+    def _watch(self, interval: float) -> None:
+        while not self._stop.wait(interval):
+            try:
+                self.build()
+            except Exception:
+                logger.exception("Docs index refresh failed")
+
+
+_indexers: Dict[str, DocsIndexer] = {}
+_indexers_lock = threading.Lock()
+
+
+def get_docs_indexer(docs_dir: Path) -> DocsIndexer:
+    """Return the process-wide indexer for a docs directory"""
+    key = str(docs_dir)
+    with _indexers_lock:
+        if key not in _indexers:
+            manifest_name = hashlib.sha256(key.encode()).hexdigest()[:16] + ".json"
+            _indexers[key] = DocsIndexer(
+                docs_dir,
+                docs_dir / "index.json",
+                settings.cache_dir / "docs-index" / manifest_name
+            )
+        return _indexers[key]
@@ -0,0 +1,163 @@
+"""
+Process-wide sentence embedding engine with a persistent content-hash cache.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from config import settings
+from utils.metrics import MODEL_LOAD_SECONDS, REGISTRY
+
+SQLITE_MAX_PARAMS = 500  # Keys per IN (...) lookup
+
+
+class EmbeddingCache:
+    """SQLite-backed embedding store keyed by content hash with LRU eviction"""
+
+    def __init__(self, db_path: Path, max_entries: int):
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                vector BLOB NOT NULL,
+                last_used REAL NOT NULL
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+
+    def get_many(self, keys: List[str]) -> Dict[str, np.ndarray]:
+        """Return cached vectors for the given keys and mark them as recently used"""
+        found = {}
+        with self._lock:
+            for start in range(0, len(keys), SQLITE_MAX_PARAMS):
+                chunk = keys[start:start + SQLITE_MAX_PARAMS]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                    chunk
+                ).fetchall()
+                found.update((key, np.frombuffer(blob, dtype=np.float32)) for key, blob in rows)
+
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: Iterable[Tuple[str, np.ndarray]]) -> None:
+        """Store vectors and evict the least recently used entries over the limit"""
+        now = time.time()
+        rows = [(key, np.asarray(vector, dtype=np.float32).tobytes(), now) for key, vector in items]
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO embeddings VALUES (?, ?, ?)", rows)
+            excess = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0] - self.max_entries
+            if excess > 0:
+                self._conn.execute("""
+                    DELETE FROM embeddings WHERE key IN (
+                        SELECT key FROM embeddings ORDER BY last_used LIMIT ?
+                    )
+                """, (excess,))
+            self._conn.commit()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+
+
+class EmbeddingEngine:
+    """Keeps a SentenceTransformer model warm and encodes text through the cache"""
+
+    def __init__(self, model_name: str, batch_size: int, cache: EmbeddingCache):
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.cache = cache
+        self.hits = 0
+        self.misses = 0
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    with MODEL_LOAD_SECONDS.time(self.model_name):
+                        self._model = SentenceTransformer(self.model_name)
+        return self._model
+
+    def warm(self) -> None:
+        """Load the model ahead of the first request"""
+        self.model
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256(f"{self.model_name}\0{text}".encode()).hexdigest()
+
+    def encode(self, texts: Sequence[str]) -> np.ndarray:
+        """Encode texts, reusing cached vectors for content seen before"""
+        keys = [self._key(text) for text in texts]
+        unique = dict(zip(keys, texts))
+
+        vectors = self.cache.get_many(list(unique))
+        missing = [key for key in unique if key not in vectors]
+        with self._lock:
+            self.hits += len(unique) - len(missing)
+            self.misses += len(missing)
+
+        if missing:
+            encoded = self.model.encode(
+                [unique[key] for key in missing],
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            ).astype(np.float32)
+            new_vectors = dict(zip(missing, encoded))
+            self.cache.put_many(new_vectors.items())
+            vectors.update(new_vectors)
+
+        if not keys:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.vstack([vectors[key] for key in keys])
+
+    def stats(self) -> Dict[str, int]:
+        """Cache hit/miss counters since process start"""
+        return {"hits": self.hits, "misses": self.misses, "cached": len(self.cache)}
+
+
+_engine: Optional[EmbeddingEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_embedding_engine() -> EmbeddingEngine:
+    """Return the process-wide embedding engine, creating it on first use"""
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                cache = EmbeddingCache(
+                    settings.cache_dir / "embeddings.sqlite",
+                    settings.embedding.cache_size
+                )
+                _engine = EmbeddingEngine(
+                    settings.embedding.model_name,
+                    settings.embedding.batch_size,
+                    cache
+                )
+                REGISTRY.register_cache("embedding", _engine.stats)
+    return _engine
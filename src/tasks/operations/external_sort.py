@@ -0,0 +1,241 @@
+"""
+External merge sort for large JSON record arrays (A4).
+
+The input is parsed incrementally, sorted in fixed-size runs that spill to
+temp files as JSON lines, and k-way merged into the output, so memory use is
+bounded by the run size rather than the file size. When orjson is installed,
+inputs under IN_MEMORY_BYTES are simply loaded and sorted in one go.
+"""
+
+import heapq
+import json
+import re
+import tempfile
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from utils.file_ops import atomic_write
+
+try:
+    import orjson
+except ImportError:  # Optional speed-up; the stdlib json path is equivalent
+    orjson = None
+
+READ_SIZE = 1024 * 1024
+MAX_VALUE_CHARS = 64 * 1024 * 1024  # Longest single JSON value buffered while parsing
+RUN_SIZE = 100_000  # Records sorted in memory before spilling a run
+IN_MEMORY_BYTES = 64 * 1024 * 1024  # With orjson, smaller inputs are loaded whole
+
+_decoder = json.JSONDecoder()
+_whitespace = re.compile(r"\s*")
+
+
+class _JsonStream:
+    """Minimal pull parser over a text file, decoding one value at a time"""
+
+    def __init__(self, f: TextIO, max_value_chars: int = MAX_VALUE_CHARS):
+        self.f = f
+        self.max_value_chars = max_value_chars
+        self.buffer = ""
+        self.pos = 0
+        self.offset = 0  # Characters of input dropped from the front of the buffer
+
+    def _fill(self) -> bool:
+        chunk = self.f.read(READ_SIZE)
+        if not chunk:
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or '' at end of input"""
+        while True:
+            self.pos = _whitespace.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"Expected {char!r} in JSON input, found {found!r}")
+        self.pos += 1
+
+    def _grow(self) -> bool:
+        """Read more of the current value, refusing to buffer more than max_value_chars of it"""
+        if len(self.buffer) - self.pos > self.max_value_chars:
+            raise ValueError(
+                f"JSON value at character {self.offset + self.pos} is malformed or longer "
+                f"than {self.max_value_chars} characters"
+            )
+        return self._fill()
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self._grow():
+                    continue  # Value was cut off at the end of the buffer
+                raise ValueError(
+                    f"Invalid JSON at character {self.offset + e.pos}: {e.msg}"
+                ) from None
+            if end == len(self.buffer) and self._grow():
+                continue  # A trailing number may continue in the next chunk
+            self.pos = end
+            return value
+
+    def iter_array(self) -> Iterator[Any]:
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.peek() == "]":
+                self.pos += 1
+                return
+            self.expect(",")
+
+
+def _open_records(stream: _JsonStream, key: str) -> Iterator[Any]:
+    """Advance to the record array: the top-level array or the one under key"""
+    if stream.peek() == "[":
+        return stream.iter_array()
+
+    stream.expect("{")
+    while stream.peek() != "}":
+        name = stream.value()
+        stream.expect(":")
+        if name == key:
+            return stream.iter_array()
+        stream.value()  # Skip other members
+        if stream.peek() == ",":
+            stream.pos += 1
+    raise ValueError(f"JSON input has no {key!r} array")
+
+
+def _dumps_line(obj: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj) + b"\n"
+    return json.dumps(obj).encode() + b"\n"
+
+
+def _loads(data: bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _dumps_compact(obj: Any) -> str:
+    if orjson is not None:
+        return orjson.dumps(obj).decode()
+    return json.dumps(obj, separators=(",", ":"), ensure_ascii=False)
+
+
+def _dumps_indented(obj: Any) -> str:
+    if orjson is not None:
+        # Same layout as json.dumps(indent=2), but non-ASCII is written as UTF-8
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+    return json.dumps(obj, indent=2)
+
+
+def _write_records(f: TextIO, records: Iterable[Any], key: Optional[str], compact: bool) -> int:
+    """Write records indented by 2 (or compactly), wrapped as {key: [...]} when key is set"""
+    count = 0
+    if compact:
+        f.write("{" + json.dumps(key) + ":[" if key else "[")
+        for record in records:
+            f.write(("," if count else "") + _dumps_compact(record))
+            count += 1
+        f.write("]}" if key else "]")
+        return count
+
+    indent = "    " if key else "  "
+    if key:
+        f.write("{\n  " + json.dumps(key) + ": [")
+    else:
+        f.write("[")
+    for record in records:
+        text = _dumps_indented(record).replace("\n", "\n" + indent)
+        f.write(("," if count else "") + "\n" + indent + text)
+        count += 1
+    closing = "\n  ]" if key else "\n]"
+    f.write((closing if count else "]") + ("\n}" if key else ""))
+    return count
+
+
+def _iter_run(path: Path) -> Iterator[Any]:
+    with open(path, "rb") as f:
+        for line in f:
+            yield _loads(line)
+
+
+def sort_key(keys: List[str]) -> Callable[[Dict[str, Any]], Tuple]:
+    """Tuple of the given fields; missing fields sort as empty strings"""
+    return lambda record: tuple(record.get(name, "") for name in keys)
+
+
+def sort_json_records(
+    input_path: Path,
+    output_path: Path,
+    keys: List[str],
+    reverse: bool = False,
+    compact: bool = False,
+    records_key: str = "contacts",
+    run_size: int = RUN_SIZE,
+    spill_dir: Optional[Path] = None
+) -> int:
+    """Sort the records in input_path by keys into output_path; returns the record count.
+
+    The input is either a JSON array or an object holding the array under
+    records_key; the output has the same shape. The sort is stable.
+    """
+    key = sort_key(keys)
+
+    if orjson is not None and input_path.stat().st_size <= IN_MEMORY_BYTES:
+        data = orjson.loads(input_path.read_bytes())
+        wrapped = isinstance(data, dict)
+        records = data[records_key] if wrapped else data
+        records.sort(key=key, reverse=reverse)
+        with atomic_write(output_path, encoding="utf-8") as out:
+            return _write_records(out, records, records_key if wrapped else None, compact)
+
+    if spill_dir is not None:
+        spill_dir.mkdir(parents=True, exist_ok=True)
+    with open(input_path, encoding="utf-8") as f, \
+            tempfile.TemporaryDirectory(dir=spill_dir, prefix="sort-") as tmp_dir:
+        stream = _JsonStream(f)
+        wrapped = stream.peek() == "{"
+        runs: List[Path] = []
+        run: List[Any] = []
+
+        def spill() -> None:
+            # list.sort computes each key once; keys are stored so the merge needn't recompute them
+            run.sort(key=key, reverse=reverse)
+            path = Path(tmp_dir) / f"run-{len(runs)}.jsonl"
+            with open(path, "wb") as run_file:
+                run_file.writelines(_dumps_line([key(record), record]) for record in run)
+            runs.append(path)
+            run.clear()
+
+        for record in _open_records(stream, records_key):
+            run.append(record)
+            if len(run) >= run_size:
+                spill()
+
+        if runs:
+            if run:
+                spill()
+            # Keys round-trip through JSON as lists, which compare like the tuples
+            merged = heapq.merge(*(_iter_run(path) for path in runs), key=itemgetter(0), reverse=reverse)
+            records = (record for _, record in merged)
+        else:
+            run.sort(key=key, reverse=reverse)
+            records = run
+
+        with atomic_write(output_path, encoding="utf-8") as out:
+            return _write_records(out, records, records_key if wrapped else None, compact)
@@ -0,0 +1,63 @@
+"""
+Top-K most recent log files and their leading lines (A5).
+"""
+
+import heapq
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterator, List, Tuple
+
+from utils.file_ops import atomic_write
+
+HEAD_MAX_BYTES = 64 * 1024  # Upper bound read per file, however long its lines are
+HEAD_CHUNK_SIZE = 8 * 1024
+
+
+def _iter_logs(log_dir: Path, suffix: str) -> Iterator[Tuple[int, str]]:
+    """(mtime_ns, path) for each log file, using the stat data scandir caches"""
+    try:
+        entries = os.scandir(log_dir)
+    except (FileNotFoundError, NotADirectoryError):
+        return  # No logs yet: nothing to list, as a glob would find
+    with entries:
+        for entry in entries:
+            try:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    yield entry.stat().st_mtime_ns, entry.path
+            except FileNotFoundError:
+                continue  # Rotated away while listing
+
+
+def most_recent(log_dir: Path, count: int, suffix: str = ".log") -> List[str]:
+    """Paths of the count newest files, newest first, without sorting the whole directory"""
+    return [path for _, path in heapq.nlargest(count, _iter_logs(log_dir, suffix))]
+
+
+def read_head(path: str, lines: int = 1, max_bytes: int = HEAD_MAX_BYTES) -> List[str]:
+    """First lines of a file, reading at most max_bytes; an over-long line is truncated"""
+    buffer = b""
+    with open(path, "rb") as f:
+        while buffer.count(b"\n") < lines and len(buffer) < max_bytes:
+            chunk = f.read(min(HEAD_CHUNK_SIZE, max_bytes - len(buffer)))
+            if not chunk:
+                break
+            buffer += chunk
+
+    parts = buffer.split(b"\n")
+    if len(parts) > 1 and parts[-1] == b"":
+        parts.pop()  # Trailing newline, not an extra empty line
+    return [part.decode("utf-8", errors="replace").strip() for part in parts[:lines]]
+
+
+def write_recent_logs(log_dir: Path, output_path: Path, count: int = 10, lines: int = 1,
+                      max_bytes: int = HEAD_MAX_BYTES, workers: int = 8) -> int:
+    """Write the leading lines of the newest logs to output_path; returns the file count"""
+    paths = most_recent(log_dir, count)
+    with ThreadPoolExecutor(workers, thread_name_prefix="recent-logs") as pool, \
+            atomic_write(output_path) as out:
+        # map() yields in submission order, so output is written as heads arrive
+        for head in pool.map(lambda path: read_head(path, lines, max_bytes), paths):
+            for line in head:
+                out.write(f"{line}\n")
+    return len(paths)
@@ -0,0 +1,85 @@
+"""
+Most-similar-pair search over embeddings without materialising the N x N matrix.
+"""
+
+from typing import Optional, Tuple
+
+import numpy as np
+
+Pair = Tuple[float, int, int]  # (score, i, j) with i < j
+
+
+def normalize_rows(embeddings: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so dot products are cosine similarities"""
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1  # Zero vectors stay zero, matching sklearn
+    return vectors / norms
+
+
+def _better(candidate: Pair, best: Optional[Pair]) -> bool:
+    """Higher score wins; ties go to the first pair in row-major order"""
+    if best is None or candidate[0] > best[0]:
+        return True
+    return candidate[0] == best[0] and candidate[1:] < best[1:]
+
+
+def _best_pair(vectors: np.ndarray, block_size: int) -> Pair:
+    """Scan upper-triangular tiles of the similarity matrix keeping a running best"""
+    n = len(vectors)
+    best = None
+    for row_start in range(0, n, block_size):
+        rows = vectors[row_start:row_start + block_size]
+        for col_start in range(row_start, n, block_size):
+            tile = rows @ vectors[col_start:col_start + block_size].T
+            if col_start == row_start:
+                # Exclude self-similarity and the mirrored lower half
+                tile[np.tril_indices_from(tile)] = -np.inf
+            flat_idx = int(tile.argmax())
+            i, j = divmod(flat_idx, tile.shape[1])
+            candidate = (float(tile[i, j]), row_start + i, col_start + j)
+            if _better(candidate, best):
+                best = candidate
+    return best
+
+
+def most_similar_pair(embeddings: np.ndarray, block_size: int = 1024) -> Pair:
+    """Exact most similar pair using O(N*d + block_size^2) memory"""
+    if len(embeddings) < 2:
+        raise ValueError("Need at least two embeddings to find a similar pair")
+    return _best_pair(normalize_rows(embeddings), block_size)
+
+
+def approximate_most_similar_pair(
+    embeddings: np.ndarray,
+    n_bits: int = 16,
+    n_tables: int = 8,
+    block_size: int = 1024,
+    seed: int = 0
+) -> Pair:
+    """Random-projection LSH: only rows sharing a bucket in some table are compared"""
+    if len(embeddings) < 2:
+        raise ValueError("Need at least two embeddings to find a similar pair")
+
+    vectors = normalize_rows(embeddings)
+    rng = np.random.default_rng(seed)
+    weights = np.left_shift(1, np.arange(n_bits, dtype=np.int64))
+    best = None
+
+    for _ in range(n_tables):
+        planes = rng.standard_normal((vectors.shape[1], n_bits)).astype(np.float32)
+        codes = ((vectors @ planes) > 0) @ weights
+        order = np.argsort(codes, kind="stable")
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+
+        for bucket in np.split(order, boundaries):
+            if len(bucket) < 2:
+                continue
+            bucket = np.sort(bucket)
+            score, i, j = _best_pair(vectors[bucket], block_size)
+            candidate = (score, int(bucket[i]), int(bucket[j]))
+            if _better(candidate, best):
+                best = candidate
+
+    # Every row landed in its own bucket; fall back to the exact scan
+    return best if best is not None else _best_pair(vectors, block_size)
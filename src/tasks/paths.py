@@ -0,0 +1,15 @@
+"""
+Resolution of task-supplied paths against the data directory.
+"""
+
+from pathlib import Path
+from typing import Optional
+
+from config import settings
+
+DATA_DIR = Path(settings.data_dir)
+
+
+def data_path(path: Optional[str]) -> Optional[Path]:
+    """Absolute location under the data directory, or None if no path was given"""
+    return DATA_DIR / path.lstrip('/') if path else None
@@ -0,0 +1,132 @@
+"""
+Declarative registry of operations.
+
+Each operation lives in its own module exposing handle(task_details); the
+module, and the heavy libraries it uses, is imported on first dispatch. Its
+spec declares the files it reads and writes, where it should run and whether
+a previous run's outputs can be reused.
+"""
+
+import importlib
+import re
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Set, Tuple
+
+from .paths import data_path
+
+Handler = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+# Resource classes
+CPU = "cpu"  # CPU-bound Python: runs on the dispatcher's process pool
+IO = "io"  # Waits on disk, network or subprocesses: runs on the thread pool
+MODEL = "model"  # Uses a resident model or its own pool: stays in the API process
+
+PATH_FIELD = re.compile(r"^\{([\w.]+)(?:=([^}]*))?\}$")
+
+
+class OperationSpec(NamedTuple):
+    """What an operation touches and how it may be scheduled.
+
+    inputs and outputs are data-dir-relative files, either literal or
+    "{field}" / "{field=default}" references into the task details
+    (e.g. "{parameters.db_path}"). A literal input ending in "/" is a
+    directory whose contents are read.
+    """
+    module: str
+    resource: str = IO
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    cacheable: bool = False  # Outputs depend only on inputs and parameters
+    idempotent: bool = True  # Safe to run again after an interruption
+
+
+OPERATIONS: Dict[str, OperationSpec] = {
+    "A1": OperationSpec("tasks.operations.a1_datagen"),
+    "A2": OperationSpec("tasks.operations.a2_format", inputs=("format.md",), outputs=("format.md",)),
+    "A3": OperationSpec("tasks.operations.a3_weekdays", CPU, ("{input_path}",), ("{output_path}",),
+                        cacheable=True),
+    "A4": OperationSpec("tasks.operations.a4_contacts", IO, ("{input_path=contacts.json}",),
+                        ("{output_path=contacts-sorted.json}",), cacheable=True),
+    # Not cacheable: a directory's mtime doesn't change when a file in it is edited
+    "A5": OperationSpec("tasks.operations.a5_logs", inputs=("logs/",), outputs=("logs-recent.txt",)),
+    "A6": OperationSpec("tasks.operations.a6_docs", inputs=("docs/",), outputs=("docs/index.json",)),
+    "A7": OperationSpec("tasks.operations.a7_email", IO, ("email.txt",), ("email-sender.txt",)),
+    "A8": OperationSpec("tasks.operations.a8_credit_card"),
+    "A9": OperationSpec("tasks.operations.a9_similar_comments", CPU, ("comments.txt",),
+                        ("comments-similar.txt",), cacheable=True),
+    "A10": OperationSpec("tasks.operations.a10_ticket_sales", IO, ("ticket-sales.db",),
+                         ("ticket-sales-gold.txt",), cacheable=True),
+    "B3": OperationSpec("tasks.business.b3_api", outputs=("{output_path}",)),
+    "B4": OperationSpec("tasks.business.b4_git", idempotent=False),
+    "B5": OperationSpec("tasks.business.b5_query", IO, ("{parameters.db_path}",), ("{output_path}",),
+                        cacheable=True),
+    "B6": OperationSpec("tasks.business.b6_scrape", outputs=("{output_path}",)),
+    "B7": OperationSpec("tasks.business.b7_images", MODEL),  # Skips fresh images itself
+    "B8": OperationSpec("tasks.business.b8_transcribe", MODEL, ("{input_path}",), ("{output_path}",)),
+    "B9": OperationSpec("tasks.business.b9_markdown", IO, ("{input_path}",), ("{output_path}",),
+                        cacheable=True),
+    "B10": OperationSpec("tasks.business.b10_filter_csv"),
+}
+
+_handlers: Dict[str, Handler] = {}
+_handlers_lock = threading.Lock()
+
+
+def get_operation_spec(operation: str) -> OperationSpec:
+    spec = OPERATIONS.get(operation)
+    if spec is None:
+        raise ValueError(f"Unknown operation: {operation}")
+    return spec
+
+
+def _field(task_details: Dict[str, Any], name: str) -> Any:
+    value: Any = task_details
+    for part in name.split("."):
+        value = value.get(part) if isinstance(value, dict) else None
+    return value
+
+
+def _resolve(templates: Tuple[str, ...], task_details: Dict[str, Any]) -> List[Path]:
+    paths = []
+    for template in templates:
+        match = PATH_FIELD.match(template)
+        relative = (_field(task_details, match[1]) or match[2]) if match else template
+        if relative:  # Missing fields are left for the handler to report
+            paths.append(data_path(relative))
+    return paths
+
+
+def directory_inputs(operation: str) -> List[Path]:
+    """Inputs an operation declares as directories"""
+    spec = get_operation_spec(operation)
+    return [data_path(template) for template in spec.inputs if template.endswith("/")]
+
+
+def resolve_paths(operation: str, task_details: Dict[str, Any]) -> Tuple[List[Path], List[Path]]:
+    """(inputs, outputs) an operation declares for these task details"""
+    spec = get_operation_spec(operation)
+    return _resolve(spec.inputs, task_details), _resolve(spec.outputs, task_details)
+
+
+def get_operation_handler(operation: str) -> Handler:
+    """Handler for an operation, importing its module on first use"""
+    handler = _handlers.get(operation)
+    if handler is None:
+        spec = get_operation_spec(operation)
+        with _handlers_lock:
+            handler = _handlers.get(operation)
+            if handler is None:
+                handler = _handlers[operation] = importlib.import_module(spec.module).handle
+    return handler
+
+
+def preload_operations(operations: Iterable[str]) -> None:
+    """Import the given operations' modules now instead of on first dispatch"""
+    for operation in operations:
+        get_operation_handler(operation)
+
+
+def operations_with(resource: str) -> Set[str]:
+    """IDs of the operations in a resource class"""
+    return {operation for operation, spec in OPERATIONS.items() if spec.resource == resource}
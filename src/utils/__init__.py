@@ -3,7 +3,7 @@ Utility modules for file operations and security.
 """
 
 from .security import secure_operation, secure_file_operation, validate_path
-from .file_ops import secure_file_copy, secure_file_move
+from .file_ops import secure_file_copy, secure_file_move, atomic_write
 from .exceptions import TaskValidationError, TaskExecutionError, FileOperationError
 
 __all__ = [
@@ -12,6 +12,7 @@ __all__ = [
     'validate_path',
     'secure_file_copy',
     'secure_file_move',
+    'atomic_write',
     'TaskValidationError',
     'TaskExecutionError',
     'FileOperationError'
@@ -0,0 +1,258 @@
+"""
+Parallel, streaming ZIP archive builder.
+
+Members are deflated on a thread pool (zlib releases the GIL) into spooled
+temp files, then added in order to a zipfile.ZipFile writing to a
+non-seekable sink, so the archive can be streamed to an HTTP response.
+zipfile writes the headers, data descriptors, central directory and ZIP64
+records.
+"""
+
+import os
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple
+
+from .file_ops import atomic_write
+
+CHUNK_SIZE = 1024 * 1024
+SPOOL_MAX_SIZE = 4 * 1024 * 1024  # Compressed members larger than this spill to disk
+STORED_SUFFIXES = {
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".mp3", ".mp4", ".ogg",
+    ".zip", ".gz", ".bz2", ".xz", ".7z", ".parquet"
+}
+
+
+class _Member:
+    """One archive entry and where its data comes from"""
+
+    def __init__(self, info: zipfile.ZipInfo, kind: str):
+        self.info = info
+        self.kind = kind  # directory, stored, compressed or reused
+        self.path: Optional[Path] = None  # File to read and store while writing
+        self.spool: Optional[BinaryIO] = None  # Deflated data
+        self.source: Optional[Tuple[Path, int]] = None  # (archive, offset) of member data to copy
+
+
+class _Sink:
+    """Write-only, non-seekable buffer that zipfile writes into and iter_archive drains"""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _date_time(mtime: float) -> Tuple[int, ...]:
+    date_time = time.localtime(mtime)[:6]
+    return max(date_time, (1980, 1, 1, 0, 0, 0))  # Earliest date ZIP can store
+
+
+def _info(name: str, stat: os.stat_result) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(name, _date_time(stat.st_mtime))
+    info.external_attr = (stat.st_mode & 0xFFFF) << 16
+    return info
+
+
+def _write_raw(archive: zipfile.ZipFile, info: zipfile.ZipInfo, chunks: Iterator[bytes]) -> Iterator[None]:
+    """Add a member whose compressed data, CRC and sizes are already known.
+
+    zipfile has no public call for pre-compressed data, so this does what
+    ZipFile.writestr does after compressing: header, data, then registering
+    the entry for the central directory written by close().
+    """
+    info.header_offset = archive.fp.tell()
+    archive.fp.write(info.FileHeader())
+    yield
+    for chunk in chunks:
+        archive.fp.write(chunk)
+        yield
+    archive.filelist.append(info)
+    archive.NameToInfo[info.filename] = info
+    archive.start_dir = archive.fp.tell()
+
+
+class ParallelZipBuilder:
+    """Builds a ZIP of a directory tree with members compressed in parallel.
+
+    Already-compressed types are stored as-is, read once while they are
+    written so the CRC matches the bytes stored. With a previous archive,
+    members whose size and modification time are unchanged are copied over
+    without recompressing.
+    """
+
+    def __init__(self, workers: Optional[int] = None, compresslevel: int = 6,
+                 previous: Optional[Path] = None):
+        self.workers = workers or os.cpu_count() or 4
+        self.compresslevel = compresslevel
+        self.previous = previous
+        self.stats: Dict[str, int] = {"compressed": 0, "stored": 0, "reused": 0}
+        self._previous_infos: Dict[str, zipfile.ZipInfo] = {}
+
+    def _load_previous(self) -> None:
+        if self.previous is None or not self.previous.exists():
+            return
+        try:
+            with zipfile.ZipFile(self.previous) as previous:
+                self._previous_infos = {info.filename: info for info in previous.infolist()}
+        except zipfile.BadZipFile:
+            self._previous_infos = {}
+
+    def _reuse(self, name: str, stat: os.stat_result) -> Optional[_Member]:
+        previous = self._previous_infos.get(name)
+        info = _info(name, stat)
+        if (previous is None or previous.file_size != stat.st_size
+                # DOS timestamps have 2-second resolution
+                or previous.date_time[:5] != info.date_time[:5]
+                or previous.date_time[5] // 2 != info.date_time[5] // 2
+                or previous.flag_bits & 0x1  # Encrypted
+                or previous.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED)):
+            return None
+
+        with open(self.previous, "rb") as f:
+            f.seek(previous.header_offset)
+            header = f.read(30)
+        name_length, extra_length = struct.unpack("<2H", header[26:30])
+        info.compress_type = previous.compress_type
+        info.CRC = previous.CRC
+        info.compress_size = previous.compress_size
+        info.file_size = previous.file_size
+        member = _Member(info, "reused")
+        member.source = (self.previous, previous.header_offset + 30 + name_length + extra_length)
+        return member
+
+    def _prepare(self, path: Path, name: str) -> _Member:
+        """Runs on the pool: deflate one file, or note where its data comes from"""
+        stat = path.stat()
+        if path.is_dir():
+            info = _info(name + "/", stat)
+            info.external_attr |= 0x10  # MS-DOS directory flag
+            return _Member(info, "directory")
+
+        reused = self._reuse(name, stat)
+        if reused is not None:
+            return reused
+
+        info = _info(name, stat)
+        if path.suffix.lower() in STORED_SUFFIXES:
+            info.file_size = stat.st_size  # Lets zipfile decide on ZIP64 up front
+            member = _Member(info, "stored")
+            member.path = path
+            return member
+
+        compressor = zlib.compressobj(self.compresslevel, zlib.DEFLATED, -15)
+        spool = tempfile.SpooledTemporaryFile(SPOOL_MAX_SIZE)
+        crc = size = 0
+        try:
+            with open(path, "rb") as f:
+                while chunk := f.read(CHUNK_SIZE):
+                    crc = zlib.crc32(chunk, crc)
+                    size += len(chunk)
+                    spool.write(compressor.compress(chunk))
+            spool.write(compressor.flush())
+        except BaseException:
+            spool.close()
+            raise
+
+        info.compress_type = zipfile.ZIP_DEFLATED
+        info.CRC = crc
+        info.file_size = size
+        info.compress_size = spool.tell()
+        member = _Member(info, "compressed")
+        member.spool = spool
+        return member
+
+    @staticmethod
+    def _data(member: _Member) -> Iterator[bytes]:
+        """Data of a compressed or reused member, as it is stored in the archive"""
+        if member.spool is not None:
+            with member.spool:
+                member.spool.seek(0)
+                while chunk := member.spool.read(CHUNK_SIZE):
+                    yield chunk
+            return
+        path, offset = member.source
+        remaining = member.info.compress_size
+        with open(path, "rb") as f:
+            f.seek(offset)
+            while remaining:
+                chunk = f.read(min(CHUNK_SIZE, remaining))
+                if not chunk:
+                    raise IOError(f"{path} changed while it was being archived")
+                remaining -= len(chunk)
+                yield chunk
+
+    def _add(self, archive: zipfile.ZipFile, member: _Member) -> Iterator[None]:
+        """Write one member, pausing after each chunk so the sink can be drained"""
+        if member.kind == "directory":
+            archive.writestr(member.info, b"")
+        elif member.kind == "stored":
+            with open(member.path, "rb") as f, archive.open(member.info, "w") as dest:
+                while chunk := f.read(CHUNK_SIZE):
+                    dest.write(chunk)
+                    yield
+        else:
+            yield from _write_raw(archive, member.info, self._data(member))
+
+    def iter_archive(self, root: Path, paths: Optional[List[Path]] = None) -> Iterator[bytes]:
+        """Yield the archive bytes for paths (default: everything) under root"""
+        self._load_previous()
+        if paths is None:
+            paths = sorted(root.rglob("*"))
+        sink = _Sink()
+
+        with ThreadPoolExecutor(self.workers, thread_name_prefix="zip") as pool, \
+                zipfile.ZipFile(sink, "w") as archive:
+            pending = []
+            paths_iter = iter(paths)
+            # Keep a bounded window of members in flight so spooled data stays bounded
+            for path in paths_iter:
+                pending.append(pool.submit(self._prepare, path, path.relative_to(root).as_posix()))
+                if len(pending) >= self.workers * 2:
+                    break
+
+            try:
+                while pending:
+                    member = pending.pop(0).result()
+                    next_path = next(paths_iter, None)
+                    if next_path is not None:
+                        pending.append(pool.submit(
+                            self._prepare, next_path, next_path.relative_to(root).as_posix()
+                        ))
+
+                    for _ in self._add(archive, member):
+                        if data := sink.drain():
+                            yield data
+                    if data := sink.drain():
+                        yield data
+                    if member.kind != "directory":
+                        self.stats[member.kind] += 1
+            finally:
+                for future in pending:
+                    future.cancel()
+        yield sink.drain()  # Central directory and end records, written by close()
+
+    def write(self, root: Path, output_path: Path, paths: Optional[List[Path]] = None) -> Dict[str, int]:
+        """Build the archive into output_path atomically; returns member counts"""
+        if paths is None:
+            # Listed before the temp file exists, in case output_path is under root
+            paths = sorted(path for path in root.rglob("*") if path != output_path)
+        with atomic_write(output_path, "wb") as f:
+            for chunk in self.iter_archive(root, paths):
+                f.write(chunk)
+        return self.stats
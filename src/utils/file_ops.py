@@ -1,9 +1,30 @@
 from pathlib import Path
+from contextlib import contextmanager
+import os
 import shutil
-import zipfile
+import time
+import uuid
+from fastapi import HTTPException
+from config import settings
+from .security import get_path_validator, secure_file_operation, validate_directory, validate_path
+from .metrics import record_write
 
 DATA_DIR = Path("/data")
 
+@contextmanager
+def atomic_write(path: Path, mode: str = 'w', **kwargs):
+    """Write to a temp file beside path and rename it into place on success"""
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex}.tmp")
+    start = time.perf_counter()
+    try:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
+        os.replace(tmp_path, path)
+        record_write(time.perf_counter() - start)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
 @secure_file_operation
 def secure_file_copy(src: Path, dest: Path):
     shutil.copy2(src, dest)
@@ -12,11 +33,46 @@ def secure_file_copy(src: Path, dest: Path):
 def secure_file_move(src: Path, dest: Path):
     shutil.move(src, dest)
 
-@secure_file_operation
-def secure_zip_operation(input_path: Path, output_path: Path):
-    with zipfile.ZipFile(output_path, 'w') as zipf:
-        for file in input_path.rglob('*'):
-            zipf.write(file, arcname=file.relative_to(input_path))
+def _in_cache_dir(path: Path) -> bool:
+    """Whether path is, or resolves into, the cache directory (ledgers, profiles, clones)"""
+    cache_dir = settings.cache_dir.resolve()
+    try:
+        return path.absolute().is_relative_to(cache_dir) or path.resolve().is_relative_to(cache_dir)
+    except (OSError, RuntimeError):
+        return True
+
+def check_archive_source(input_path: Path) -> None:
+    """Raise 403 unless input_path is a directory that may be archived"""
+    if not validate_directory(input_path) or _in_cache_dir(input_path):
+        raise HTTPException(403, "Invalid archive source")
+
+def _archivable(path: Path) -> bool:
+    """Whether /read would serve path: same extension allowlist and size limit, never the cache"""
+    if _in_cache_dir(path):
+        return False
+    if path.is_dir():
+        return get_path_validator().contains(path)
+    try:
+        return validate_path(path) and path.stat().st_size <= settings.security.max_file_size
+    except OSError:
+        return False  # Vanished while listing
+
+def archive_members(input_path: Path):
+    """Paths under input_path that may be archived; symlinks leading outside the data directory are left out"""
+    return [path for path in sorted(input_path.rglob("*")) if _archivable(path)]
+
+def secure_zip_operation(input_path: Path, output_path: Path, incremental: bool = False):
+    """Archive input_path, reusing unchanged members of an existing output when incremental"""
+    # Checked here rather than by secure_file_operation, which only accepts
+    # files with allowed extensions and so rejects both of these paths
+    check_archive_source(input_path)
+    if output_path.suffix != ".zip" or not validate_directory(output_path.parent):
+        raise HTTPException(403, "Invalid archive path")
+    from .archive import ParallelZipBuilder
+    builder = ParallelZipBuilder(previous=output_path if incremental else None)
+    # Listed before the temp file exists, in case output_path is under input_path
+    paths = [path for path in archive_members(input_path) if path != output_path]
+    return builder.write(input_path, output_path, paths)
 
 @secure_file_operation
 def validate_file_signature(file_path: Path):
@@ -0,0 +1,123 @@
+"""
+Raw file responses with HTTP caching headers and single byte-range support.
+"""
+
+import logging
+import mimetypes
+import os
+import re
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Iterator, Optional, Tuple
+
+from fastapi import HTTPException, Request, Response
+from fastapi.responses import StreamingResponse
+
+logger = logging.getLogger(__name__)
+
+CHUNK_SIZE = 256 * 1024
+RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _etag(stat: os.stat_result) -> str:
+    return f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+
+
+def _not_modified(request: Request, etag: str, mtime: float) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+        return "*" in tags or etag in tags
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def _byte_range(request: Request, size: int, etag: str, last_modified: str) -> Optional[Tuple[int, int]]:
+    """Requested (start, end) inclusive, or None to send the whole file"""
+    header = request.headers.get("range")
+    if not header:
+        return None
+
+    # A stale If-Range means the client's partial copy is outdated
+    if_range = request.headers.get("if-range")
+    if if_range and if_range not in (etag, last_modified):
+        return None
+
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.group(1) == match.group(2) == "":
+        return None  # Multiple or malformed ranges: serve the full file
+
+    first, last = match.groups()
+    if first == "":
+        start, end = max(size - int(last), 0), size - 1  # Suffix range: last N bytes
+    else:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            detail="Requested range not satisfiable",
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+def _iter_file(path: Path, start: int, length: int) -> Iterator[bytes]:
+    """Yield a byte range in bounded pread chunks.
+
+    The file may be written while it is sent (B8 appends to its transcript),
+    so bytes past the range are never read and a file that shrinks ends the
+    body early rather than failing, leaving it shorter than Content-Length.
+    """
+    if length == 0:
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        position, stop = start, start + length
+        while position < stop:
+            chunk = os.pread(fd, min(CHUNK_SIZE, stop - position), position)
+            if not chunk:
+                logger.warning("%s shrank while being sent; stopped at byte %d of %d", path, position, stop)
+                return
+            yield chunk
+            position += len(chunk)
+    finally:
+        os.close(fd)
+
+
+def file_response(request: Request, path: Path, max_size: int) -> Response:
+    """Stream a file as raw bytes honouring conditional and Range requests"""
+    stat = path.stat()
+    if stat.st_size > max_size:
+        raise HTTPException(status_code=413, detail="File exceeds the maximum allowed size")
+
+    etag = _etag(stat)
+    last_modified = formatdate(stat.st_mtime, usegmt=True)
+    headers = {"ETag": etag, "Last-Modified": last_modified, "Accept-Ranges": "bytes"}
+
+    if _not_modified(request, etag, stat.st_mtime):
+        return Response(status_code=304, headers=headers)
+
+    media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+    byte_range = _byte_range(request, stat.st_size, etag, last_modified)
+    if byte_range is None:
+        start, length, status_code = 0, stat.st_size, 200
+    else:
+        start, end = byte_range
+        length, status_code = end - start + 1, 206
+        headers["Content-Range"] = f"bytes {start}-{end}/{stat.st_size}"
+
+    headers["Content-Length"] = str(length)
+    return StreamingResponse(
+        _iter_file(path, start, length),
+        status_code=status_code,
+        media_type=media_type,
+        headers=headers
+    )
@@ -0,0 +1,169 @@
+"""
+Pooled HTTP client that streams downloads to disk and revalidates them with conditional GETs.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from .file_ops import atomic_write
+from .metrics import REGISTRY
+
+Stamp = Tuple[int, int]  # (mtime_ns, size) of a downloaded file
+
+
+def _stamp(path: Path) -> Optional[Stamp]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+class ResponseTooLarge(ValueError):
+    """The response body is over the download size limit"""
+
+
+class UnexpectedResponse(ValueError):
+    """The server answered with a status that has no body to save"""
+
+
+class HttpClient:
+    """Shared keep-alive session with bounded per-host pools.
+
+    Each download's ETag and Last-Modified are stored with the stamp of the
+    file written. The next download of the same URL to the same file sends
+    them back, so an unchanged resource costs a 304 and no write, as long as
+    the file on disk hasn't been changed since.
+    """
+
+    def __init__(self, db_path: Optional[Path], pool_hosts: int, per_host: int, timeout: float,
+                 max_bytes: int, chunk_size: int):
+        # Imported here so processes that never fetch URLs don't load requests
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.chunk_size = chunk_size
+        self.hits = 0
+        self.misses = 0
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=per_host, pool_block=True)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if db_path is not None:
+            db_path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(db_path), check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS http_cache (
+                    key TEXT PRIMARY KEY,
+                    url TEXT NOT NULL,
+                    etag TEXT,
+                    last_modified TEXT,
+                    mtime_ns INTEGER NOT NULL,
+                    size INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+            self._conn.commit()
+
+    @staticmethod
+    def _key(url: str, output_path: Path) -> str:
+        return hashlib.sha256(f"{url}\0{output_path}".encode()).hexdigest()
+
+    def _validators(self, key: str, output_path: Path) -> Dict[str, str]:
+        if self._conn is None:
+            return {}
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT etag, last_modified, mtime_ns, size FROM http_cache WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or _stamp(output_path) != (row[2], row[3]):
+            return {}
+        headers = {}
+        if row[0]:
+            headers["If-None-Match"] = row[0]
+        if row[1]:
+            headers["If-Modified-Since"] = row[1]
+        return headers
+
+    def _remember(self, key: str, url: str, output_path: Path, headers: Any) -> None:
+        stamp = _stamp(output_path)
+        etag, last_modified = headers.get("ETag"), headers.get("Last-Modified")
+        if self._conn is None or stamp is None:
+            return
+        with self._lock:
+            if etag or last_modified:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO http_cache VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (key, url, etag, last_modified, stamp[0], stamp[1], time.time())
+                )
+            else:
+                self._conn.execute("DELETE FROM http_cache WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def download(self, url: str, output_path: Path) -> Dict[str, Any]:
+        """Stream url into output_path atomically; returns status, bytes and whether it was a 304"""
+        key = self._key(url, output_path)
+        headers = self._validators(key, output_path)
+        with self._session.get(url, headers=headers, timeout=self.timeout, stream=True) as response:
+            if response.status_code == 304 and headers:
+                response.content  # Read the empty body so the connection goes back to the pool
+                with self._lock:
+                    self.hits += 1
+                return {"status_code": 304, "bytes": 0, "not_modified": True}
+            response.raise_for_status()
+            if response.status_code >= 300:
+                # Redirects are followed, so this is a 304 we didn't ask for or a redirect without a target
+                raise UnexpectedResponse(f"Unexpected {response.status_code} response from {url}")
+            with self._lock:
+                self.misses += 1
+
+            length = response.headers.get("Content-Length")
+            if length is not None and length.isdigit() and int(length) > self.max_bytes:
+                raise ResponseTooLarge(f"Response of {length} bytes exceeds the {self.max_bytes} byte limit")
+
+            written = 0
+            with atomic_write(output_path, 'wb') as f:
+                for chunk in response.iter_content(self.chunk_size):
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        raise ResponseTooLarge(f"Response exceeds the {self.max_bytes} byte limit")
+                    f.write(chunk)
+            self._remember(key, url, output_path, response.headers)
+        return {"status_code": response.status_code, "bytes": written, "not_modified": False}
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """Return the process-wide HTTP client"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HttpClient(
+                    settings.cache_dir / "http.sqlite" if settings.http.cache_enabled else None,
+                    pool_hosts=settings.http.pool_hosts,
+                    per_host=settings.http.per_host,
+                    timeout=settings.http.timeout,
+                    max_bytes=settings.security.max_file_size,
+                    chunk_size=settings.http.chunk_size
+                )
+                REGISTRY.register_cache("http", _client.stats)
+    return _client
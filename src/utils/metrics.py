@@ -0,0 +1,286 @@
+"""
+In-process metrics rendered in the Prometheus text exposition format.
+
+Recording is a dict update under a per-metric lock. Values owned by other
+components (queue depths, cache counters) are read by callbacks only when
+/metrics is scraped, so they cost nothing on the request path. Dispatcher
+worker processes drain what they recorded after each task and the parent
+merges it, so /metrics covers handlers run in either place.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+LabelValues = Tuple[str, ...]
+Sample = Tuple[LabelValues, float]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+class Counter:
+    """Monotonic count per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def drain(self) -> Dict[LabelValues, float]:
+        """Values recorded since the last drain, which are reset"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, float]) -> None:
+        """Add values drained from another process"""
+        for labels, amount in values.items():
+            self.inc(*labels, amount=amount)
+
+    def render(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class Histogram:
+    """Bucketed distribution of observed values per label combination"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last is +Inf), sum]
+        self._values: Dict[LabelValues, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def drain(self) -> Dict[LabelValues, List[Any]]:
+        """Values recorded since the last drain, which are reset"""
+        with self._lock:
+            values, self._values = self._values, {}
+        return values
+
+    def merge(self, values: Dict[LabelValues, List[Any]]) -> None:
+        """Add values drained from another process"""
+        with self._lock:
+            for labels, (counts, total) in values.items():
+                entry = self._values.get(labels)
+                if entry is None:
+                    entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+                entry[0] = [mine + theirs for mine, theirs in zip(entry[0], counts)]
+                entry[1] += total
+
+    @contextmanager
+    def time(self, *labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labels)
+
+    def render(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted((labels, (list(counts), total)) for labels, (counts, total) in self._values.items())
+        names = self.labelnames + ("le",)
+        for labels, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                yield (f"{self.name}_bucket{_format_labels(names, labels + (_format_value(bound),))} "
+                       f"{cumulative}")
+            label_text = _format_labels(self.labelnames, labels)
+            yield f"{self.name}_sum{label_text} {_format_value(total)}"
+            yield f"{self.name}_count{label_text} {cumulative}"
+
+
+class CallbackMetric:
+    """Gauge or counter whose samples are produced by a function at scrape time"""
+
+    def __init__(self, name: str, help_text: str, kind: str, labelnames: Sequence[str],
+                 collect: Callable[[], Iterable[Sample]]):
+        self.name = name
+        self.help_text = help_text
+        self.kind = kind
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def render(self) -> Iterator[str]:
+        for labels, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, Any] = {}
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self._drained_caches: Dict[str, Dict[str, int]] = {}  # Stats as of the last drain
+        self._merged_caches: Dict[str, Dict[str, int]] = {}  # Counts merged from workers
+        self._lock = threading.Lock()
+        self.register(CallbackMetric(
+            "dataworks_cache_hits_total", "Cache hits by cache", "counter", ("cache",),
+            lambda: self._cache_samples("hits")
+        ))
+        self.register(CallbackMetric(
+            "dataworks_cache_misses_total", "Cache misses by cache", "counter", ("cache",),
+            lambda: self._cache_samples("misses")
+        ))
+
+    def register(self, metric: Any) -> Any:
+        with self._lock:
+            self._metrics[metric.name] = metric
+        return metric
+
+    def gauge(self, name: str, help_text: str, collect: Callable[[], Iterable[Sample]],
+              labelnames: Sequence[str] = ()) -> CallbackMetric:
+        """Register a gauge read from collect() at scrape time"""
+        return self.register(CallbackMetric(name, help_text, "gauge", labelnames, collect))
+
+    def register_cache(self, name: str, stats: Callable[[], Dict[str, int]]) -> None:
+        """Export a cache's stats() hits and misses"""
+        with self._lock:
+            self._caches[name] = stats
+
+    def _cache_samples(self, field: str) -> Iterator[Sample]:
+        with self._lock:
+            caches = dict(self._caches)
+            merged = {name: counts.get(field, 0) for name, counts in self._merged_caches.items()}
+        for name in sorted(set(caches) | set(merged)):
+            local = caches[name]().get(field, 0) if name in caches else 0
+            yield (name,), local + merged.get(name, 0)
+
+    def drain(self) -> Dict[str, Any]:
+        """Counts recorded in this process since the last drain, for merge() in another"""
+        with self._lock:
+            metrics = [metric for metric in self._metrics.values() if hasattr(metric, "drain")]
+            caches = dict(self._caches)
+        drained: Dict[str, Any] = {"metrics": {}, "caches": {}}
+        for metric in metrics:
+            values = metric.drain()
+            if values:
+                drained["metrics"][metric.name] = values
+        for name, stats in caches.items():
+            current = stats()
+            with self._lock:
+                previous = self._drained_caches.get(name, {})
+                self._drained_caches[name] = current
+            delta = {field: current.get(field, 0) - previous.get(field, 0) for field in ("hits", "misses")}
+            if any(delta.values()):
+                drained["caches"][name] = delta
+        return drained
+
+    def merge(self, drained: Dict[str, Any]) -> None:
+        """Add counts drained from a worker process"""
+        with self._lock:
+            metrics = {name: self._metrics.get(name) for name in drained["metrics"]}
+            for name, delta in drained["caches"].items():
+                counts = self._merged_caches.setdefault(name, {})
+                for field, amount in delta.items():
+                    counts[field] = counts.get(field, 0) + amount
+        for name, values in drained["metrics"].items():
+            if metrics[name] is not None:
+                metrics[name].merge(values)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.help_text}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+TASKS = REGISTRY.register(Counter(
+    "dataworks_tasks_total", "Tasks dispatched, by operation and outcome", ("operation", "status")
+))
+TASK_PHASE_SECONDS = REGISTRY.register(Histogram(
+    "dataworks_task_phase_seconds", "Task latency by operation and phase (parse, execute, write)",
+    ("operation", "phase")
+))
+LLM_TOKENS = REGISTRY.register(Counter(
+    "dataworks_llm_tokens_total", "LLM tokens used, by model and kind (prompt, completion)",
+    ("model", "kind")
+))
+MODEL_LOAD_SECONDS = REGISTRY.register(Histogram(
+    "dataworks_model_load_seconds", "Time to load a model into memory", ("model",)
+))
+
+_local = threading.local()
+
+
+def record_write(seconds: float) -> None:
+    """Add to the write time of the task running on this thread, if one is measured.
+
+    Called by utils.file_ops.atomic_write, so the write phase covers outputs a
+    handler writes through it on its own thread. Files written elsewhere count
+    as execute time: B7 images (image worker processes), B8 transcripts
+    (background jobs), B4 files (written into the git clone) and A2 (prettier
+    rewrites the file itself).
+    """
+    if getattr(_local, "write_seconds", None) is not None:
+        _local.write_seconds += seconds
+
+
+def measured_call(func: Callable[[Any], Any], arg: Any,
+                  report_metrics: bool = False) -> Tuple[Any, float, float, Optional[Dict[str, Any]]]:
+    """Call func(arg); returns (result, total seconds, seconds spent writing outputs, metrics).
+
+    Module-level so it can run in a worker process and report its timings back.
+    With report_metrics, metrics is what this process recorded since the last
+    report (REGISTRY.drain()), for the parent to merge; otherwise it is None.
+    Counts recorded by a call that raises are reported with the next one.
+    """
+    _local.write_seconds = 0.0
+    start = time.perf_counter()
+    try:
+        result = func(arg)
+        seconds, write_seconds = time.perf_counter() - start, _local.write_seconds
+    finally:
+        _local.write_seconds = None
+    return result, seconds, write_seconds, REGISTRY.drain() if report_metrics else None
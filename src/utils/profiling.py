@@ -0,0 +1,175 @@
+"""
+Opt-in per-request profiling of task handlers with cProfile or a stack sampler.
+
+Profiles are written by whichever thread or worker process ran the handler
+and can be fetched as pstats, collapsed stacks (for flamegraph tools) or text.
+"""
+
+import cProfile
+import io
+import itertools
+import json
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+MODES = {"cprofile": ".pstats", "sampling": ".collapsed"}
+PROFILE_ID_LENGTH = 32
+
+
+class SamplingProfiler:
+    """Samples one thread's stack every interval seconds from a background thread"""
+
+    def __init__(self, thread_id: int, interval: float):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            if stack:
+                self.samples[";".join(reversed(stack))] += 1
+
+    def __enter__(self) -> "SamplingProfiler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, one 'frame;frame count' per line"""
+        return "".join(f"{stack} {count}\n" for stack, count in self.samples.most_common())
+
+
+def profiled_call(func: Callable[[Any], Any], mode: str, path: Path, interval: float, arg: Any) -> Any:
+    """Run func(arg) under the given profiler and write the profile to path.
+
+    Module-level (and used through functools.partial) so it can run in a
+    worker process.
+    """
+    if mode == "cprofile":
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, arg)
+        finally:
+            profiler.dump_stats(path)
+
+    sampler = SamplingProfiler(threading.get_ident(), interval)
+    try:
+        with sampler:
+            return func(arg)
+    finally:
+        path.write_text(sampler.collapsed())
+
+
+class ProfileStore:
+    """Decides which requests to profile and keeps the newest profiles on disk"""
+
+    def __init__(self, directory: Path, sample_every: int, default_mode: str,
+                 interval: float, max_profiles: int):
+        self.directory = directory
+        self.sample_every = sample_every
+        self.default_mode = default_mode
+        self.interval = interval
+        self.max_profiles = max_profiles
+        self._requests = itertools.count(1)
+
+    def choose(self, header: Optional[str]) -> Optional[str]:
+        """Profiler mode for this request, or None to run it unprofiled.
+
+        The X-Profile header is honoured only in debug mode; otherwise one in
+        every sample_every requests is profiled.
+        """
+        if header and settings.debug:
+            return header.lower() if header.lower() in MODES else self.default_mode
+        if self.sample_every > 0 and next(self._requests) % self.sample_every == 0:
+            return self.default_mode
+        return None
+
+    def new_profile(self, mode: str) -> Tuple[str, Path]:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profile_id = uuid.uuid4().hex
+        return profile_id, self.directory / f"{profile_id}{MODES[mode]}"
+
+    def save_metadata(self, profile_id: str, mode: str, task_details: Dict[str, Any],
+                      seconds: float, error: Optional[str] = None) -> None:
+        """Record a profile; error is set when the profiled task failed"""
+        metadata = {
+            "id": profile_id,
+            "mode": mode,
+            "operation": task_details.get('operation'),
+            "status": "error" if error is not None else "success",
+            "error": error,
+            "seconds": round(seconds, 4),
+            "created": time.time()
+        }
+        (self.directory / f"{profile_id}.json").write_text(json.dumps(metadata))
+        logger.info("Profiled %s in %.3fs as %s", metadata["operation"], seconds, profile_id)
+        self._prune()
+
+    def _prune(self) -> None:
+        metadata_files = sorted(self.directory.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for stale in metadata_files[:-self.max_profiles]:
+            for path in self.directory.glob(f"{stale.stem}.*"):
+                path.unlink(missing_ok=True)
+
+    def render(self, profile_id: str, output_format: str) -> Optional[Tuple[bytes, str]]:
+        """(body, media type) of a stored profile, or None if it doesn't exist in that format"""
+        if len(profile_id) != PROFILE_ID_LENGTH or not profile_id.isalnum():
+            return None
+        pstats_path = self.directory / f"{profile_id}.pstats"
+        collapsed_path = self.directory / f"{profile_id}.collapsed"
+
+        if output_format == "pstats" and pstats_path.exists():
+            return pstats_path.read_bytes(), "application/octet-stream"
+        if output_format == "collapsed" and collapsed_path.exists():
+            return collapsed_path.read_bytes(), "text/plain"
+        if output_format == "text":
+            if pstats_path.exists():
+                out = io.StringIO()
+                pstats.Stats(str(pstats_path), stream=out).sort_stats("cumulative").print_stats(50)
+                return out.getvalue().encode(), "text/plain"
+            if collapsed_path.exists():
+                return collapsed_path.read_bytes(), "text/plain"
+        return None
+
+
+_store: Optional[ProfileStore] = None
+_store_lock = threading.Lock()
+
+
+def get_profile_store() -> ProfileStore:
+    """Return the process-wide profile store"""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = ProfileStore(
+                    settings.cache_dir / "profiles",
+                    sample_every=settings.profile.sample_every,
+                    default_mode=settings.profile.mode,
+                    interval=settings.profile.interval,
+                    max_profiles=settings.profile.max_profiles
+                )
+    return _store
@@ -1,41 +1,112 @@
 from pathlib import Path
 from functools import wraps
+from collections import OrderedDict
+from typing import Iterable, Optional, Tuple
 from fastapi import HTTPException
 from config import settings
+import os
+import threading
 
-def validate_path(path: Path) -> bool:
-    """Validate file path against security requirements"""
-    try:
-        # Resolve path to handle .. and symbolic links
-        resolved_path = path.resolve()
-        data_dir = Path(settings.data_dir).resolve()
-        
-        # Check if path is within allowed directory
-        if not str(resolved_path).startswith(str(data_dir)):
+Stamp = Optional[Tuple[str, int, int]]
+
+class PathValidator:
+    """Checks paths against allowed roots resolved once, caching results per path string.
+
+    A cached result is reused only while the lstat() identity (inode, mtime) of
+    the path, or of its nearest existing ancestor, is unchanged, so replacing a
+    symlink or creating the file invalidates it.
+    """
+
+    def __init__(self, roots: Iterable[str], max_entries: int = 4096):
+        self.roots = tuple(Path(root).resolve() for root in roots)
+        self.max_entries = max_entries
+        self._cache: "OrderedDict[str, Tuple[Stamp, bool]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(path: str) -> Stamp:
+        probe = path
+        while True:
+            try:
+                stat = os.lstat(probe)
+                return probe, stat.st_ino, stat.st_mtime_ns
+            except OSError:
+                parent = os.path.dirname(probe)
+                if parent == probe:
+                    return None
+                probe = parent
+
+    def _check(self, path: Path) -> bool:
+        try:
+            # Check file extension
+            if path.suffix not in settings.security.allowed_extensions:
+                return False
+
+            # Resolve path to handle .. and symbolic links
+            resolved_path = path.resolve()
+            return any(resolved_path.is_relative_to(root) for root in self.roots)
+        except Exception:
             return False
-            
-        # Check file extension
-        if path.suffix not in settings.security.allowed_extensions:
+
+    def contains(self, path: Path) -> bool:
+        """Whether path resolves inside an allowed root, whatever its extension"""
+        try:
+            resolved_path = path.resolve()
+        except (OSError, RuntimeError):
             return False
-            
-        return True
-    except Exception:
-        return False
+        return any(resolved_path.is_relative_to(root) for root in self.roots)
+
+    def __call__(self, path: Path) -> bool:
+        key = str(path)
+        stamp = self._stamp(key)
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == stamp:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        result = self._check(path)
+        with self._lock:
+            self._cache[key] = (stamp, result)
+            self._cache.move_to_end(key)
+            if len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+        return result
+
+_validator: Optional[PathValidator] = None
+_validator_lock = threading.Lock()
+
+def get_path_validator() -> PathValidator:
+    """Return the process-wide validator for settings.data_dir"""
+    global _validator
+    if _validator is None:
+        with _validator_lock:
+            if _validator is None:
+                _validator = PathValidator([settings.data_dir], settings.security.path_cache_size)
+    return _validator
+
+def validate_path(path: Path) -> bool:
+    """Validate file path against security requirements"""
+    return get_path_validator()(path)
+
+def validate_directory(path: Path) -> bool:
+    """Validate that path is an existing directory inside the data directory"""
+    return path.is_dir() and get_path_validator().contains(path)
+
+def check_restricted(task: str) -> None:
+    """Raise 403 if the task mentions a restricted operation"""
+    for op in settings.security.restricted_operations:
+        if op in task.lower():
+            raise HTTPException(
+                status_code=403,
+                detail="Operation not allowed for security reasons"
+            )
 
 def secure_operation(func):
     """Decorator to enforce security requirements"""
     @wraps(func)
     async def wrapper(*args, **kwargs):
-        task = kwargs.get('task', '')
-        
-        # Check for restricted operations
-        for op in settings.security.restricted_operations:
-            if op in task.lower():
-                raise HTTPException(
-                    status_code=403,
-                    detail="Operation not allowed for security reasons"
-                )
-        
+        check_restricted(kwargs.get('task', ''))
         return await func(*args, **kwargs)
     return wrapper
 
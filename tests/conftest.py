@@ -0,0 +1,15 @@
+"""
+Shared test setup: import from src/ and point settings at a throwaway data dir.
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+sys.path.insert(0, str(SRC_DIR))
+
+# Settings are read when config is first imported, so these must be set first
+os.environ.setdefault("AIPROXY_TOKEN", "test-token")
+os.environ.setdefault("DATA_DIR", tempfile.mkdtemp(prefix="dataworks-tests-"))
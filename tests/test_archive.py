@@ -0,0 +1,119 @@
+import io
+import os
+import zipfile
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import main
+from config import settings
+from tasks.paths import DATA_DIR
+from utils.archive import ParallelZipBuilder
+from utils.file_ops import archive_members, secure_zip_operation
+
+
+@pytest.fixture
+def tree(tmp_path):
+    root = DATA_DIR / tmp_path.name
+    (root / "docs" / "nested").mkdir(parents=True)
+    (root / "docs" / "a.md").write_text("# heading\n" * 1000)
+    (root / "docs" / "nested" / "b.txt").write_text("plain text")
+    (root / "docs" / "café.txt").write_text("non-ascii name")
+    (root / "photo.png").write_bytes(os.urandom(50_000))
+    (root / "empty").mkdir()
+    return root
+
+
+def contents(data: bytes):
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.testzip() is None
+        return {info.filename: archive.read(info) for info in archive.infolist()}
+
+
+def expected(root):
+    files = {p.relative_to(root).as_posix(): p.read_bytes() for p in root.rglob("*") if p.is_file()}
+    files.update({p.relative_to(root).as_posix() + "/": b"" for p in root.rglob("*") if p.is_dir()})
+    return files
+
+
+def test_streamed_archive_round_trips(tree):
+    builder = ParallelZipBuilder(workers=2)
+    data = b"".join(builder.iter_archive(tree))
+    assert contents(data) == expected(tree)
+    assert builder.stats == {"compressed": 3, "stored": 1, "reused": 0}
+    with zipfile.ZipFile(io.BytesIO(data)) as archive:
+        assert archive.getinfo("docs/a.md").compress_type == zipfile.ZIP_DEFLATED
+        assert archive.getinfo("photo.png").compress_type == zipfile.ZIP_STORED
+
+
+def test_incremental_rebuild_reuses_unchanged_members(tree, tmp_path):
+    output_path = tmp_path / "tree.zip"
+    ParallelZipBuilder().write(tree, output_path)
+    (tree / "docs" / "nested" / "b.txt").write_text("changed text, different size")
+
+    stats = ParallelZipBuilder(previous=output_path).write(tree, output_path)
+    assert stats == {"compressed": 1, "stored": 0, "reused": 3}
+    assert contents(output_path.read_bytes()) == expected(tree)
+
+
+def test_secure_zip_operation_archives_a_data_directory(tree):
+    files = expected(tree)
+    output_path = tree / "out.zip"
+    secure_zip_operation(tree, output_path)
+    assert contents(output_path.read_bytes()) == files
+
+
+def test_secure_zip_operation_rejects_bad_paths(tree, tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    with pytest.raises(HTTPException) as error:
+        secure_zip_operation(outside, tree / "out.zip")
+    assert error.value.status_code == 403
+    with pytest.raises(HTTPException):
+        secure_zip_operation(tree, tree / "out.txt")
+    with pytest.raises(HTTPException):
+        secure_zip_operation(tree, outside / "out.zip")
+
+
+def test_archive_route_streams_a_zip(tree, tmp_path, monkeypatch):
+    secret = tmp_path / "secret.txt"
+    secret.write_text("outside the data dir")
+    (tree / "link.txt").symlink_to(secret)
+    monkeypatch.setattr(main, "DATA_DIR", DATA_DIR)
+
+    response = TestClient(main.app).get("/archive", params={"path": tree.name})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    files = contents(response.content)
+    assert "link.txt" not in files
+    assert files["docs/café.txt"] == b"non-ascii name"
+
+    missing = TestClient(main.app).get("/archive", params={"path": "no-such-dir"})
+    assert missing.status_code == 403
+
+
+def test_archive_leaves_out_files_read_would_refuse(tree, monkeypatch):
+    (tree / "app.env").write_text("SECRET=1")
+    (tree / "docs" / "large.txt").write_text("x" * 2048)
+    monkeypatch.setattr(settings.security, "max_file_size", 1024)
+    monkeypatch.setattr(main, "DATA_DIR", DATA_DIR)
+
+    response = TestClient(main.app).get("/archive", params={"path": tree.name})
+    files = contents(response.content)
+    assert "app.env" not in files and "docs/large.txt" not in files
+    assert files["docs/nested/b.txt"] == b"plain text"
+
+
+def test_archive_never_includes_the_cache(tree, monkeypatch):
+    profile = settings.cache_dir / "profiles" / "abc.txt"
+    profile.parent.mkdir(parents=True, exist_ok=True)
+    profile.write_text("profile")
+    (tree / "cache-link").symlink_to(settings.cache_dir)
+    monkeypatch.setattr(main, "DATA_DIR", DATA_DIR)
+
+    members = archive_members(DATA_DIR)
+    assert members and not any(".cache" in path.parts for path in members)
+    assert not any(path.name == "cache-link" or "cache-link" in path.parts for path in members)
+    assert TestClient(main.app).get("/archive", params={"path": ".cache"}).status_code == 403
+    assert TestClient(main.app).get("/archive", params={"path": ".cache/profiles"}).status_code == 403
@@ -0,0 +1,62 @@
+import threading
+import time
+
+import pytest
+
+from tasks.business import b8_transcribe
+from tasks.business.transcription import TranscriptionService, WhisperModelRegistry
+from tasks.exceptions import TaskRejectedError
+
+
+class FakeJob:
+    id = "job-1"
+
+
+class FakeService:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, input_path, output_path, model_size):
+        self.submitted.append(model_size)
+        return FakeJob()
+
+
+def task(**parameters):
+    return {"operation": "B8", "input_path": "audio.mp3", "output_path": "audio.txt",
+            "parameters": parameters}
+
+
+def test_returns_job_id_without_waiting(monkeypatch):
+    service = FakeService()
+    monkeypatch.setattr(b8_transcribe, "get_transcription_service", lambda: service)
+    result = b8_transcribe.handle(task())
+    assert result["result"]["job_id"] == "job-1"
+    assert result["result"]["status_url"] == "/api/v1/transcriptions/job-1"
+    assert service.submitted == ["base"]
+
+
+def test_rejects_models_outside_the_allowlist(monkeypatch):
+    service = FakeService()
+    monkeypatch.setattr(b8_transcribe, "get_transcription_service", lambda: service)
+    with pytest.raises(ValueError, match="not allowed"):
+        b8_transcribe.handle(task(model="large-v3"))
+    assert service.submitted == []
+
+
+def test_service_rejects_jobs_over_the_pending_limit(tmp_path, monkeypatch):
+    release = threading.Event()
+    monkeypatch.setattr(TranscriptionService, "_run", lambda self, job: release.wait(5))
+    service = TranscriptionService(WhisperModelRegistry(), max_workers=1, segment_seconds=60,
+                                   max_jobs=10, max_pending=2, retry_after=7)
+    try:
+        jobs = [service.submit(tmp_path / "a.mp3", tmp_path / "a.txt", "base") for _ in range(2)]
+        with pytest.raises(TaskRejectedError) as error:
+            service.submit(tmp_path / "a.mp3", tmp_path / "a.txt", "base")
+        assert (error.value.status_code, error.value.retry_after) == (429, 7)
+
+        jobs[0].finished_at = time.time()  # A finished job frees its slot
+        job = service.submit(tmp_path / "a.mp3", tmp_path / "a.txt", "base")
+        assert service.get(job.id) is job
+    finally:
+        release.set()
+        service._executor.shutdown(wait=True)
@@ -0,0 +1,82 @@
+import asyncio
+
+import pytest
+
+from tasks.batch import plan, run_batch
+from tasks.exceptions import TaskRejectedError
+
+
+class FakeDispatcher:
+    """Fails tasks marked fail, and rejects each task its first reject times"""
+
+    def __init__(self):
+        self.dispatched = []
+        self.attempts = {}
+
+    async def dispatch(self, task_details):
+        name = task_details["name"]
+        self.attempts[name] = self.attempts.get(name, 0) + 1
+        if self.attempts[name] <= task_details.get("reject", 0):
+            raise TaskRejectedError("busy", status_code=503, retry_after=0)
+        await asyncio.sleep(0)
+        self.dispatched.append(name)
+        if task_details.get("fail"):
+            raise RuntimeError(f"{name} failed")
+        return {"status": "success"}
+
+
+def task(name, reads=None, writes=None, **options):
+    return {"operation": "B9", "name": name, "input_path": reads, "output_path": writes, **options}
+
+
+def run(tasks, max_rejections=2):
+    dispatcher = FakeDispatcher()
+    reports = asyncio.run(run_batch(dispatcher, tasks, max_parallel=2, max_rejections=max_rejections))
+    return reports, dispatcher
+
+
+def test_tasks_sharing_files_keep_their_order():
+    tasks = [
+        task("write a", "in.md", "a.md"),
+        task("read a", "a.md", "b.md"),
+        task("unrelated", "x.md", "y.md"),
+        task("overwrite a", "z.md", "a.md"),  # Must follow both the writer and the reader of a.md
+        task("read in", "in.md", "c.md"),  # Two readers of one file don't conflict
+    ]
+    assert plan(tasks) == [[], [0], [], [0, 1], []]
+
+
+def test_paths_are_compared_after_normalising():
+    tasks = [task("write", "in.md", "docs/./a.md"), task("read", "docs/sub/../a.md", "b.md")]
+    assert plan(tasks) == [[], [0]]
+
+
+def test_directory_readers_wait_for_writes_inside_them():
+    tasks = [
+        {"operation": "B3", "output_path": "logs/api.log", "parameters": {"api_url": "http://x"}},
+        {"operation": "B9", "input_path": "notes.md", "output_path": "docs/notes.md"},
+        {"operation": "A5", "parameters": {}},
+        {"operation": "A6", "parameters": {}},
+    ]
+    assert plan(tasks) == [[], [], [0], [1]]
+
+
+def test_dependents_of_a_failed_task_are_cancelled():
+    reports, dispatcher = run([
+        task("first", "in.md", "a.md", fail=True),
+        task("second", "a.md", "b.md"),
+        task("third", "b.md", "c.md"),
+        task("independent", "x.md", "y.md"),
+    ])
+    assert [report["status"] for report in reports] == ["failed", "cancelled", "cancelled", "success"]
+    assert reports[0]["error"] == "first failed"
+    assert reports[1]["error"] == "Dependencies failed: [0]"
+    assert reports[2]["error"] == "Dependencies failed: [1]"
+    assert sorted(dispatcher.dispatched) == ["first", "independent"]
+
+
+@pytest.mark.parametrize("rejections, status", [(2, "success"), (3, "failed")])
+def test_rejected_tasks_are_retried_up_to_max_rejections(rejections, status):
+    reports, dispatcher = run([task("busy", "in.md", "a.md", reject=rejections)], max_rejections=2)
+    assert reports[0]["status"] == status
+    assert dispatcher.attempts["busy"] == min(rejections, 2) + 1
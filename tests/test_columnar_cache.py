@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from tasks.business import b10_filter_csv
+from tasks.business.columnar_cache import ColumnarCache, iter_filtered_parquet
+from tasks.business.csv_filter import iter_filtered, parse_predicate, stream_json
+from tasks.paths import data_path
+
+ROWS = [
+    "name,flag,zip,n,score,note,maybe",
+    'alice,true,01234,3,1.5,"two\nlines",True',
+    "bob,false,00042,,2,plain,",
+    "carol,true,12345,7,inf,NA,False",
+    "dave,FALSE,99999,1,-0.5,x y,True",
+]
+WHERE = [
+    "flag==true", "flag==True", "flag!=False", "flag==1", "flag<1",
+    "zip==01234", "zip==1234", "zip>=12345", "zip==01234x",
+    "n==3", "n!=3", "n>=3", "n==3.0", "n==nan",
+    "score>1", "score==inf", "score==1.5",
+    "name==bob", "name>bob", "note!=plain", "note==NA", "note==5",
+    "maybe==True", "maybe!=True", "maybe==1",
+]
+
+
+@pytest.fixture
+def csv_path(tmp_path):
+    path = tmp_path / "people.csv"
+    path.write_text("\n".join(ROWS) + "\n")
+    return path
+
+
+@pytest.fixture
+def parquet_path(tmp_path, csv_path):
+    return ColumnarCache(tmp_path / "parquet", max_bytes=1 << 30).get(csv_path)
+
+
+def encode(frames):
+    return b"".join(stream_json(frames))
+
+
+@pytest.mark.parametrize("where", WHERE)
+def test_parquet_matches_csv(csv_path, parquet_path, where):
+    predicates = [parse_predicate(where)]
+    expected = encode(iter_filtered(csv_path, predicates))
+    assert encode(iter_filtered_parquet(parquet_path, predicates)) == expected
+
+
+def test_unfiltered_values_keep_csv_types(csv_path, parquet_path):
+    assert encode(iter_filtered_parquet(parquet_path, [])) == encode(iter_filtered(csv_path, []))
+
+
+def test_projection_limit_and_offset_match(csv_path, parquet_path):
+    options = {"columns": ["name", "zip"], "limit": 2, "offset": 1}
+    predicates = [parse_predicate("n>=1")]
+    assert (encode(iter_filtered_parquet(parquet_path, predicates, **options))
+            == encode(iter_filtered(csv_path, predicates, **options)))
+
+
+def test_query_errors_fall_back_to_csv_before_streaming(monkeypatch):
+    path = data_path("fallback.csv")
+    path.write_text("\n".join(ROWS) + "\n")
+
+    def broken(*args, **kwargs):
+        raise RuntimeError("corrupt sidecar")
+        yield
+
+    monkeypatch.setattr(b10_filter_csv, "iter_filtered_parquet", broken)
+
+    async def body():
+        response = await b10_filter_csv.filter_csv_response(
+            "fallback.csv", None, None, ["flag==True"], "name", None, 0, None, False, "json"
+        )
+        return b"".join([chunk async for chunk in response.body_iterator])
+
+    assert asyncio.run(body()) == b'[{"name":"alice"},{"name":"carol"}]'
@@ -0,0 +1,42 @@
+import pandas as pd
+import pytest
+
+from tasks.business.csv_filter import iter_filtered, parse_predicate
+
+
+@pytest.fixture
+def notes_csv(tmp_path):
+    path = tmp_path / "notes.csv"
+    rows = []
+    for n in range(25):
+        note = f"line one\nline two of {n}" if n % 3 == 0 else f"note {n}"
+        rows.append({"id": n, "kind": "odd" if n % 2 else "even", "note": note})
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return path
+
+
+def collect(path, **options):
+    frames = list(iter_filtered(path, [parse_predicate("kind==odd")], row_numbers=True, **options))
+    return pd.concat(frames) if frames else pd.DataFrame(columns=["_row", "id"])
+
+
+def test_quoted_multiline_fields_count_as_one_row(notes_csv):
+    result = collect(notes_csv, chunk_rows=4)
+    assert list(result["_row"]) == list(result["id"]) == list(range(1, 25, 2))
+
+
+@pytest.mark.parametrize("chunk_rows", [1, 4, 7, 100])
+def test_cursor_pages_cover_every_row_once(notes_csv, chunk_rows):
+    seen, cursor = [], None
+    while True:
+        page = collect(notes_csv, limit=3, after_row=cursor, chunk_rows=chunk_rows)
+        if page.empty:
+            break
+        seen.extend(page["id"])
+        cursor = int(page["_row"].iloc[-1])
+    assert seen == list(range(1, 25, 2))
+
+
+def test_resumed_rows_keep_their_fields(notes_csv):
+    page = collect(notes_csv, limit=1, after_row=2, chunk_rows=2)
+    assert page.iloc[0]["id"] == 3 and page.iloc[0]["note"] == "line one\nline two of 3"
@@ -0,0 +1,67 @@
+import os
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from config import settings
+from tasks.operations import date_counts
+from tasks.operations.date_counts import (
+    DATE_FORMATS, HistogramCache, parse_weekday, weekday_histogram
+)
+
+
+@pytest.fixture
+def dates_file(tmp_path):
+    path = tmp_path / "dates.txt"
+    days = [date(2020, 1, 1) + timedelta(days=7 * i + i % 5) for i in range(200)]
+    lines = [day.strftime(DATE_FORMATS[i % len(DATE_FORMATS)]) for i, day in enumerate(days)]
+    path.write_text("\n".join(lines + ["", "not a date", "  2021-03-04  "]) + "\n")
+    return path
+
+
+def reference(path):
+    counts = [0] * 7
+    for line in path.read_text().splitlines():
+        for fmt in DATE_FORMATS:
+            try:
+                counts[datetime.strptime(line.strip(), fmt).weekday()] += 1
+                break
+            except ValueError:
+                continue
+    return counts
+
+
+@pytest.mark.parametrize("chunk_rows", [7, 1_000_000])
+def test_histogram_matches_strptime(dates_file, chunk_rows):
+    assert weekday_histogram(dates_file, chunk_rows=chunk_rows).tolist() == reference(dates_file)
+
+
+def test_cache_follows_file_changes(dates_file, tmp_path):
+    cache = HistogramCache(db_path=tmp_path / "histograms.sqlite")
+    assert cache.get(dates_file).tolist() == reference(dates_file)
+
+    dates_file.write_text("2024-01-01\n2024-01-08\n")  # Two Mondays
+    os.utime(dates_file, ns=(1, 1))
+    assert cache.get(dates_file).tolist() == [2, 0, 0, 0, 0, 0, 0]
+    # Another process sharing the SQLite tier sees the same counts
+    shared = HistogramCache(db_path=tmp_path / "histograms.sqlite")
+    assert shared.get(dates_file).tolist() == [2, 0, 0, 0, 0, 0, 0]
+
+
+@pytest.mark.parametrize("weekday, index", [(2, 2), ("3", 3), ("Wednesdays", 2), ("sun", 6)])
+def test_parse_weekday(weekday, index):
+    assert parse_weekday(weekday) == index
+
+
+@pytest.mark.parametrize("weekday", [7, "-1", "someday"])
+def test_parse_weekday_rejects(weekday):
+    with pytest.raises(ValueError):
+        parse_weekday(weekday)
+
+
+def test_shared_cache_uses_the_cache_dir_at_first_use(tmp_path, monkeypatch):
+    monkeypatch.setattr(date_counts, "_histograms", None)
+    monkeypatch.setattr(settings, "data_dir", str(tmp_path))
+    cache = date_counts.get_histogram_cache()
+    assert cache.db_path == tmp_path / ".cache" / "weekday-histograms.sqlite"
+    assert date_counts.get_histogram_cache() is cache
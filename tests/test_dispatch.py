@@ -0,0 +1,126 @@
+import asyncio
+import os
+import sys
+import threading
+
+import pytest
+
+from tasks import dispatch
+from tasks.dispatch import TaskDispatcher
+from tasks.exceptions import TaskExecutionError, TaskRejectedError
+from tasks.paths import DATA_DIR
+
+
+def crash(task_details):
+    os._exit(1)
+
+
+def loaded_modules(names):
+    return [name for name in names if name in sys.modules]
+
+
+def make_dispatcher(max_pending=4, operation_limits=None, **options):
+    return TaskDispatcher(thread_workers=4, process_workers=1, max_pending=max_pending,
+                          operation_limits=operation_limits or {}, cpu_bound_operations={"A3"},
+                          retry_after=1, **options)
+
+
+@pytest.fixture
+def gate(monkeypatch):
+    """Handlers block until the gate is set, and fail for tasks marked fail"""
+    gate = threading.Event()
+
+    def handler(task_details):
+        gate.wait(5)
+        if task_details.get('fail'):
+            raise RuntimeError("handler failed")
+        return {"status": "success"}
+
+    monkeypatch.setattr(dispatch, "get_handler", lambda task_details: handler)
+    monkeypatch.setattr(dispatch, "checked_paths", lambda task_details: ([], []))
+    return gate
+
+
+def test_workers_preload_cpu_operations():
+    dispatcher = make_dispatcher(preload={"A3", "B5"})
+    try:
+        assert dispatcher.worker_preload == {"A3"}
+        dispatcher.start_workers()
+        future = dispatcher._process_pool().submit(
+            loaded_modules, ["tasks.operations.a3_weekdays", "tasks.business.b5_query"]
+        )
+        assert future.result(timeout=60) == ["tasks.operations.a3_weekdays"]
+    finally:
+        dispatcher.shutdown()
+
+
+def test_broken_pool_is_shut_down_and_replaced(monkeypatch):
+    monkeypatch.setattr(dispatch, "get_handler", lambda task_details: crash)
+    monkeypatch.setattr(dispatch, "checked_paths", lambda task_details: ([], []))
+    dispatcher = make_dispatcher()
+    try:
+        with pytest.raises(TaskExecutionError, match="crashed"):
+            asyncio.run(dispatcher.dispatch({"phase": "A", "operation": "A3"}))
+        assert dispatcher._processes is None
+    finally:
+        dispatcher.shutdown()
+
+
+def test_discarded_pool_is_shut_down():
+    dispatcher = make_dispatcher()
+    pool = dispatcher._process_pool()
+    dispatcher._discard_processes()
+    assert pool._shutdown_thread
+    assert dispatcher._processes is None
+
+
+def test_operation_over_its_limit_gets_429(gate):
+    dispatcher = make_dispatcher(operation_limits={"A5": 1})
+    dispatcher.retry_after = 9
+
+    async def scenario():
+        running = asyncio.create_task(dispatcher.dispatch({"operation": "A5"}))
+        await asyncio.sleep(0.05)
+        with pytest.raises(TaskRejectedError) as error:
+            await dispatcher.dispatch({"operation": "A5"})
+        assert (error.value.status_code, error.value.retry_after) == (429, 9)
+        other = asyncio.create_task(dispatcher.dispatch({"operation": "A6"}))  # Other operations still run
+        gate.set()
+        return await running, await other
+
+    try:
+        assert asyncio.run(scenario()) == ({"status": "success"}, {"status": "success"})
+        assert dispatcher.pending == 0 and dispatcher.running == {"A5": 0, "A6": 0}
+    finally:
+        dispatcher.shutdown()
+
+
+def test_full_queue_gets_503_and_failures_release_their_slots(gate):
+    dispatcher = make_dispatcher(max_pending=2)
+
+    async def scenario():
+        tasks = [asyncio.create_task(dispatcher.dispatch({"operation": "A5", "fail": True})),
+                 asyncio.create_task(dispatcher.dispatch({"operation": "A6"}))]
+        await asyncio.sleep(0.05)
+        assert dispatcher.pending == 2
+        with pytest.raises(TaskRejectedError) as error:
+            await dispatcher.dispatch({"operation": "A7"})
+        assert (error.value.status_code, error.value.retry_after) == (503, 1)
+        gate.set()
+        return await asyncio.gather(*tasks, return_exceptions=True)
+
+    try:
+        failed, succeeded = asyncio.run(scenario())
+        assert isinstance(failed, RuntimeError) and succeeded == {"status": "success"}
+        assert dispatcher.pending == 0 and dispatcher.running == {"A5": 0, "A6": 0}
+        # Both slots are free again
+        assert asyncio.run(dispatcher.dispatch({"operation": "A7"})) == {"status": "success"}
+    finally:
+        dispatcher.shutdown()
+
+
+def test_directory_inputs_are_checked_as_directories():
+    inputs, outputs = dispatch.checked_paths({"operation": "A5"})
+    assert inputs == [DATA_DIR / "logs"] and outputs == [DATA_DIR / "logs-recent.txt"]
+    inputs, _ = dispatch.checked_paths({"operation": "A6"})
+    assert inputs == [DATA_DIR / "docs"]
@@ -0,0 +1,93 @@
+import json
+import os
+import time
+
+import pytest
+
+from tasks.operations import docs_index
+from tasks.operations.docs_index import DocsIndexer
+
+
+@pytest.fixture
+def docs(tmp_path):
+    docs = tmp_path / "docs"
+    (docs / "guide" / "deep").mkdir(parents=True)
+    (docs / "README.md").write_text("intro\n# Welcome\n")
+    (docs / "guide" / "install.md").write_text("# Install\n## Details\n")
+    (docs / "guide" / "deep" / "notes.md").write_text("no heading here\n")
+    (docs / "guide" / "image.png").write_bytes(b"not markdown")
+    return docs
+
+
+@pytest.fixture
+def indexer(docs, tmp_path):
+    return DocsIndexer(docs, docs / "index.json", tmp_path / "cache" / "manifest.json", workers=2)
+
+
+@pytest.fixture
+def reads(monkeypatch):
+    reads = []
+    original = docs_index.read_title
+
+    def read_title(path):
+        reads.append(path.name)
+        return original(path)
+    monkeypatch.setattr(docs_index, "read_title", read_title)
+    return reads
+
+
+def rewrite(path, text):
+    path.write_text(text)
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))  # A distinct mtime
+
+
+def test_build_writes_index_and_manifest(indexer, docs):
+    assert indexer.build() == {"files": 3, "read": 3, "removed": 0}
+    assert json.loads((docs / "index.json").read_text()) == {
+        "README.md": "Welcome",
+        os.path.join("guide", "install.md"): "Install"
+    }
+    manifest = json.loads(indexer.manifest_path.read_text())
+    install = docs / "guide" / "install.md"
+    assert manifest[os.path.join("guide", "install.md")] == [
+        install.stat().st_mtime_ns, install.stat().st_size, "Install"
+    ]
+    assert manifest[os.path.join("guide", "deep", "notes.md")][2] is None
+
+
+def test_only_changed_files_are_read_again(indexer, docs, reads):
+    indexer.build()
+    reads.clear()
+    rewrite(docs / "guide" / "install.md", "# Installing\n")
+    assert indexer.build() == {"files": 3, "read": 1, "removed": 0}
+    assert reads == ["install.md"]
+    assert json.loads((docs / "index.json").read_text())[os.path.join("guide", "install.md")] == "Installing"
+
+
+def test_deleted_files_are_dropped(indexer, docs, reads):
+    indexer.build()
+    reads.clear()
+    (docs / "README.md").unlink()
+    assert indexer.build() == {"files": 2, "read": 0, "removed": 1}
+    assert reads == []
+    assert "README.md" not in json.loads((docs / "index.json").read_text())
+    assert "README.md" not in json.loads(indexer.manifest_path.read_text())
+
+
+def test_watch_rebuilds_until_stopped(indexer, docs):
+    indexer.build()
+    assert indexer.start_watch(0.02) is True
+    assert indexer.start_watch(0.02) is False  # Already watching
+    try:
+        rewrite(docs / "README.md", "# Changed\n")
+        deadline = time.monotonic() + 5
+        while json.loads((docs / "index.json").read_text())["README.md"] != "Changed":
+            assert time.monotonic() < deadline, "watcher never rebuilt the index"
+            time.sleep(0.02)
+    finally:
+        indexer.stop_watch()
+    indexer._watcher.join(5)
+    assert not indexer._watcher.is_alive()
+    assert indexer.start_watch(0.02) is True  # Can be restarted once stopped
+    indexer.stop_watch()
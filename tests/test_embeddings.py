@@ -0,0 +1,71 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from tasks.operations import embeddings
+from tasks.operations.embeddings import EmbeddingCache, EmbeddingEngine
+
+
+class FakeModel:
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **options):
+        self.encoded.append(list(texts))
+        return np.array([[len(text), 1.0] for text in texts])
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Distinct last_used times, so LRU order doesn't depend on the clock's resolution
+    ticks = itertools.count(1)
+    monkeypatch.setattr(embeddings.time, "time", lambda: float(next(ticks)))
+
+
+@pytest.fixture
+def engine(tmp_path, clock):
+    engine = EmbeddingEngine("fake-model", batch_size=8, cache=EmbeddingCache(tmp_path / "e.sqlite", 100))
+    engine._model = FakeModel()
+    return engine
+
+
+def test_repeated_content_is_encoded_once(engine):
+    first = engine.encode(["alpha", "beta", "alpha"])
+    assert engine._model.encoded == [["alpha", "beta"]]
+    assert first.shape == (3, 2) and first[0].tolist() == first[2].tolist() == [5.0, 1.0]
+
+    second = engine.encode(["beta", "gamma"])
+    assert engine._model.encoded[1] == ["gamma"]
+    assert second.tolist() == [[4.0, 1.0], [5.0, 1.0]]
+    assert engine.stats() == {"hits": 1, "misses": 3, "cached": 3}
+
+
+def test_cache_is_shared_across_engines(engine, tmp_path):
+    engine.encode(["alpha"])
+    other = EmbeddingEngine("fake-model", batch_size=8, cache=EmbeddingCache(tmp_path / "e.sqlite", 100))
+    other._model = FakeModel()
+    other.encode(["alpha"])
+    assert other._model.encoded == []
+    assert other.stats()["hits"] == 1
+
+
+def test_model_name_is_part_of_the_key(engine):
+    engine.encode(["alpha"])
+    engine.model_name = "other-model"
+    engine.encode(["alpha"])
+    assert engine._model.encoded == [["alpha"], ["alpha"]]
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path, clock):
+    cache = EmbeddingCache(tmp_path / "e.sqlite", max_entries=2)
+    cache.put_many([("a", np.ones(2)), ("b", np.ones(2))])
+    cache.get_many(["a"])  # b is now the least recently used
+    cache.put_many([("c", np.ones(2))])
+    assert len(cache) == 2
+    assert set(cache.get_many(["a", "b", "c"])) == {"a", "c"}
+
+
+def test_empty_input(engine):
+    assert engine.encode([]).shape == (0, 0)
+    assert engine.stats() == {"hits": 0, "misses": 0, "cached": 0}
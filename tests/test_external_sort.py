@@ -0,0 +1,83 @@
+import io
+import json
+
+import pytest
+
+from tasks.exceptions import TaskExecutionError
+from tasks.operations import a4_contacts, external_sort
+from tasks.operations.external_sort import _JsonStream, sort_json_records
+from tasks.paths import DATA_DIR
+
+
+class CountingReader(io.StringIO):
+    def __init__(self, text):
+        super().__init__(text)
+        self.chars_read = 0
+
+    def read(self, size=-1):
+        chunk = super().read(size)
+        self.chars_read += len(chunk)
+        return chunk
+
+
+@pytest.fixture
+def small_reads(monkeypatch):
+    monkeypatch.setattr(external_sort, "READ_SIZE", 16)
+    monkeypatch.setattr(external_sort, "IN_MEMORY_BYTES", 0)  # Always take the streaming path
+
+
+@pytest.mark.parametrize("wrapped", [False, True])
+def test_streamed_sort_matches_sorted(tmp_path, small_reads, wrapped):
+    records = [{"last": f"n{i * 7919 % 101:03d}", "first": f"f{i % 3}", "i": i} for i in range(101)]
+    input_path, output_path = tmp_path / "in.json", tmp_path / "out.json"
+    input_path.write_text(json.dumps({"contacts": records} if wrapped else records))
+
+    assert sort_json_records(input_path, output_path, ["last", "first"], run_size=10) == 101
+    result = json.loads(output_path.read_text())
+    expected = sorted(records, key=lambda r: (r["last"], r["first"]))
+    assert result == ({"contacts": expected} if wrapped else expected)
+
+
+def test_unterminated_value_stops_at_the_cap(small_reads):
+    reader = CountingReader('[{"a": 1}, {"a": "' + "x" * 100_000)
+    stream = _JsonStream(reader, max_value_chars=1000)
+    records = stream.iter_array()
+    assert next(records) == {"a": 1}
+    with pytest.raises(ValueError, match="at character 11 is malformed or longer than 1000"):
+        next(records)
+    assert reader.chars_read < 2000
+
+
+def test_invalid_json_reports_its_position(tmp_path, small_reads):
+    input_path = tmp_path / "in.json"
+    input_path.write_text('[{"a": 1}, {"a": tru}]')
+    with pytest.raises(ValueError, match="Invalid JSON at character 17"):
+        sort_json_records(input_path, tmp_path / "out.json", ["a"])
+
+
+
+@pytest.fixture
+def contacts(tmp_path):
+    """Input under the data dir, and task details reading it"""
+    (DATA_DIR / tmp_path.name).mkdir()
+    (DATA_DIR / tmp_path.name / "contacts.json").write_text('[{"email": "a"}, {"email": "b"}]')
+    return DATA_DIR / tmp_path.name, {
+        "input_path": f"{tmp_path.name}/contacts.json", "output_path": f"{tmp_path.name}/out.json"
+    }
+
+
+@pytest.mark.parametrize("parameters", [
+    {"keys": "email"}, {"keys": []}, {"keys": ["email", 3]}, {"reverse": "descending"},
+    {"compact": 1}, {"run_size": 0}, {"run_size": "100"}
+])
+def test_a4_rejects_invalid_parameters(contacts, parameters):
+    directory, details = contacts
+    with pytest.raises(TaskExecutionError):
+        a4_contacts.handle({**details, "parameters": parameters})
+    assert not (directory / "out.json").exists()
+
+
+def test_a4_accepts_quoted_flags(contacts):
+    directory, details = contacts
+    a4_contacts.handle({**details, "parameters": {"keys": ["email"], "reverse": "true", "compact": "True"}})
+    assert (directory / "out.json").read_text() == '[{"email":"b"},{"email":"a"}]'
@@ -0,0 +1,55 @@
+import pytest
+from fastapi import FastAPI, Request
+from fastapi.testclient import TestClient
+
+from utils import file_response as file_response_module
+from utils.file_response import _iter_file, file_response
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    path = tmp_path / "transcript.txt"
+    path.write_bytes(b"0123456789" * 10)
+    return path
+
+
+@pytest.fixture
+def client(transcript):
+    app = FastAPI()
+
+    @app.get("/read")
+    async def read(request: Request):
+        return file_response(request, transcript, max_size=1 << 20)
+
+    return TestClient(app)
+
+
+def test_full_range_and_conditional_requests(client):
+    response = client.get("/read")
+    assert response.status_code == 200
+    assert response.content == b"0123456789" * 10
+
+    partial = client.get("/read", headers={"Range": "bytes=5-14"})
+    assert partial.status_code == 206
+    assert partial.content == b"5678901234"
+    assert partial.headers["Content-Range"] == "bytes 5-14/100"
+
+    cached = client.get("/read", headers={"If-None-Match": response.headers["ETag"]})
+    assert cached.status_code == 304
+
+
+def test_shrinking_file_ends_the_body_early(transcript, monkeypatch):
+    monkeypatch.setattr(file_response_module, "CHUNK_SIZE", 16)
+    chunks = _iter_file(transcript, 0, 100)
+    assert next(chunks) == b"0123456789012345"
+
+    transcript.write_bytes(b"abcdefghijklmnopqrstuvwxyz")  # Truncated and rewritten
+    assert b"".join(chunks) == b"qrstuvwxyz"
+
+
+def test_growing_file_sends_only_the_stated_length(transcript, monkeypatch):
+    monkeypatch.setattr(file_response_module, "CHUNK_SIZE", 16)
+    chunks = _iter_file(transcript, 90, 10)
+    with open(transcript, "ab") as f:
+        f.write(b"appended")
+    assert b"".join(chunks) == b"0123456789"
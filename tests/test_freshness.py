@@ -0,0 +1,48 @@
+import os
+import sqlite3
+
+import pytest
+
+from tasks.freshness import RunLedger
+
+
+@pytest.fixture
+def ledger(tmp_path):
+    return RunLedger(tmp_path / "runs.sqlite")
+
+
+def age(path, seconds):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns - int(seconds * 1e9)))
+
+
+def test_force_does_not_change_the_details_hash(ledger, tmp_path):
+    output_path = tmp_path / "out.txt"
+    output_path.write_text("done")
+    details = {"operation": "A10", "parameters": {"query": "SELECT 1"}}
+    ledger.record({**details, "parameters": {"query": "SELECT 1", "force": True}}, [output_path], {"n": 1})
+    assert ledger.fresh_result(details, [], [output_path]) == {"n": 1}
+
+
+def test_commit_to_a_wal_database_makes_outputs_stale(ledger, tmp_path):
+    db_path = tmp_path / "source.db"
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    for path in (db_path, db_path.with_name("source.db-wal")):
+        age(path, 10)
+
+    output_path = tmp_path / "out.txt"
+    output_path.write_text("0")
+    details = {"operation": "A10", "input_path": str(db_path), "output_path": str(output_path)}
+    ledger.record(details, [output_path], {"rows": 0})
+    assert ledger.fresh_result(details, [db_path], [output_path]) == {"rows": 0}
+
+    db_mtime = db_path.stat().st_mtime_ns
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.commit()
+    assert db_path.stat().st_mtime_ns == db_mtime  # Only the -wal file changed
+    assert ledger.fresh_result(details, [db_path], [output_path]) is None
+    conn.close()
@@ -0,0 +1,118 @@
+import subprocess
+import threading
+from pathlib import Path
+
+import git
+import pytest
+
+from tasks.business import b4_git
+from tasks.business.git_workspace import GitWorkspaceManager
+from tasks.paths import DATA_DIR
+
+IDENTITY = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+
+
+def run_git(cwd, *args):
+    subprocess.run(["git", *IDENTITY, *args], cwd=cwd, check=True, capture_output=True)
+
+
+def push_file(checkout, name, content):
+    (checkout / name).write_text(content)
+    run_git(checkout, "add", name)
+    run_git(checkout, "commit", "-m", f"Add {name}")
+    run_git(checkout, "push", "origin", "HEAD")
+
+
+@pytest.fixture
+def remote(tmp_path):
+    bare = tmp_path / "remote.git"
+    run_git(tmp_path, "init", "--bare", str(bare))
+    checkout = tmp_path / "upstream"
+    run_git(tmp_path, "clone", str(bare), str(checkout))
+    push_file(checkout, "README.md", "seed")
+    return bare.as_uri(), checkout
+
+
+@pytest.fixture
+def manager(tmp_path, monkeypatch):
+    manager = GitWorkspaceManager(DATA_DIR / tmp_path.name / "git", depth=1, blob_filter=None,
+                                  fetch_interval=0)
+    monkeypatch.setattr(b4_git, "get_git_workspaces", lambda: manager)
+    return manager
+
+
+def commit_task(url, files, message="Update files"):
+    return b4_git.handle({"operation": "B4", "parameters": {
+        "repo_url": url, "commit_message": message,
+        "files": [{"path": path, "content": content} for path, content in files]
+    }})
+
+
+def test_first_use_clones(remote, manager):
+    url, _ = remote
+    with manager.workspace(url) as repo:
+        tree = Path(repo.working_tree_dir)
+        assert tree.parent == manager.root
+        assert (tree / "README.md").read_text() == "seed"
+        assert manager.refresh_error(url) is None
+
+
+def test_existing_clone_is_fetched_not_cloned_again(remote, manager, monkeypatch):
+    url, upstream = remote
+    with manager.workspace(url) as repo:
+        (Path(repo.working_tree_dir) / "untracked.txt").write_text("kept")
+    push_file(upstream, "new.md", "from upstream")
+
+    monkeypatch.setattr(manager, "_clone", lambda *args: pytest.fail("cloned again"))
+    with manager.workspace(url) as repo:
+        tree = Path(repo.working_tree_dir)
+        assert (tree / "new.md").read_text() == "from upstream"
+        assert (tree / "untracked.txt").read_text() == "kept"
+
+
+def test_files_are_committed_together(remote, manager):
+    url, _ = remote
+    response = commit_task(url, [("docs/a.md", "A"), ("b.txt", "B")])
+    assert response["result"]["files"] == 2
+
+    repo = git.Repo(response["result"]["repo_path"])
+    head = repo.head.commit
+    assert head.hexsha == response["result"]["commit"]
+    assert sorted(head.stats.files) == ["b.txt", "docs/a.md"]
+    assert len(head.parents) == 1 and head.parents[0].message.strip() == "Add README.md"
+
+    again = commit_task(url, [("docs/a.md", "A"), ("b.txt", "B")])
+    assert again["result"]["commit"] is None
+    assert again["message"] == "No changes to commit"
+
+
+def test_concurrent_calls_make_distinct_commits(remote, manager):
+    url, _ = remote
+    results = []
+
+    def worker(i):
+        results.append(commit_task(url, [(f"file-{i}.txt", str(i))], f"Commit {i}"))
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    commits = {result["result"]["commit"] for result in results}
+    assert len(commits) == 4 and None not in commits
+    repo = git.Repo(results[0]["result"]["repo_path"])
+    history = [commit.hexsha for commit in repo.iter_commits()]
+    assert commits <= set(history) and len(history) == 5
+
+
+def test_diverged_clone_reports_the_refresh_error(remote, manager, caplog):
+    url, upstream = remote
+    commit_task(url, [("local.txt", "local only")])
+    push_file(upstream, "remote.md", "diverges")
+
+    with caplog.at_level("WARNING"):
+        response = commit_task(url, [("second.txt", "still committed")])
+    assert response["result"]["commit"] is not None
+    assert "fast-forward" in response["result"]["refresh_error"]
+    assert "Could not fast-forward" in caplog.text
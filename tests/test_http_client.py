@@ -0,0 +1,104 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.http_client import HttpClient, ResponseTooLarge, UnexpectedResponse
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # Keep-alive, so connection reuse is visible
+
+    def do_GET(self):
+        server = self.server
+        server.requests.append((self.path, self.client_address))
+        if self.path == "/not-modified":
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = server.bodies[self.path]
+        etag = f'"{len(body)}-{hash(body)}"'
+        if self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.requests = []
+    server.bodies = {"/data": b"first version", "/big": b"x" * 2048}
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def client(tmp_path):
+    return HttpClient(tmp_path / "http.sqlite", pool_hosts=2, per_host=2, timeout=5,
+                      max_bytes=1024, chunk_size=256)
+
+
+def url(server, path):
+    return f"http://127.0.0.1:{server.server_address[1]}{path}"
+
+
+def test_unchanged_resource_is_revalidated(server, client, tmp_path):
+    output_path = tmp_path / "data.txt"
+    first = client.download(url(server, "/data"), output_path)
+    assert first == {"status_code": 200, "bytes": 13, "not_modified": False}
+    mtime = output_path.stat().st_mtime_ns
+
+    second = client.download(url(server, "/data"), output_path)
+    assert second == {"status_code": 304, "bytes": 0, "not_modified": True}
+    assert output_path.stat().st_mtime_ns == mtime
+    assert client.stats() == {"hits": 1, "misses": 1}
+
+
+def test_changed_resource_is_downloaded_again(server, client, tmp_path):
+    output_path = tmp_path / "data.txt"
+    client.download(url(server, "/data"), output_path)
+    server.bodies["/data"] = b"second version, longer"
+    assert client.download(url(server, "/data"), output_path)["not_modified"] is False
+    assert output_path.read_bytes() == b"second version, longer"
+
+
+def test_edited_output_is_downloaded_again(server, client, tmp_path):
+    output_path = tmp_path / "data.txt"
+    client.download(url(server, "/data"), output_path)
+    output_path.write_text("edited locally")
+    assert client.download(url(server, "/data"), output_path)["status_code"] == 200
+    assert output_path.read_bytes() == b"first version"
+
+
+def test_response_over_the_size_cap_is_rejected(server, client, tmp_path):
+    output_path = tmp_path / "big.txt"
+    with pytest.raises(ResponseTooLarge):
+        client.download(url(server, "/big"), output_path)
+    assert not output_path.exists()
+
+
+def test_unrequested_not_modified_keeps_the_output(server, client, tmp_path):
+    output_path = tmp_path / "data.txt"
+    output_path.write_text("existing")
+    with pytest.raises(UnexpectedResponse):
+        client.download(url(server, "/not-modified"), output_path)
+    assert output_path.read_text() == "existing"
+
+
+def test_connections_are_reused(server, client, tmp_path):
+    for i in range(3):
+        client.download(url(server, "/data"), tmp_path / f"data-{i}.txt")
+    assert len({address for _, address in server.requests}) == 1
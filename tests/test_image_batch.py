@@ -0,0 +1,51 @@
+import pytest
+from PIL import Image
+
+from tasks.business.b7_images import image_jobs
+from tasks.business.image_batch import ImageBatchProcessor
+from tasks.paths import DATA_DIR
+
+
+@pytest.fixture
+def images(tmp_path):
+    root = DATA_DIR / tmp_path.name
+    for folder, color in (("a", "red"), ("b", "blue")):
+        (root / folder).mkdir(parents=True)
+        Image.new("RGB", (64, 48), color).save(root / folder / "photo.jpg")
+    return root
+
+
+@pytest.fixture
+def processor():
+    processor = ImageBatchProcessor(workers=1)
+    yield processor
+    processor.shutdown()
+
+
+def test_same_names_in_different_folders_keep_their_paths(images):
+    jobs = image_jobs({"input_path": f"{images.name}/*/photo.jpg", "output_path": f"{images.name}/out"})
+    assert [target.relative_to(images / "out").as_posix() for _, target in jobs] == [
+        "a/photo.jpg", "b/photo.jpg"
+    ]
+    assert (images / "out" / "a").is_dir()
+
+
+def test_duplicate_outputs_are_rejected(images):
+    same = f"{images.name}/a/photo.jpg"
+    with pytest.raises(ValueError, match="same output"):
+        image_jobs({"parameters": {"inputs": [same, same]}, "output_path": f"{images.name}/out"})
+
+
+def test_changed_parameters_reprocess_fresh_outputs(images, processor):
+    jobs = [(images / "a" / "photo.jpg", images / "small.jpg")]
+
+    def skipped(**options):
+        return processor.run(jobs, **options)[0]["skipped"]
+
+    assert not skipped(resize=(32, 24), quality=80)
+    assert skipped(resize=(32, 24), quality=80)
+    assert not skipped(resize=(32, 24), quality=60)
+    assert not skipped(resize=(16, 12), quality=60)
+    assert Image.open(images / "small.jpg").size == (16, 12)
+    assert skipped(resize=(16, 12), quality=60)
+    assert not skipped(resize=(16, 12), quality=60, force=True)
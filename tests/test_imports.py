@@ -0,0 +1,19 @@
+import subprocess
+import sys
+
+from conftest import SRC_DIR
+
+# Loaded on first use by the operations that need them, never by importing main
+HEAVY_MODULES = [
+    "numpy", "pandas", "duckdb", "PIL", "git", "openai", "httpx", "markdown", "requests",
+    "sentence_transformers", "torch", "whisper", "sklearn"
+]
+
+
+def test_importing_main_skips_heavy_modules():
+    result = subprocess.run(
+        [sys.executable, "-c", "import sys, main; print('\\n'.join(sys.modules))"],
+        cwd=SRC_DIR, capture_output=True, text=True, check=True
+    )
+    loaded = {name.split(".")[0] for name in result.stdout.splitlines()}
+    assert [name for name in HEAVY_MODULES if name in loaded] == []
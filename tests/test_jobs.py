@@ -0,0 +1,108 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+import main
+from tasks.jobs import HOSTNAME, JobQueue
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return tmp_path / "jobs.sqlite"
+
+
+def make_queue(db_path):
+    return JobQueue(db_path, max_depth=100, retry_after=1)
+
+
+def set_owner(queue, job_id, owner):
+    queue._conn.execute("UPDATE jobs SET owner = ? WHERE id = ?", (owner, job_id))
+    queue._conn.commit()
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+def test_each_job_is_claimed_once_across_queues(db_path):
+    queues = [make_queue(db_path) for _ in range(4)]
+    for n in range(20):
+        queues[0].enqueue({"operation": "A3", "n": n})
+
+    claimed = []
+    def worker(queue):
+        while (job := queue._claim()) is not None:
+            claimed.append(job[0])
+
+    threads = [threading.Thread(target=worker, args=(queue,)) for queue in queues]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+    assert len(claimed) == 20 == len(set(claimed))
+
+
+def test_claim_records_the_owner(db_path):
+    queue = make_queue(db_path)
+    job_id, _ = queue.enqueue({"operation": "A3"})
+    queue._claim()
+    owner = queue._conn.execute("SELECT owner FROM jobs WHERE id = ?", (job_id,)).fetchone()[0]
+    assert owner == queue.owner
+
+
+def test_startup_recovers_only_jobs_of_dead_owners(db_path):
+    queue = make_queue(db_path)
+    live, _ = queue.enqueue({"operation": "A3", "n": 1})
+    dead, _ = queue.enqueue({"operation": "A3", "n": 2})
+    remote, _ = queue.enqueue({"operation": "A3", "n": 3})
+    interrupted, _ = queue.enqueue({"operation": "B4", "n": 4})
+    for _ in range(4):
+        queue._claim()
+    set_owner(queue, live, f"{HOSTNAME}:{os.getppid()}")
+    set_owner(queue, dead, f"{HOSTNAME}:{dead_pid()}")
+    set_owner(queue, remote, "some-other-host:1")
+    set_owner(queue, interrupted, f"{HOSTNAME}:{dead_pid()}")
+
+    restarted = make_queue(db_path)
+    assert restarted.get(live)["status"] == "running"
+    assert restarted.get(dead)["status"] == "queued"
+    assert restarted.get(remote)["status"] == "running"
+    assert restarted.get(interrupted)["status"] == "failed"
+    assert "not retried" in restarted.get(interrupted)["error"]
+
+
+
+@pytest.fixture
+def client(db_path, monkeypatch):
+    queue = JobQueue(db_path, max_depth=2, retry_after=3)
+    monkeypatch.setattr(main, "get_job_queue", lambda: queue)
+
+    async def parse_task(task, use_cache=True):
+        return {"operation": "A3", "input_path": f"{task}.txt"}
+    monkeypatch.setattr(main, "parse_task", parse_task)
+    return TestClient(main.app)
+
+
+def submit(client, task):
+    return client.post("/run", params={"task": task, "async": "true"})
+
+
+def test_identical_queued_job_is_deduplicated(client):
+    first = submit(client, "dates")
+    second = submit(client, "dates")
+    assert first.status_code == second.status_code == 202
+    assert first.json()["result"] == {"job_id": first.json()["result"]["job_id"], "deduplicated": False}
+    assert second.json()["result"] == {"job_id": first.json()["result"]["job_id"], "deduplicated": True}
+
+
+def test_full_queue_gets_503(client):
+    submit(client, "one")
+    submit(client, "two")
+    response = submit(client, "three")
+    assert response.status_code == 503
+    assert response.headers["Retry-After"] == "3"
+    assert submit(client, "one").json()["result"]["deduplicated"] is True  # Duplicates still resolve
@@ -0,0 +1,112 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from llm.gateway import LLMGateway
+
+
+class FakeOpenAI(ThreadingHTTPServer):
+    """Chat completions endpoint replying with queued status codes, then 200"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), CompletionHandler)
+        self.failures = []
+        self.delay = 0.0
+        self.requests = 0
+        self.lock = threading.Lock()
+
+
+class CompletionHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_POST(self):
+        body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        with self.server.lock:
+            self.server.requests += 1
+            status = self.server.failures.pop(0) if self.server.failures else 200
+        time.sleep(self.server.delay)
+
+        if status == 200:
+            payload = {
+                "id": "chatcmpl-test", "object": "chat.completion", "created": 0, "model": body["model"],
+                "choices": [{"index": 0, "finish_reason": "stop",
+                             "message": {"role": "assistant", "content": body["messages"][-1]["content"]}}],
+                "usage": {"prompt_tokens": 3, "completion_tokens": 2, "total_tokens": 5}
+            }
+        else:
+            payload = {"error": {"message": f"status {status}", "type": "test"}}
+        data = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+@pytest.fixture
+def server():
+    server = FakeOpenAI()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def gateway(server):
+    return LLMGateway("test-key", base_url=f"http://127.0.0.1:{server.server_port}/v1",
+                      timeout=5, max_retries=2, retry_backoff=0.01)
+
+
+def ask(gateway, text):
+    return gateway.complete([{"role": "user", "content": text}], model="test-model")
+
+
+def test_identical_concurrent_prompts_share_one_request(server, gateway):
+    server.delay = 0.3
+
+    async def main():
+        return await asyncio.gather(*(ask(gateway, "same") for _ in range(5)), ask(gateway, "other"))
+
+    assert asyncio.run(main()) == ["same"] * 5 + ["other"]
+    assert server.requests == 2
+
+
+def test_finished_prompts_are_not_coalesced(server, gateway):
+    asyncio.run(ask(gateway, "again"))
+    asyncio.run(ask(gateway, "again"))
+    assert server.requests == 2
+
+
+def test_rate_limits_and_server_errors_are_retried(server, gateway):
+    server.failures = [429, 500]
+    assert asyncio.run(ask(gateway, "hello")) == "hello"
+    assert server.requests == 3
+
+
+def test_retries_give_up_after_max_retries(server, gateway):
+    server.failures = [503] * 10
+    with pytest.raises(Exception, match="503"):
+        asyncio.run(ask(gateway, "hello"))
+    assert server.requests == 3
+
+
+def test_client_errors_are_not_retried(server, gateway):
+    server.failures = [400]
+    with pytest.raises(Exception, match="400"):
+        asyncio.run(ask(gateway, "hello"))
+    assert server.requests == 1
+
+
+def test_blocking_callers_use_the_same_gateway(server, gateway):
+    assert gateway.complete_blocking([{"role": "user", "content": "sync"}], model="test-model") == "sync"
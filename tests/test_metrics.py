@@ -0,0 +1,105 @@
+import asyncio
+
+from tasks import dispatch
+from tasks.dispatch import TaskDispatcher
+from tasks.operations import a3_weekdays
+from tasks.paths import DATA_DIR
+from utils.metrics import MODEL_LOAD_SECONDS, REGISTRY, Counter, Histogram, MetricsRegistry, measured_call
+
+_worker_cache = {"hits": 0, "misses": 0}
+
+
+def use_worker_cache(task_details):
+    """Runs in a dispatcher worker process"""
+    REGISTRY.register_cache("test-worker", lambda: dict(_worker_cache))
+    _worker_cache["hits"] += 2
+    _worker_cache["misses"] += 1
+    MODEL_LOAD_SECONDS.observe(0.2, "test-worker-model")
+    return {"status": "success"}
+
+
+def test_handler_outputs_count_as_write_time(tmp_path):
+    (DATA_DIR / f"{tmp_path.name}-dates.txt").write_text("2024-01-03\n2024-01-10\n2024-01-11\n")
+    details = {
+        "input_path": f"{tmp_path.name}-dates.txt",
+        "output_path": f"{tmp_path.name}-count.txt",
+        "parameters": {"weekday": "wednesday"}
+    }
+
+    result, seconds, write_seconds, metrics = measured_call(a3_weekdays.handle, details)
+    assert result["status"] == "success"
+    assert 0 < write_seconds <= seconds
+    assert metrics is None
+    assert (DATA_DIR / f"{tmp_path.name}-count.txt").read_text() == "2"
+
+
+def test_render_exposition_format():
+    registry = MetricsRegistry()
+    counter = registry.register(Counter("requests_total", "Requests by path", ("path",)))
+    histogram = registry.register(Histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1.0)))
+    counter.inc('a "quoted"\\path\n')
+    counter.inc("/b", amount=2)
+    histogram.observe(0.05, "A1")
+    histogram.observe(0.5, "A1")
+    histogram.observe(5, "A1")
+    registry.register_cache("parse", lambda: {"hits": 3, "misses": 1})
+
+    lines = registry.render().splitlines()
+    assert lines[:4] == [
+        "# HELP dataworks_cache_hits_total Cache hits by cache",
+        "# TYPE dataworks_cache_hits_total counter",
+        'dataworks_cache_hits_total{cache="parse"} 3',
+        "# HELP dataworks_cache_misses_total Cache misses by cache",
+    ]
+    assert lines[6:] == [
+        "# HELP requests_total Requests by path",
+        "# TYPE requests_total counter",
+        'requests_total{path="/b"} 2',
+        'requests_total{path="a \\"quoted\\"\\\\path\\n"} 1',
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{op="A1",le="0.1"} 1',
+        'latency_seconds_bucket{op="A1",le="1"} 2',
+        'latency_seconds_bucket{op="A1",le="+Inf"} 3',
+        'latency_seconds_sum{op="A1"} 5.55',
+        'latency_seconds_count{op="A1"} 3',
+    ]
+
+
+def test_drained_counts_merge_into_another_registry():
+    worker, parent = MetricsRegistry(), MetricsRegistry()
+    for registry in (worker, parent):
+        registry.register(Counter("loads_total", "Loads"))
+        registry.register(Histogram("load_seconds", "Load time", buckets=(1.0,)))
+    stats = {"hits": 4, "misses": 1}
+    worker.register_cache("embedding", lambda: dict(stats))
+    worker._metrics["loads_total"].inc()
+    worker._metrics["load_seconds"].observe(0.5)
+
+    parent.merge(worker.drain())
+    stats["hits"] += 1
+    parent.merge(worker.drain())  # Only what changed since the last drain
+    assert worker.drain() == {"metrics": {}, "caches": {}}
+
+    text = parent.render()
+    assert 'dataworks_cache_hits_total{cache="embedding"} 5' in text
+    assert 'dataworks_cache_misses_total{cache="embedding"} 1' in text
+    assert "loads_total 1" in text
+    assert 'load_seconds_bucket{le="1"} 1' in text and "load_seconds_sum 0.5" in text
+
+
+def test_worker_process_metrics_reach_the_parent(monkeypatch):
+    monkeypatch.setattr(dispatch, "get_handler", lambda task_details: use_worker_cache)
+    monkeypatch.setattr(dispatch, "checked_paths", lambda task_details: ([], []))
+    dispatcher = TaskDispatcher(thread_workers=1, process_workers=1, max_pending=4, operation_limits={},
+                                cpu_bound_operations={"A3"}, retry_after=1)
+    try:
+        for _ in range(2):
+            assert asyncio.run(dispatcher.dispatch({"operation": "A3"})) == {"status": "success"}
+    finally:
+        dispatcher.shutdown()
+
+    text = REGISTRY.render()
+    assert 'dataworks_cache_hits_total{cache="test-worker"} 4' in text
+    assert 'dataworks_cache_misses_total{cache="test-worker"} 2' in text
+    assert 'dataworks_model_load_seconds_count{model="test-worker-model"} 2' in text
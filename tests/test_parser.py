@@ -0,0 +1,129 @@
+import asyncio
+import json
+
+import pytest
+
+from llm import parser
+from llm.rules import parse_canonical_task
+
+
+class FakeCache:
+    def __init__(self):
+        self.entries = {}
+
+    def get(self, task):
+        return self.entries.get(task)
+
+    def put(self, task, result):
+        self.entries[task] = result
+
+
+class FakeGateway:
+    def __init__(self, content):
+        self.content = content
+
+    async def complete(self, messages, **options):
+        return self.content
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = FakeCache()
+    monkeypatch.setattr(parser, "get_parse_cache", lambda: cache)
+    return cache
+
+
+def parse_with_llm(monkeypatch, reply, task="do something unusual"):
+    monkeypatch.setattr(parser, "get_llm_gateway", lambda: FakeGateway(json.dumps(reply)))
+    return asyncio.run(parser.parse_task(task))
+
+
+def test_b10_filter_is_parsed_without_the_llm():
+    details = parse_canonical_task('Filter /data/sales.csv where region = "North East"')
+    assert details["operation"] == "B10"
+    assert details["input_path"] == "sales.csv"
+    assert details["parameters"] == {"column": "region", "value": "North East"}
+
+
+def test_valid_llm_parse_is_cached(monkeypatch, cache):
+    reply = {"operation": "A7", "input_path": "email.txt", "output_path": "email-sender.txt", "parameters": {}}
+    assert parse_with_llm(monkeypatch, reply)["phase"] == "A"
+    assert "do something unusual" in cache.entries
+
+
+@pytest.mark.parametrize("reply", [
+    {"operation": "Z9", "input_path": None, "output_path": None, "parameters": {}},
+    {"operation": "A7", "input_path": ["email.txt"], "output_path": None, "parameters": {}},
+    {"operation": "B5", "phase": "A", "parameters": {}},
+])
+def test_invalid_llm_parse_is_not_cached(monkeypatch, cache, reply):
+    parse_with_llm(monkeypatch, reply)
+    assert cache.entries == {}
+
+
+def test_a4_rule_keeps_the_sort_keys():
+    details = parse_canonical_task(
+        "Sort the array of contacts in /data/contacts.json by first_name, then last_name, "
+        "and write the result to /data/contacts-sorted.json"
+    )
+    assert details["operation"] == "A4"
+    assert details["input_path"] == "contacts.json"
+    assert details["output_path"] == "contacts-sorted.json"
+    assert details["parameters"] == {"keys": ["first_name", "last_name"]}
+
+
+def test_b8_rule_matches_the_plain_phrasing():
+    details = parse_canonical_task("Transcribe /data/audio.mp3 and write the transcript to /data/audio.txt")
+    assert (details["operation"], details["input_path"], details["output_path"]) == ("B8", "audio.mp3", "audio.txt")
+    assert details["parameters"] == {}
+
+
+@pytest.mark.parametrize("task", [
+    "Sort the array of contacts in /data/contacts.json by email in descending order, "
+    "and write the result to /data/contacts-sorted.json",
+    "Sort the contacts in /data/contacts.json by last_name and save them to /data/out.json as compact JSON",
+    "Transcribe /data/audio.mp3 with the small model and write the transcript to /data/audio.txt",
+    "Transcribe /data/audio.mp3 into /data/audio.txt, translating it to English",
+])
+def test_qualified_phrasings_are_left_to_the_llm(task):
+    assert parse_canonical_task(task) is None
+
+
+class ScriptedGateway:
+    """Replies to the batched prompt with batch_reply and to single prompts by task"""
+
+    def __init__(self, batch_reply):
+        self.batch_reply = batch_reply
+        self.calls = []
+
+    async def complete(self, messages, **options):
+        task = messages[1]["content"]
+        self.calls.append(task)
+        if messages[0]["content"] == parser.BATCH_SYSTEM_PROMPT:
+            return self.batch_reply
+        return json.dumps({"operation": "B6", "output_path": f"{task}.html", "parameters": {}})
+
+
+def parse_batch(monkeypatch, batch_reply, tasks):
+    gateway = ScriptedGateway(batch_reply)
+    monkeypatch.setattr(parser, "get_llm_gateway", lambda: gateway)
+    return asyncio.run(parser.parse_tasks(tasks, use_cache=False)), gateway.calls
+
+
+def test_batch_sends_misses_in_one_call(monkeypatch):
+    reply = json.dumps({"tasks": [{"operation": "B6", "parameters": {}}, {"operation": "B3", "parameters": {}}]})
+    canonical = 'Filter /data/sales.csv where region = "North"'
+    parsed, calls = parse_batch(monkeypatch, reply, ["scrape x", canonical, "fetch y"])
+    assert [task["operation"] for task in parsed] == ["B6", "B10", "B3"]
+    assert calls == ["1. scrape x\n2. fetch y"]
+
+
+@pytest.mark.parametrize("reply", [
+    json.dumps({"tasks": [{"operation": "B6"}]}),  # One result for two tasks
+    json.dumps({"tasks": "B6, B6"}),
+    "not json",
+])
+def test_failed_batch_parse_falls_back_to_one_call_per_task(monkeypatch, reply):
+    parsed, calls = parse_batch(monkeypatch, reply, ["scrape x", "scrape y"])
+    assert [task["output_path"] for task in parsed] == ["scrape x.html", "scrape y.html"]
+    assert calls[0] == "1. scrape x\n2. scrape y" and sorted(calls[1:]) == ["scrape x", "scrape y"]
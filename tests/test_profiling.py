@@ -0,0 +1,77 @@
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from pydantic import ValidationError
+
+import main
+from config import ProfileSettings, settings
+from utils.profiling import ProfileStore
+
+
+class FakeDispatcher:
+    def __init__(self, error=None, writes_profile=True):
+        self.error = error
+        self.writes_profile = writes_profile
+
+    async def dispatch(self, task_details, profile=None):
+        if profile is not None and self.writes_profile:
+            profile[1].write_text("main (a.py:1) 3\n")
+        if self.error is not None:
+            raise self.error
+        return {"status": "success"}
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = ProfileStore(tmp_path, sample_every=0, default_mode="sampling", interval=0.01, max_profiles=10)
+    monkeypatch.setattr(main, "get_profile_store", lambda: store)
+    monkeypatch.setattr(settings, "debug", True)
+
+    async def parse_task(task, use_cache=True):
+        return {"operation": "A3"}
+    monkeypatch.setattr(main, "parse_task", parse_task)
+    return store
+
+
+def run(dispatcher, monkeypatch):
+    monkeypatch.setattr(main, "get_dispatcher", lambda: dispatcher)
+    return TestClient(main.app).post("/run", params={"task": "count"}, headers={"X-Profile": "sampling"})
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValidationError):
+        ProfileSettings(mode="perf")
+
+
+def test_successful_run_is_profiled(store, monkeypatch):
+    response = run(FakeDispatcher(), monkeypatch)
+    assert response.status_code == 200
+    profile_id = response.headers["X-Profile-Id"]
+    metadata = json.loads((store.directory / f"{profile_id}.json").read_text())
+    assert metadata["status"] == "success"
+
+    profile = TestClient(main.app).get(f"/profiles/{profile_id}", params={"format": "collapsed"})
+    assert profile.text == "main (a.py:1) 3\n"
+
+
+def test_failed_run_keeps_its_profile(store, monkeypatch):
+    response = run(FakeDispatcher(error=RuntimeError("boom")), monkeypatch)
+    assert response.status_code == 500
+    profile_id = response.headers["X-Profile-Id"]
+    metadata = json.loads((store.directory / f"{profile_id}.json").read_text())
+    assert metadata["status"] == "error"
+    assert metadata["error"] == "boom"
+
+
+def test_run_without_a_profile_records_nothing(store, monkeypatch):
+    response = run(FakeDispatcher(writes_profile=False), monkeypatch)
+    assert response.status_code == 200
+    assert "X-Profile-Id" not in response.headers
+    assert list(store.directory.iterdir()) == []
+
+
+def test_profiles_are_only_served_in_debug_mode(store, monkeypatch):
+    profile_id = run(FakeDispatcher(), monkeypatch).headers["X-Profile-Id"]
+    monkeypatch.setattr(settings, "debug", False)
+    assert TestClient(main.app).get(f"/profiles/{profile_id}").status_code == 404
@@ -0,0 +1,125 @@
+import csv
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+
+import duckdb
+import pytest
+
+from conftest import SRC_DIR
+from tasks.business import query_engine
+from tasks.business.query_engine import QueryEngine
+
+
+def make_engine(timeout=5.0, batch_rows=2):
+    return QueryEngine(pool_size=2, max_rows=1000, timeout=timeout, batch_rows=batch_rows)
+
+
+def write_duckdb(path, value):
+    tmp_path = path.with_name(f"{path.name}.{value}.tmp")
+    with duckdb.connect(str(tmp_path)) as conn:
+        conn.execute("CREATE TABLE t AS SELECT range AS n, ? AS v FROM range(10)", [value])
+    os.replace(tmp_path, path)
+    # Give each version a distinct mtime even on coarse clocks
+    os.utime(path, ns=(time.time_ns(), time.time_ns() + value * 1_000_000_000))
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    path = tmp_path / "numbers.db"
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE t (n INTEGER)")
+        conn.executemany("INSERT INTO t VALUES (?)", [(n,) for n in range(6)])
+    return path
+
+
+def test_replaced_duckdb_file_keeps_open_cursors_working(tmp_path):
+    path = tmp_path / "sales.duckdb"
+    write_duckdb(path, 1)
+    engine = make_engine()
+
+    with engine.cursor(path) as old:
+        old.execute("SELECT n, v FROM t ORDER BY n")
+        assert old.fetchmany(3) == [(0, 1), (1, 1), (2, 1)]
+        (first,) = engine._duckdb.values()
+
+        write_duckdb(path, 2)
+        assert engine.scalar(path, "SELECT max(v) FROM t") == 2
+        # The first instance is retired but stays open until its cursor is done
+        assert first.retired and first.users == 1
+        assert old.fetchmany(100)[-1] == (9, 1)
+
+    assert first.users == 0
+    with pytest.raises(duckdb.ConnectionException):
+        first.conn.execute("SELECT 1")
+    assert engine.scalar(path, "SELECT count(*) FROM t") == 10
+
+
+def test_concurrent_queries_across_file_versions(tmp_path):
+    path = tmp_path / "sales.duckdb"
+    write_duckdb(path, 1)
+    engine = make_engine()
+    errors = []
+
+    def query():
+        try:
+            for _ in range(20):
+                assert engine.scalar(path, "SELECT count(*) FROM t") == 10
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=query) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for version in range(2, 6):
+        write_duckdb(path, version)
+    for thread in threads:
+        thread.join()
+    assert errors == []
+
+
+def test_slow_csv_writes_do_not_count_against_the_timeout(sqlite_db, tmp_path, monkeypatch):
+    writer = csv.writer
+
+    class SlowWriter:
+        def __init__(self, f):
+            self._writer = writer(f)
+
+        def writerow(self, row):
+            self._writer.writerow(row)
+
+        def writerows(self, rows):
+            time.sleep(0.1)
+            self._writer.writerows(rows)
+
+    monkeypatch.setattr(query_engine.csv, "writer", SlowWriter)
+    output_path = tmp_path / "out.csv"
+    rows = make_engine(timeout=0.15).export_csv(sqlite_db, "SELECT n FROM t", output_path)
+    assert rows == 6
+    assert output_path.read_text().split() == ["n", "0", "1", "2", "3", "4", "5"]
+
+
+@pytest.mark.parametrize("suffix", [".db", ".duckdb"])
+def test_slow_queries_time_out(tmp_path, suffix):
+    path = tmp_path / f"empty{suffix}"
+    if suffix == ".db":
+        sqlite3.connect(path).close()
+    else:
+        duckdb.connect(str(path)).close()
+    query = ("WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c WHERE x < 1000000000) "
+             "SELECT sum(x) FROM c")
+    with pytest.raises(TimeoutError):
+        make_engine(timeout=0.2).scalar(path, query)
+
+
+def test_sqlite_queries_do_not_load_duckdb(sqlite_db):
+    code = (
+        "import sys; from pathlib import Path; from tasks.business.query_engine import QueryEngine; "
+        f"print(QueryEngine(1, 10, 5.0, 2).scalar(Path({str(sqlite_db)!r}), 'SELECT 1')); "
+        "print('duckdb' in sys.modules)"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True)
+    assert result.stdout.split() == ["1", "False"]
@@ -0,0 +1,40 @@
+import os
+
+import pytest
+
+from tasks.operations import a5_logs
+from tasks.operations.recent_logs import write_recent_logs
+
+
+@pytest.fixture
+def data_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(a5_logs, "DATA_DIR", tmp_path)
+    return tmp_path
+
+
+def make_logs(log_dir, count):
+    log_dir.mkdir()
+    for i in range(count):
+        path = log_dir / f"{i}.log"
+        path.write_text(f"first {i}\nsecond {i}\n")
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+
+
+def test_missing_log_dir_writes_empty_output(tmp_path):
+    output_path = tmp_path / "logs-recent.txt"
+    assert write_recent_logs(tmp_path / "logs", output_path) == 0
+    assert output_path.read_text() == ""
+
+
+def test_count_given_as_a_string(data_dir):
+    make_logs(data_dir / "logs", 5)
+    a5_logs.handle({"operation": "A5", "parameters": {"count": "3", "lines": "2"}})
+    assert (data_dir / "logs-recent.txt").read_text().split("\n")[:-1] == [
+        "first 4", "second 4", "first 3", "second 3", "first 2", "second 2"
+    ]
+
+
+@pytest.mark.parametrize("parameters", [{"count": "ten"}, {"count": -1}, {"lines": 0}, {"count": None}])
+def test_invalid_parameters_are_rejected(data_dir, parameters):
+    with pytest.raises(ValueError):
+        a5_logs.handle({"operation": "A5", "parameters": parameters})
@@ -0,0 +1,56 @@
+import threading
+import time
+
+from utils import security
+from utils.security import PathValidator
+
+
+def test_sibling_with_common_prefix_is_outside(tmp_path):
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data2").mkdir()
+    validator = PathValidator([str(tmp_path / "data")])
+    assert validator(tmp_path / "data" / "a.txt")
+    assert not validator(tmp_path / "data2" / "a.txt")
+
+
+def test_repointed_symlink_is_checked_again(tmp_path):
+    root, outside = tmp_path / "data", tmp_path / "outside"
+    root.mkdir()
+    outside.mkdir()
+    (root / "inside.txt").write_text("x")
+    (outside / "secret.txt").write_text("x")
+    link = root / "link.txt"
+    link.symlink_to(root / "inside.txt")
+    validator = PathValidator([str(root)])
+    assert validator(link)
+
+    link.unlink()
+    link.symlink_to(outside / "secret.txt")
+    assert not validator(link)
+
+
+def test_cache_is_bounded(tmp_path):
+    validator = PathValidator([str(tmp_path)], max_entries=3)
+    for i in range(10):
+        assert validator(tmp_path / f"{i}.txt")
+    assert len(validator._cache) == 3
+    assert list(validator._cache) == [str(tmp_path / f"{i}.txt") for i in range(7, 10)]
+
+
+def test_concurrent_first_calls_share_one_validator(monkeypatch):
+    monkeypatch.setattr(security, "_validator", None)
+    original_init = PathValidator.__init__
+
+    def slow_init(self, *args, **kwargs):
+        time.sleep(0.05)  # Widen the window between the check and the assignment
+        original_init(self, *args, **kwargs)
+    monkeypatch.setattr(PathValidator, "__init__", slow_init)
+
+    validators = []
+    threads = [threading.Thread(target=lambda: validators.append(security.get_path_validator()))
+               for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(validators) == 4 and len({id(validator) for validator in validators}) == 1
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from tasks.operations.similarity import approximate_most_similar_pair, most_similar_pair
+
+
+def full_matrix_pair(embeddings):
+    """The original A9 search: full cosine matrix, diagonal masked, argmax"""
+    from sklearn.metrics.pairwise import cosine_similarity
+
+    similarities = cosine_similarity(embeddings)
+    np.fill_diagonal(similarities, -1)
+    i, j = np.unravel_index(similarities.argmax(), similarities.shape)
+    return int(i), int(j)
+
+
+def clustered(n, dim=64, seed=0):
+    rng = np.random.default_rng(seed)
+    embeddings = rng.standard_normal((n, dim)).astype(np.float32)
+    # A clear nearest pair, far from everything else
+    embeddings[n // 3] = embeddings[2 * n // 3] + 0.001 * rng.standard_normal(dim)
+    return embeddings
+
+
+@pytest.mark.parametrize("n, block_size", [(2, 1024), (50, 7), (500, 64), (1500, 1024)])
+def test_blocked_search_matches_full_matrix(n, block_size):
+    embeddings = np.random.default_rng(n).standard_normal((n, 32)).astype(np.float32)
+    _, i, j = most_similar_pair(embeddings, block_size=block_size)
+    assert (i, j) == full_matrix_pair(embeddings)
+
+
+def test_blocked_search_breaks_ties_in_row_major_order():
+    embeddings = np.array([[1, 0], [1, 0], [1, 0], [0, 1]], dtype=np.float32)
+    assert most_similar_pair(embeddings, block_size=2)[1:] == (0, 1)
+
+
+def test_lsh_finds_a_clear_nearest_pair():
+    embeddings = clustered(3000)
+    _, i, j = approximate_most_similar_pair(embeddings)
+    assert (i, j) == (1000, 2000) == full_matrix_pair(embeddings)
+
+
+def test_fewer_than_two_rows_is_an_error():
+    with pytest.raises(ValueError):
+        most_similar_pair(np.zeros((1, 4)))
+    with pytest.raises(ValueError):
+        approximate_most_similar_pair(np.zeros((1, 4)))